@@ -0,0 +1,243 @@
+"""
+Parallel loading of directories of Opta files, and loading of zip archives of them.
+Pass matrices of F27 files can also be rendered to PNG files in parallel.
+
+Files are parsed by a pool of worker processes. Every worker returns the compact
+representation of the parsed file (a metadata dict and numpy columns, see the
+to_columnar methods) instead of the pickled objects, and the objects are rebuilt
+in the calling process with from_columnar. A file that can not be parsed does not
+stop the batch: its error is reported with the file.
+
+Usage: python batch.py {f24,f9,f27} <dir> [--pattern P] [--workers N] [--chunksize N] [--cache-dir D]
+                       [--render-dir R]
+"""
+import argparse
+import fnmatch
+import os
+import sys
+import time
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+
+import matplotlib
+import matplotlib.pyplot as plt
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+from events import Events
+from match_results import MatchResults
+from pass_matrix import PassMatrix
+
+
+# Class of the objects built from every kind of file
+KINDS = {'f24': Events, 'f9': MatchResults, 'f27': PassMatrix}
+
+
+def load_files(file_paths, kind, max_workers = None, chunksize = 1, **options):
+    """
+    Parses Opta files of the same kind in parallel.
+
+    :param file_paths: list of str, paths of the files.
+    :param kind: str, kind of the files: 'f24', 'f9' or 'f27'.
+    :param max_workers: int, optional, number of worker processes. 1 parses the files in
+        the calling process. Default is None (the number of CPUs).
+    :param chunksize: int, optional, number of files sent to a worker at once. Bigger
+        chunks reduce the overhead with many small files. Default is 1.
+    :param options: keyword arguments of the constructor of the class of the files
+        (e.g. cache_dir, or type_ids for F24 files). They must be picklable.
+    :return: tuple (loaded, errors): dict of the objects (Events, MatchResults or
+        PassMatrix) indexed by file path, in the order of file_paths, and dict of the
+        error messages of the files that could not be parsed, indexed by file path.
+    """
+    if kind not in KINDS:
+        raise ValueError(f'Unknown kind of file: {kind}. Use one of {list(KINDS)}')
+    tasks = [(kind, file_path, options) for file_path in file_paths]
+    if max_workers == 1:
+        results = list(map(parse_file, tasks))
+    else:
+        with ProcessPoolExecutor(max_workers = max_workers) as executor:
+            results = list(executor.map(parse_file, tasks, chunksize = chunksize))
+
+    loaded = {}
+    errors = {}
+    for file_path, columnar, error in results:
+        if error is None:
+            loaded[file_path] = KINDS[kind].from_columnar(*columnar)
+        else:
+            errors[file_path] = error
+    return loaded, errors
+
+
+def load_dir(dir_path, kind, file_pattern = '*.xml', max_workers = None, chunksize = 1, **options):
+    """
+    Parses in parallel the Opta files of a directory (see load_files).
+
+    :param dir_path: str, directory with the files.
+    :param kind: str, kind of the files: 'f24', 'f9' or 'f27'.
+    :param file_pattern: str, optional, shell pattern of the names of the files. Default is '*.xml'.
+    :return: tuple (loaded, errors), see load_files.
+    """
+    file_paths = [os.path.join(dir_path, file_name)
+                    for file_name in sorted(fnmatch.filter(os.listdir(dir_path), file_pattern))]
+    return load_files(file_paths, kind, max_workers = max_workers, chunksize = chunksize, **options)
+
+
+def iter_zip(archive_path, kind, file_pattern = '*.xml', **options):
+    """
+    Parses the Opta files of a zip archive one after another. Every member is
+    decompressed while it is parsed, so the archive is never extracted to disk.
+
+    :param archive_path: str or binary file object, zip archive with the files.
+    :param kind: str, kind of the files: 'f24', 'f9' or 'f27'.
+    :param file_pattern: str, optional, shell pattern of the names of the members.
+        Default is '*.xml'.
+    :param options: keyword arguments of the constructor of the class of the files.
+    :return: generator of tuples (member name, Events, MatchResults or PassMatrix), in
+        the order of the members in the archive.
+    """
+    if kind not in KINDS:
+        raise ValueError(f'Unknown kind of file: {kind}. Use one of {list(KINDS)}')
+    with zipfile.ZipFile(archive_path) as archive:
+        for info in archive.infolist():
+            if info.is_dir() or not fnmatch.fnmatch(os.path.basename(info.filename), file_pattern):
+                continue
+            with archive.open(info) as member:
+                parsed = KINDS[kind](member, **options)
+            yield info.filename, parsed
+
+
+def parse_file(task):
+    """
+    Work of a worker process: parses a file and returns its compact representation.
+    Errors are returned instead of raised, so they do not abort the batch.
+
+    :param task: tuple (kind, file_path, options).
+    :return: tuple (file_path, (metadata, columns), None), or (file_path, None, error
+        message) if the file could not be parsed.
+    """
+    kind, file_path, options = task
+    try:
+        return file_path, KINDS[kind](file_path, **options).to_columnar(), None
+    except Exception as e:
+        return file_path, None, f'{type(e).__name__}: {e}'
+
+
+def render_pass_matrices(file_paths, output_dir, max_workers = None, chunksize = 1, dpi = None, cache_dir = None,
+                         **style):
+    """
+    Renders the pass matrices of Opta F27 files to PNG files in parallel. Every figure
+    is drawn through its axes only, saved through an Agg canvas (so the PNG files do
+    not depend on the backend of the process, nor on max_workers) and closed after
+    saving, so no figure is kept between files. Worker processes also use the Agg
+    backend.
+
+    :param file_paths: list of str, paths of the Opta F27 files.
+    :param output_dir: str, directory of the PNG files (named as the F27 files). It is
+        created if it does not exist.
+    :param max_workers: int, optional, number of worker processes. 1 renders the files in
+        the calling process. Default is None (the number of CPUs).
+    :param chunksize: int, optional, number of files sent to a worker at once. Default is 1.
+    :param dpi: int, optional, resolution of the PNG files. Default is None (the one of
+        the figure).
+    :param cache_dir: str, optional, directory of the on-disk cache of parsed files
+        (see ParseCache). Default is None (no cache).
+    :param style: keyword arguments of PassMatrix.get_figure_pass_matrix (e.g.
+        team_color, with_subs, min_passes).
+    :return: tuple (rendered, errors): dict indexed by file path, in the order of
+        file_paths, of dicts with the output_path and the parse_seconds and
+        render_seconds of the file, and dict of the error messages of the files that
+        could not be rendered, indexed by file path.
+    """
+    os.makedirs(output_dir, exist_ok = True)
+    tasks = [(file_path, output_dir, dpi, cache_dir, style) for file_path in file_paths]
+    if max_workers == 1:
+        results = list(map(render_file, tasks))
+    else:
+        with ProcessPoolExecutor(max_workers = max_workers, initializer = use_agg_backend) as executor:
+            results = list(executor.map(render_file, tasks, chunksize = chunksize))
+
+    rendered = {}
+    errors = {}
+    for file_path, timing, error in results:
+        if error is None:
+            rendered[file_path] = timing
+        else:
+            errors[file_path] = error
+    return rendered, errors
+
+
+def render_file(task):
+    """
+    Work of a worker process: parses a F27 file and saves its pass matrix as a PNG file.
+    Errors are returned instead of raised, so they do not abort the batch.
+
+    :param task: tuple (file_path, output_dir, dpi, cache_dir, style).
+    :return: tuple (file_path, dict with output_path, parse_seconds and render_seconds,
+        None), or (file_path, None, error message) if the file could not be rendered.
+    """
+    file_path, output_dir, dpi, cache_dir, style = task
+    fig = None
+    try:
+        start = time.perf_counter()
+        pass_matrix = PassMatrix(file_path, cache_dir = cache_dir)
+        parsed = time.perf_counter()
+        fig = pass_matrix.get_figure_pass_matrix(**style)
+        output_path = os.path.join(output_dir, os.path.splitext(os.path.basename(file_path))[0] + '.png')
+        # Same renderer with any backend, also when rendering in the calling process
+        FigureCanvasAgg(fig)
+        fig.savefig(output_path, dpi = 'figure' if dpi is None else dpi)
+        return file_path, {'output_path': output_path, 'parse_seconds': parsed - start,
+                           'render_seconds': time.perf_counter() - parsed}, None
+    except Exception as e:
+        return file_path, None, f'{type(e).__name__}: {e}'
+    finally:
+        if fig is not None:
+            plt.close(fig)
+
+
+def use_agg_backend():
+    # Initializer of the rendering workers: figures are only saved, never shown
+    matplotlib.use('Agg')
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(description = 'Parse a directory of Opta files in parallel.')
+    parser.add_argument('kind', choices = list(KINDS), help = 'kind of the files')
+    parser.add_argument('dir', help = 'directory with the files')
+    parser.add_argument('--pattern', default = '*.xml', help = 'shell pattern of the names of the files')
+    parser.add_argument('--workers', type = int, default = None, help = 'number of worker processes')
+    parser.add_argument('--chunksize', type = int, default = 1, help = 'files sent to a worker at once')
+    parser.add_argument('--cache-dir', default = None, help = 'directory of the cache of parsed files')
+    parser.add_argument('--render-dir', default = None, help = 'render the pass matrices of F27 files to this directory')
+    args = parser.parse_args(argv)
+
+    if args.render_dir is not None:
+        if args.kind != 'f27':
+            parser.error('--render-dir is only for f27 files')
+        start = time.perf_counter()
+        file_paths = [os.path.join(args.dir, file_name)
+                        for file_name in sorted(fnmatch.filter(os.listdir(args.dir), args.pattern))]
+        rendered, errors = render_pass_matrices(file_paths, args.render_dir, max_workers = args.workers,
+                                                chunksize = args.chunksize, cache_dir = args.cache_dir)
+        elapsed = time.perf_counter() - start
+        for file_path, timing in rendered.items():
+            print(f'OK     {file_path} -> {timing["output_path"]} '
+                  f'(parse {timing["parse_seconds"]:.2f} s, render {timing["render_seconds"]:.2f} s)')
+        for file_path, error in errors.items():
+            print(f'ERROR  {file_path}: {error}')
+        print(f'{len(rendered)} files rendered, {len(errors)} errors in {elapsed:.2f} s')
+        return 1 if errors else 0
+
+    start = time.perf_counter()
+    loaded, errors = load_dir(args.dir, args.kind, file_pattern = args.pattern, max_workers = args.workers,
+                              chunksize = args.chunksize, cache_dir = args.cache_dir)
+    elapsed = time.perf_counter() - start
+    for file_path in loaded:
+        print(f'OK     {file_path}')
+    for file_path, error in errors.items():
+        print(f'ERROR  {file_path}: {error}')
+    print(f'{len(loaded)} files loaded, {len(errors)} errors in {elapsed:.2f} s')
+    return 1 if errors else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,137 @@
+"""
+Memory benchmark of the event representations.
+
+Reads the events of an Opta F24 file once and builds them again with every
+representation, printing the memory used by each one per event:
+
+- dict:     dict-backed Event and Qualifier objects, as they were implemented before
+            (a prop_defaults dict copied into the instance __dict__).
+- slots:    the slotted Event and Qualifier classes.
+- lazy:     slotted Event objects with a QualifierList (raw qualifier data, Qualifier
+            objects not built).
+- store:    the columnar EventStore (numpy arrays plus inverted indexes).
+
+The attribute values (ints, strings, datetimes) are created once and shared by all
+the representations, so only the memory of the representation itself is measured.
+
+Usage: python benchmark_memory.py <f24_file>
+"""
+import sys
+import tracemalloc
+import xml.etree.ElementTree as ET
+
+from constants import UNDEFINED_INT, UNDEFINED_FLOAT, UNDEFINED_DATE
+from event import Event
+from event_store import EventStore
+from qualifier import Qualifier, QualifierList
+from timestamps import TimestampDecoder
+
+
+class DictEvent:
+    def __init__(self, **kwargs) -> None:
+        prop_defaults = {
+            "id": UNDEFINED_INT, "event_id": UNDEFINED_INT, "type_id": UNDEFINED_INT,
+            "period_id": UNDEFINED_INT, "min": UNDEFINED_INT, "sec": UNDEFINED_INT,
+            "team_id": UNDEFINED_INT, "player_id": UNDEFINED_INT, "outcome": UNDEFINED_INT,
+            "assist": UNDEFINED_INT, "keypass": UNDEFINED_INT, "x": UNDEFINED_FLOAT,
+            "y": UNDEFINED_FLOAT, "timestamp": UNDEFINED_DATE, "last_modified": UNDEFINED_DATE,
+            "qualifiers_list": []
+        }
+        self.__dict__.update(prop_defaults)
+        self.__dict__.update(kwargs)
+
+
+class DictQualifier:
+    def __init__(self, **kwargs) -> None:
+        prop_defaults = {"id": UNDEFINED_INT, "qualifier_id": UNDEFINED_INT, "value": ""}
+        self.__dict__.update(prop_defaults)
+        self.__dict__.update(kwargs)
+
+
+def read_events(file_path):
+    """
+    Values of the events of a F24 file, converted as the parser does.
+
+    :param file_path: str, path of the Opta F24 file.
+    :return: list of tuples (attributes dict, list of (id, qualifier_id, value) tuples).
+    """
+    decoder = TimestampDecoder(('%Y-%m-%dT%H:%M:%S', '%Y-%m-%d'))
+    rows = []
+    for event_tag in ET.parse(file_path).getroot().iter('Event'):
+        attributes = {name: to_int(event_tag.get(name)) for name in EventStore.INT_COLUMNS}
+        attributes.update({name: to_float(event_tag.get(name)) for name in EventStore.FLOAT_COLUMNS})
+        attributes.update({name: decoder.decode(event_tag.get(name)) for name in EventStore.DATE_COLUMNS})
+        qualifiers = [(to_int(q.get('id')), to_int(q.get('qualifier_id')), q.get('value', ''))
+                        for q in event_tag.iter('Q')]
+        rows.append((attributes, qualifiers))
+    return rows
+
+
+def to_int(value):
+    try:
+        return int(value)
+    except (ValueError, TypeError):
+        return UNDEFINED_INT
+
+
+def to_float(value):
+    try:
+        return float(value)
+    except (ValueError, TypeError):
+        return UNDEFINED_FLOAT
+
+
+def build_dict_events(rows):
+    return [DictEvent(qualifiers_list = [DictQualifier(id = id, qualifier_id = qualifier_id, value = value)
+                                        for id, qualifier_id, value in qualifiers], **attributes)
+            for attributes, qualifiers in rows]
+
+
+def build_slotted_events(rows):
+    return [Event(qualifiers_list = [Qualifier(id = id, qualifier_id = qualifier_id, value = value)
+                                    for id, qualifier_id, value in qualifiers], **attributes)
+            for attributes, qualifiers in rows]
+
+
+def build_lazy_events(rows):
+    return [Event(qualifiers_list = QualifierList([q[0] for q in qualifiers], [q[1] for q in qualifiers],
+                                                  [q[2] for q in qualifiers]), **attributes)
+            for attributes, qualifiers in rows]
+
+
+def measure(fn_build, *args):
+    """
+    Memory allocated by a function and still held by its result.
+
+    :param fn_build: function, builds the representation.
+    :return: int, bytes.
+    """
+    tracemalloc.start()
+    result = fn_build(*args)
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del result
+    return size
+
+
+def main(file_path):
+    rows = read_events(file_path)
+    num_events = len(rows)
+    num_qualifiers = sum(len(qualifiers) for _, qualifiers in rows)
+    lazy_events = build_lazy_events(rows)
+    results = [('dict', measure(build_dict_events, rows)),
+               ('slots', measure(build_slotted_events, rows)),
+               ('lazy', measure(build_lazy_events, rows)),
+               ('store', measure(EventStore.from_events, lazy_events))]
+
+    print(f'{num_events} events, {num_qualifiers} qualifiers')
+    print(f'{"representation":<16}{"total (KB)":>12}{"bytes/event":>14}')
+    for name, size in results:
+        print(f'{name:<16}{size / 1024:>12.1f}{size / max(num_events, 1):>14.1f}')
+
+
+if __name__ == '__main__':
+    if len(sys.argv) != 2:
+        print(__doc__)
+        sys.exit(1)
+    main(sys.argv[1])
@@ -0,0 +1,328 @@
+"""
+Catalog of the Opta files of some directories, kept in a SQLite file.
+
+Only the header of every file is read (the attributes of the Game tag of a F24
+file, of the SoccerFeed tag of a F27 file and the competition, match info and
+teams of a F9 file): the parser stops as soon as it has them, so the events,
+passes or stats of the files are never parsed. Files are scanned again only if
+their size or modification time changed.
+
+Matches are then looked up in the catalog and only their files are loaded:
+
+    catalog = MatchCatalog('catalog.db')
+    catalog.add_dir('data/f24')
+    loaded, errors = catalog.load('f24', home_team_id = 188)
+
+Usage: python catalog.py <catalog_file> <dir> [--pattern P]
+"""
+import argparse
+import fnmatch
+import os
+import sqlite3
+import sys
+import time
+import xml.etree.ElementTree as ET
+
+import pandas as pd
+
+import batch
+from constants import UNDEFINED_INT, UNDEFINED_DATE
+from opta_source import OptaSource
+from timestamps import TimestampDecoder
+
+
+class MatchCatalog:
+
+    # Columns of the header of a match (the team_id of F27 files is the team of the pass matrix)
+    HEADER_COLUMNS = ['match_id', 'competition_id', 'competition_name', 'season_id', 'season_name',
+                      'matchday', 'game_date', 'home_team_id', 'home_team_name', 'home_score',
+                      'away_team_id', 'away_team_name', 'away_score', 'team_id']
+    __INT_COLUMNS = ['match_id', 'competition_id', 'season_id', 'matchday', 'home_team_id', 'home_score',
+                     'away_team_id', 'away_score', 'team_id']
+    # Date formats of F24 and F27 files, and of F9 files without their time zone
+    __DATE_FORMATS = ('%Y-%m-%dT%H:%M:%S', '%Y-%m-%d %H:%M:%S', '%Y-%m-%d', '%Y%m%dT%H%M%S')
+
+    def __init__(self, db_path) -> None:
+        """
+        Constructor for the MatchCatalog class.
+
+        :param db_path: str, path of the SQLite file of the catalog. It is created if it
+            does not exist.
+        :return: None
+        """
+        self.__connection = sqlite3.connect(db_path)
+        int_columns = ', '.join(f'{column} INTEGER' for column in self.__INT_COLUMNS)
+        text_columns = ', '.join(f'{column} TEXT' for column in self.HEADER_COLUMNS
+                                    if column not in self.__INT_COLUMNS)
+        with self.__connection:
+            self.__connection.execute(f'CREATE TABLE IF NOT EXISTS files (file_path TEXT PRIMARY KEY, '
+                                      f'dir_path TEXT, size INTEGER, mtime_ns INTEGER, kind TEXT, '
+                                      f'{int_columns}, {text_columns})')
+            for columns in ('dir_path', 'match_id', 'competition_id, season_id', 'home_team_id', 'away_team_id'):
+                name = 'files_' + columns.replace(', ', '_')
+                self.__connection.execute(f'CREATE INDEX IF NOT EXISTS {name} ON files ({columns})')
+
+
+    def close(self):
+        self.__connection.close()
+
+
+    def add_dir(self, dir_path, file_pattern = '*.xml'):
+        """
+        Adds the files of a directory to the catalog. Files already in the catalog are
+        scanned again only if they changed, and the ones that are not in the directory
+        anymore are removed.
+
+        :param dir_path: str, directory with the Opta files.
+        :param file_pattern: str, optional, shell pattern of the names of the files.
+            Default is '*.xml'.
+        :return: int, number of files scanned.
+        """
+        dir_path = os.path.abspath(dir_path)
+        file_paths = [os.path.join(dir_path, file_name)
+                        for file_name in sorted(fnmatch.filter(os.listdir(dir_path), file_pattern))]
+        num_scanned = self.add_files(file_paths)
+        current = set(file_paths)
+        cataloged = [row[0] for row in self.__connection.execute(
+                        'SELECT file_path FROM files WHERE dir_path = ?', (dir_path,))]
+        removed = [(file_path,) for file_path in cataloged
+                    if file_path not in current and fnmatch.fnmatch(os.path.basename(file_path), file_pattern)]
+        with self.__connection:
+            self.__connection.executemany('DELETE FROM files WHERE file_path = ?', removed)
+        return num_scanned
+
+
+    def add_files(self, file_paths):
+        """
+        Adds files to the catalog. Files already in the catalog are scanned again only
+        if their size or modification time changed. Files that are not Opta match files
+        (e.g. squads files) or can not be read are kept without header, so they are not
+        scanned again until they change.
+
+        :param file_paths: list of str, paths of the files.
+        :return: int, number of files scanned.
+        """
+        known = {row[0]: (row[1], row[2]) for row in self.__connection.execute(
+                    'SELECT file_path, size, mtime_ns FROM files')}
+        rows = []
+        for file_path in file_paths:
+            file_path = os.path.abspath(file_path)
+            stat = os.stat(file_path)
+            if known.get(file_path) == (stat.st_size, stat.st_mtime_ns):
+                continue
+            try:
+                header = self.scan_header(file_path)
+            except (ET.ParseError, OSError, EOFError, ValueError):
+                header = None
+            kind = None
+            values = [None] * len(self.HEADER_COLUMNS)
+            if header is not None:
+                kind = header['kind']
+                values = [header[column] for column in self.HEADER_COLUMNS]
+            rows.append([file_path, os.path.dirname(file_path), stat.st_size, stat.st_mtime_ns, kind] + values)
+        columns = ['file_path', 'dir_path', 'size', 'mtime_ns', 'kind'] + self.HEADER_COLUMNS
+        with self.__connection:
+            self.__connection.executemany(f'INSERT OR REPLACE INTO files ({", ".join(columns)}) '
+                                          f'VALUES ({", ".join("?" * len(columns))})', rows)
+        return len(rows)
+
+
+    def find(self, kind = None, match_id = None, competition_id = None, season_id = None, matchday = None,
+             team_id = None, home_team_id = None, away_team_id = None, date_from = None, date_to = None):
+        """
+        Files of the catalog that match all the given conditions.
+
+        :param kind: str, optional, kind of the files: 'f24', 'f9' or 'f27'.
+        :param match_id: int, optional.
+        :param competition_id: int, optional.
+        :param season_id: int, optional.
+        :param matchday: int, optional.
+        :param team_id: int, optional, team that plays the match (home or away).
+        :param home_team_id: int, optional.
+        :param away_team_id: int, optional.
+        :param date_from: str or datetime, optional, first date of the matches (included).
+        :param date_to: str or datetime, optional, last date of the matches (included).
+        :return: DataFrame with file_path, kind and the header columns, sorted by date.
+        """
+        conditions = ['kind IS NOT NULL']
+        params = []
+        for column, value in (('kind', kind), ('match_id', match_id), ('competition_id', competition_id),
+                              ('season_id', season_id), ('matchday', matchday),
+                              ('home_team_id', home_team_id), ('away_team_id', away_team_id)):
+            if value is not None:
+                conditions.append(f'{column} = ?')
+                params.append(value)
+        if team_id is not None:
+            conditions.append('(home_team_id = ? OR away_team_id = ?)')
+            params.extend([team_id, team_id])
+        if date_from is not None:
+            conditions.append('game_date >= ?')
+            params.append(str(pd.Timestamp(date_from)))
+        if date_to is not None:
+            conditions.append('game_date <= ?')
+            # A date without time includes the whole day
+            date_to = pd.Timestamp(date_to)
+            if date_to == date_to.normalize():
+                date_to += pd.Timedelta(days = 1) - pd.Timedelta(seconds = 1)
+            params.append(str(date_to))
+        columns = ['file_path', 'kind'] + self.HEADER_COLUMNS
+        cursor = self.__connection.execute(f'SELECT {", ".join(columns)} FROM files '
+                                           f'WHERE {" AND ".join(conditions)} ORDER BY game_date, file_path',
+                                           params)
+        df = pd.DataFrame(cursor.fetchall(), columns = columns)
+        for column in self.__INT_COLUMNS:
+            df[column] = df[column].fillna(UNDEFINED_INT).astype('int64')
+        df['game_date'] = pd.to_datetime(df['game_date'])
+        return df
+
+
+    def load(self, kind, max_workers = 1, options = None, **conditions):
+        """
+        Loads only the files of the catalog that match the conditions (see find).
+
+        :param kind: str, kind of the files: 'f24', 'f9' or 'f27'.
+        :param max_workers: int, optional, number of worker processes (see
+            batch.load_files). Default is 1.
+        :param options: dict, optional, keyword arguments of the constructor of the class
+            of the files (e.g. cache_dir).
+        :param conditions: conditions of the files (see find).
+        :return: tuple (loaded, errors), see batch.load_files.
+        """
+        file_paths = self.find(kind = kind, **conditions)['file_path'].tolist()
+        return batch.load_files(file_paths, kind, max_workers = max_workers, **(options or {}))
+
+
+    @staticmethod
+    def scan_header(source):
+        """
+        Reads the header of an Opta file, stopping as soon as it is complete.
+
+        :param source: str, path-like, bytes or binary file object (see OptaSource).
+        :return: dict with the kind of the file ('f24', 'f9' or 'f27') and the values of
+            HEADER_COLUMNS (UNDEFINED_INT or '' when they are not in the file; team
+            names are not in the header of F9 files), or None if it is not an Opta match
+            file.
+        """
+        header = {column: UNDEFINED_INT if column in MatchCatalog.__INT_COLUMNS else ''
+                    for column in MatchCatalog.HEADER_COLUMNS}
+        header['game_date'] = None
+        with OptaSource.open(source) as f:
+            tags = ET.iterparse(f, events = ('start', 'end'))
+            xml_event, root = next(tags)
+            if root.tag == 'Games':
+                kind = MatchCatalog.__scan_f24(tags, header)
+            elif root.tag == 'SoccerFeed' and root.get('game_id') is not None:
+                kind = MatchCatalog.__scan_f27(root, header)
+            elif root.tag == 'SoccerFeed':
+                kind = MatchCatalog.__scan_f9(tags, header)
+            else:
+                kind = None
+        if kind is None:
+            return None
+        header['kind'] = kind
+        game_date = TimestampDecoder(MatchCatalog.__DATE_FORMATS).decode(header['game_date'])
+        header['game_date'] = None if game_date == UNDEFINED_DATE else str(game_date)
+        return header
+
+
+    @staticmethod
+    def __scan_f24(tags, header):
+        for xml_event, tag in tags:
+            if xml_event == 'start' and tag.tag == 'Game':
+                for column, name in (('match_id', 'id'), ('competition_id', 'competition_id'),
+                                     ('competition_name', 'competition_name'), ('season_id', 'season_id'),
+                                     ('season_name', 'season_name'), ('matchday', 'matchday'),
+                                     ('game_date', 'game_date'), ('home_team_id', 'home_team_id'),
+                                     ('home_team_name', 'home_team_name'), ('home_score', 'home_score'),
+                                     ('away_team_id', 'away_team_id'), ('away_team_name', 'away_team_name'),
+                                     ('away_score', 'away_score')):
+                    MatchCatalog.__set_value(header, column, tag.get(name))
+                return 'f24'
+        return None
+
+
+    @staticmethod
+    def __scan_f27(root, header):
+        for column, name in (('match_id', 'game_id'), ('competition_id', 'competition_id'),
+                             ('competition_name', 'competition_name'), ('season_id', 'season_id'),
+                             ('season_name', 'season_name'), ('game_date', 'game_date'),
+                             ('home_team_id', 'home_team_id'), ('home_team_name', 'home_team_name'),
+                             ('away_team_id', 'away_team_id'), ('away_team_name', 'away_team_name'),
+                             ('team_id', 'team_id')):
+            MatchCatalog.__set_value(header, column, root.get(name))
+        return 'f27'
+
+
+    @staticmethod
+    def __scan_f9(tags, header):
+        # The header ends with the TeamData tags of both teams, before the line-ups and
+        # the teams info
+        kind = None
+        in_competition = False
+        num_teams = 0
+        for xml_event, tag in tags:
+            if xml_event == 'start':
+                if tag.tag == 'SoccerDocument':
+                    uid = tag.get('uID', '')
+                    if not uid.startswith('f'):
+                        return None
+                    kind = 'f9'
+                    MatchCatalog.__set_value(header, 'match_id', uid[1:])
+                elif tag.tag == 'Competition':
+                    in_competition = True
+                    MatchCatalog.__set_value(header, 'competition_id', tag.get('uID', '')[1:])
+                elif tag.tag == 'MatchInfo':
+                    if header['matchday'] == UNDEFINED_INT:
+                        MatchCatalog.__set_value(header, 'matchday', tag.get('MatchDay'))
+                elif tag.tag == 'TeamData':
+                    side = 'home' if tag.get('Side') == 'Home' else 'away'
+                    MatchCatalog.__set_value(header, f'{side}_team_id', tag.get('TeamRef', '')[1:])
+                    MatchCatalog.__set_value(header, f'{side}_score', tag.get('Score'))
+                    num_teams += 1
+                    if num_teams == 2:
+                        break
+            elif tag.tag == 'Competition':
+                in_competition = False
+            elif in_competition and tag.tag == 'Name':
+                MatchCatalog.__set_value(header, 'competition_name', tag.text)
+            elif in_competition and tag.tag == 'Stat' and tag.get('Type') in ('season_id', 'season_name', 'matchday'):
+                MatchCatalog.__set_value(header, tag.get('Type'), tag.text)
+            elif tag.tag == 'Date' and tag.text is not None:
+                # Without the time zone (e.g. 20210814T190000+0100)
+                header['game_date'] = tag.text.strip()[:15]
+        return kind
+
+
+    @staticmethod
+    def __set_value(header, column, value):
+        if column in MatchCatalog.__INT_COLUMNS:
+            try:
+                header[column] = int(value)
+            except (ValueError, TypeError):
+                header[column] = UNDEFINED_INT
+        elif column == 'game_date':
+            header[column] = value
+        else:
+            header[column] = '' if value is None else str(value)
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(description = 'Add a directory of Opta files to a catalog.')
+    parser.add_argument('catalog', help = 'SQLite file of the catalog')
+    parser.add_argument('dir', help = 'directory with the files')
+    parser.add_argument('--pattern', default = '*.xml', help = 'shell pattern of the names of the files')
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    catalog = MatchCatalog(args.catalog)
+    num_scanned = catalog.add_dir(args.dir, file_pattern = args.pattern)
+    elapsed = time.perf_counter() - start
+    df = catalog.find()
+    catalog.close()
+    print(df.groupby('kind').size().to_string())
+    print(f'{num_scanned} files scanned, {len(df)} matches in the catalog in {elapsed:.2f} s')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
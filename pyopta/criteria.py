@@ -1,3 +1,5 @@
+import numpy as np
+
 from Operator import *
 
 
@@ -44,6 +46,59 @@ class Criteria:
         elif self.operator == Operator.QNIN:
             return self.qnin(value)
 
+    def perform_vectorized_operation(self, values):
+        """
+        Vectorized counterpart of perform_operation: applies the criteria to every 
+        element of a numpy array at once and returns a boolean mask. Qualifier 
+        operators (QIN, QNIN) work on lists of qualifiers and are not supported here.
+        """
+        return self.compile_vectorized_operation()(values)
+
+    def compile_vectorized_operation(self):
+        """
+        Returns a function that performs the vectorized operation of the criteria over a
+        numpy array. The criteria value is converted once here instead of on every call.
+        """
+        if self.operator == Operator.EQ:
+            value = self.value
+            return lambda values: values == value
+        elif self.operator == Operator.NEQ:
+            value = self.value
+            return lambda values: values != value
+        elif self.operator == Operator.LT:
+            value = float(self.value)
+            return lambda values: values < value
+        elif self.operator == Operator.LTE:
+            value = float(self.value)
+            return lambda values: values <= value
+        elif self.operator == Operator.GT:
+            value = float(self.value)
+            return lambda values: values > value
+        elif self.operator == Operator.GTE:
+            value = float(self.value)
+            return lambda values: values >= value
+        elif self.operator == Operator.BW:
+            low, high = float(self.value[0]), float(self.value[1])
+            return lambda values: (low <= values) & (values <= high)
+        elif self.operator == Operator.IN:
+            value = np.array(list(self.value))
+            return lambda values: np.isin(values, value)
+        elif self.operator == Operator.NIN:
+            value = np.array(list(self.value))
+            return lambda values: ~np.isin(values, value)
+        raise ValueError(f"Operator {self.operator} can not be applied to a column of values")
+
+    def get_signature(self):
+        """
+        Hashable representation of the criteria (operator and value), used to cache 
+        compiled filters.
+        """
+        if isinstance(self.value, (set, frozenset)):
+            return (self.operator.name, tuple(sorted(self.value)))
+        elif isinstance(self.value, (list, tuple)):
+            return (self.operator.name, tuple(self.value))
+        return (self.operator.name, self.value)
+
     def eq(self, value):
         return value == self.value
     
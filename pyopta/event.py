@@ -1,35 +1,53 @@
-from datetime import date
-from typing import Union
+from datetime import datetime
 
 from constants import (
     UNDEFINED_INT, UNDEFINED_FLOAT, UNDEFINED_DATE)
 
 
 class Event:
-    def __init__(self, **kwargs) -> None:
+    __slots__ = ('id', 'event_id', 'type_id', 'period_id', 'min', 'sec', 'team_id', 'player_id',
+                 'outcome', 'assist', 'keypass', 'x', 'y', 'timestamp', 'last_modified', 'qualifiers_list')
+
+    def __init__(self, id: int = UNDEFINED_INT, event_id: int = UNDEFINED_INT, type_id: int = UNDEFINED_INT,
+                 period_id: int = UNDEFINED_INT, min: int = UNDEFINED_INT, sec: int = UNDEFINED_INT,
+                 team_id: int = UNDEFINED_INT, player_id: int = UNDEFINED_INT, outcome: int = UNDEFINED_INT,
+                 assist: int = UNDEFINED_INT, keypass: int = UNDEFINED_INT, x: float = UNDEFINED_FLOAT,
+                 y: float = UNDEFINED_FLOAT, timestamp: datetime = UNDEFINED_DATE,
+                 last_modified: datetime = UNDEFINED_DATE, qualifiers_list: list = None) -> None:
         """
         Constructor for the Event class.
 
-        :param kwargs: dictionary, optional, contains values for the properties of the Event object.
+        :param id: int, optional, the unique identifier of the event. Default is UNDEFINED_INT.
+        :param event_id: int, optional, the identifier of the event within its team. Default is UNDEFINED_INT.
+        :param type_id: int, optional, the type of the event (see EVENT_IDS). Default is UNDEFINED_INT.
+        :param period_id: int, optional, the period of the match. Default is UNDEFINED_INT.
+        :param min: int, optional, the minute of the event. Default is UNDEFINED_INT.
+        :param sec: int, optional, the second of the event. Default is UNDEFINED_INT.
+        :param team_id: int, optional, the identifier of the team. Default is UNDEFINED_INT.
+        :param player_id: int, optional, the identifier of the player. Default is UNDEFINED_INT.
+        :param outcome: int, optional, the outcome of the event. Default is UNDEFINED_INT.
+        :param assist: int, optional, whether the event is an assist. Default is UNDEFINED_INT.
+        :param keypass: int, optional, whether the event is a key pass. Default is UNDEFINED_INT.
+        :param x: float, optional, the x coordinate of the event. Default is UNDEFINED_FLOAT.
+        :param y: float, optional, the y coordinate of the event. Default is UNDEFINED_FLOAT.
+        :param timestamp: datetime, optional, the time of the event. Default is UNDEFINED_DATE.
+        :param last_modified: datetime, optional, the last modification of the event. Default is UNDEFINED_DATE.
+        :param qualifiers_list: list, optional, the qualifiers of the event. Default is an empty list.
         :return: None
         """
-        prop_defaults: dict[str, Union[int, float, date, list]] = {
-            "id": UNDEFINED_INT,
-            "event_id": UNDEFINED_INT,
-            "type_id": UNDEFINED_INT,
-            "period_id": UNDEFINED_INT,
-            "min": UNDEFINED_INT,
-            "sec": UNDEFINED_INT,
-            "team_id": UNDEFINED_INT,
-            "player_id": UNDEFINED_INT,
-            "outcome": UNDEFINED_INT,
-            "assist": UNDEFINED_INT,
-            "keypass": UNDEFINED_INT,
-            "x": UNDEFINED_FLOAT,
-            "y": UNDEFINED_FLOAT,
-            "timestamp": UNDEFINED_DATE,
-            "last_modified": UNDEFINED_DATE,
-            "qualifiers_list": []
-        }
-        self.__dict__.update(prop_defaults)
-        self.__dict__.update(kwargs)
+        self.id = id
+        self.event_id = event_id
+        self.type_id = type_id
+        self.period_id = period_id
+        self.min = min
+        self.sec = sec
+        self.team_id = team_id
+        self.player_id = player_id
+        self.outcome = outcome
+        self.assist = assist
+        self.keypass = keypass
+        self.x = x
+        self.y = y
+        self.timestamp = timestamp
+        self.last_modified = last_modified
+        self.qualifiers_list = [] if qualifiers_list is None else qualifiers_list
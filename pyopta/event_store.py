@@ -0,0 +1,558 @@
+import numpy as np
+
+from Operator import *
+from event import Event
+from qualifier import QualifierList
+
+
+class EventStore:
+    """
+    Columnar representation of the events of an Opta F24 file.
+
+    Every attribute of the Event class is kept in a typed numpy array (one position
+    per event, in the order they appear in the file), so queries can select events
+    with boolean masks instead of walking a list of Event objects.
+
+    Qualifiers are stored CSR-style: the qualifiers of the event at position i are
+    the rows q_offsets[i]:q_offsets[i + 1] of the q_id, q_qualifier_id and q_value
+    arrays. For every qualifier_id a presence bitmap over the events is built on
+    demand, so QIN/QNIN criteria are solved with bitwise operations.
+
+    The type_id, team_id, player_id and period_id columns also have an inverted 
+    index (value -> sorted positions of the events with that value), built when the
+    store is created.
+
+    A store can hold the events of several files (see concatenate). The events of 
+    every file are then kept together and a partition column (e.g. match_id) tells
+    the file of each event. The partition column is indexed too, and every partition
+    can be taken as a store of its own without copying the columns.
+
+    Sets of criteria are compiled (see filter): EQ/IN criteria over indexed columns 
+    intersect posting lists and the rest become vectorized steps ordered by 
+    selectivity. Compiled filters are cached by the signature of the criteria.
+    """
+
+    INT_COLUMNS = ('id', 'event_id', 'type_id', 'period_id', 'min', 'sec', 'team_id',
+                   'player_id', 'outcome', 'assist', 'keypass')
+    FLOAT_COLUMNS = ('x', 'y')
+    DATE_COLUMNS = ('timestamp', 'last_modified')
+    QUALIFIER_COLUMNS = ('q_offsets', 'q_id', 'q_qualifier_id', 'q_value')
+    INDEXED_COLUMNS = ('type_id', 'team_id', 'player_id', 'period_id')
+    MAX_COMPILED_FILTERS = 256
+
+    def __init__(self, columns, partition_column = None) -> None:
+        """
+        Constructor for the EventStore class.
+
+        :param columns: dict, numpy arrays indexed by column name. Event columns have one
+            position per event, q_offsets one more and the rest of qualifier columns one
+            position per qualifier.
+        :param partition_column: str, optional, name of the column with the partition of
+            every event. The events of each partition must be contiguous. Default is None
+            (the store is not partitioned).
+        :return: None
+        """
+        self.__columns = columns
+        self.__size = len(columns['id'])
+        self.__partition_column = partition_column
+        self.__partitions = {}
+        self.__indexed_columns = self.INDEXED_COLUMNS
+        if partition_column is not None:
+            self.__indexed_columns += (partition_column, )
+            self.__partitions = self.__build_partitions(columns[partition_column])
+        self.__q_event = None
+        self.__qualifier_bitmaps = {}
+        self.__sorted_columns = {}
+        self.__compiled_filters = {}
+        self.__indexes = {column: self.__build_index(columns[column]) for column in self.__indexed_columns}
+
+
+    @classmethod
+    def from_events(cls, events, date_decoder = None):
+        """
+        Builds the columnar store from Event objects. The events are consumed one by one,
+        so a generator can be used to avoid keeping all of them in memory.
+
+        :param events: iterable, Event objects in file order.
+        :param date_decoder: TimestampDecoder, optional, decoder of the date columns when
+            the events hold the raw values of the XML attributes. Default is None (the
+            events hold datetime objects).
+        :return: EventStore
+        """
+        event_columns = cls.INT_COLUMNS + cls.FLOAT_COLUMNS + cls.DATE_COLUMNS
+        values = {name: [] for name in event_columns}
+        q_offsets = [0]
+        q_ids = []
+        q_qualifier_ids = []
+        q_values = []
+        for ev in events:
+            for name in event_columns:
+                values[name].append(getattr(ev, name))
+            if isinstance(ev.qualifiers_list, QualifierList):
+                ids, qualifier_ids, qualifier_values = ev.qualifiers_list.get_raw()
+                q_ids.extend(ids)
+                q_qualifier_ids.extend(qualifier_ids)
+                q_values.extend(qualifier_values)
+            else:
+                for q in ev.qualifiers_list:
+                    q_ids.append(q.id)
+                    q_qualifier_ids.append(q.qualifier_id)
+                    q_values.append(q.value)
+            q_offsets.append(len(q_ids))
+
+        columns = {}
+        for name in cls.INT_COLUMNS:
+            columns[name] = np.array(values[name], dtype=np.int64)
+        for name in cls.FLOAT_COLUMNS:
+            columns[name] = np.array(values[name], dtype=np.float64)
+        for name in cls.DATE_COLUMNS:
+            if date_decoder is None:
+                columns[name] = np.array(values[name], dtype='datetime64[us]')
+            else:
+                columns[name] = date_decoder.decode_column(values[name])
+        columns['q_offsets'] = np.array(q_offsets, dtype=np.int64)
+        columns['q_id'] = np.array(q_ids, dtype=np.int64)
+        columns['q_qualifier_id'] = np.array(q_qualifier_ids, dtype=np.int64)
+        columns['q_value'] = np.array(q_values, dtype=object)
+        return cls(columns)
+
+
+    @classmethod
+    def concatenate(cls, stores, partition_column, partition_values):
+        """
+        Builds one store with the events of several stores, one after another, adding a
+        partition column with the value of the store every event comes from.
+
+        :param stores: list of EventStore.
+        :param partition_column: str, name of the partition column (e.g. 'match_id').
+        :param partition_values: list of int, value of the partition of every store. 
+            Values can not be repeated.
+        :return: EventStore
+        """
+        if len(stores) == 0:
+            raise ValueError('There are no stores to concatenate')
+        if len(set(partition_values)) != len(partition_values):
+            raise ValueError(f'Repeated {partition_column} values: {sorted(partition_values)}')
+        columns = cls.__concatenate_columns(stores)
+        columns[partition_column] = np.repeat(np.array(partition_values, dtype=np.int64), 
+                                              [len(store) for store in stores])
+        return cls(columns, partition_column = partition_column)
+
+
+    def update(self, old_positions, delta_rows, delta):
+        """
+        Replaces the events of the store with a new version of them (e.g. a newer snapshot
+        of the same file), reusing the unchanged events. 
+
+        When no event is deleted or moved (changed events keep their position and new
+        events are appended), the inverted indexes are updated only for the changed and
+        inserted events, and only the compiled filters and qualifier bitmaps that can 
+        select them are discarded. Otherwise the indexes are built again.
+
+        :param old_positions: numpy int array, one value per event of the new version in
+            its order: the position of the event in this store, -1 if it is inserted.
+        :param delta_rows: numpy int array, one value per event of the new version in its
+            order: the row of delta with the new values of the event, -1 if it did not change.
+        :param delta: EventStore, the changed and inserted events.
+        :return: EventStore with the events touched by the update: the previous version of
+            the changed and deleted events and the new version of the changed and inserted ones.
+        """
+        if self.__partition_column is not None:
+            raise ValueError('Partitioned stores can not be updated')
+        old_size = self.__size
+        kept = np.zeros(old_size, dtype=bool)
+        kept[old_positions[old_positions >= 0]] = True
+        changed_positions = old_positions[(old_positions >= 0) & (delta_rows >= 0)]
+        deleted_positions = np.flatnonzero(~kept)
+
+        # Positions refer to the events of this store followed by the events of delta
+        combined = self.__concatenate_columns([self, delta])
+        touched = EventStore(self.__take(combined, np.concatenate((changed_positions, deleted_positions, 
+                                                                  old_size + np.arange(len(delta))))))
+        columns = self.__take(combined, np.where(delta_rows >= 0, old_size + delta_rows, old_positions))
+        in_place = (len(deleted_positions) == 0 and 
+                    np.array_equal(old_positions[:old_size], np.arange(old_size)) and
+                    bool(np.all(old_positions[old_size:] < 0)))
+
+        previous_columns = self.__columns
+        self.__columns = columns
+        self.__size = len(columns['id'])
+        self.__q_event = None
+        self.__sorted_columns = {}
+        if in_place:
+            for column in self.__indexed_columns:
+                self.__update_index(column, previous_columns[column], changed_positions, old_size)
+            # Filters that can not select any touched event return the same positions
+            self.__compiled_filters = {signature: entry for signature, entry in self.__compiled_filters.items()
+                                        if len(touched.filter(entry[0])) == 0}
+            touched_qualifier_ids = set(touched.get_column('q_qualifier_id').tolist())
+            num_bytes = (self.__size + 7) // 8
+            self.__qualifier_bitmaps = {qualifier_id: np.concatenate((bitmap, np.zeros(num_bytes - len(bitmap), dtype=np.uint8)))
+                                        for qualifier_id, bitmap in self.__qualifier_bitmaps.items() 
+                                        if qualifier_id not in touched_qualifier_ids}
+        else:
+            self.__compiled_filters = {}
+            self.__qualifier_bitmaps = {}
+            self.__indexes = {column: self.__build_index(columns[column]) for column in self.__indexed_columns}
+        return touched
+
+
+    def __len__(self):
+        return self.__size
+
+
+    def get_column(self, name):
+        return self.__columns[name]
+
+
+    def get_columns(self):
+        return self.__columns
+
+
+    def get_partition_column(self):
+        return self.__partition_column
+
+
+    def get_partition_values(self):
+        return list(self.__partitions)
+
+
+    def get_partition(self, value):
+        """
+        Store with the events of a partition. Its columns are slices of the columns of
+        this store (no data is copied) and it keeps the partition column.
+
+        :param value: int, value of the partition column.
+        :return: EventStore
+        """
+        if value not in self.__partitions:
+            raise KeyError(f'Unknown {self.__partition_column}: {value}')
+        start, end = self.__partitions[value]
+        q_start = self.__columns['q_offsets'][start]
+        q_end = self.__columns['q_offsets'][end]
+        columns = {name: values[start:end] for name, values in self.__columns.items() 
+                    if name not in self.QUALIFIER_COLUMNS}
+        columns['q_offsets'] = self.__columns['q_offsets'][start:end + 1] - q_start
+        for name in self.QUALIFIER_COLUMNS[1:]:
+            columns[name] = self.__columns[name][q_start:q_end]
+        return EventStore(columns, partition_column = self.__partition_column)
+
+
+    def get_positions(self, column, value):
+        """
+        Posting list of an indexed column: sorted positions of the events whose column
+        has the given value.
+
+        :param column: str, one of INDEXED_COLUMNS or the partition column.
+        :param value: int, value of the column.
+        :return: read-only numpy array with the positions (empty if no event has that value).
+        """
+        return self.__indexes[column].get(value, self.__empty_positions())
+
+
+    def get_mask(self, name, criteria):
+        """
+        Evaluates a Criteria over a whole column.
+
+        :param name: str, name of the column.
+        :param criteria: Criteria, condition to apply to every value of the column.
+        :return: numpy boolean array with one position per event.
+        """
+        return criteria.perform_vectorized_operation(self.__columns[name])
+
+
+    def get_qualifiers_mask(self, criteria):
+        """
+        Evaluates a qualifier Criteria (QIN or QNIN) over all the events, combining the
+        presence bitmaps of the qualifier_ids in criteria.value.
+
+        :param criteria: Criteria, with operator Operator.QIN or Operator.QNIN.
+        :return: numpy boolean array with one position per event.
+        """
+        return np.unpackbits(self.__get_qualifiers_bitmap(criteria), count=self.__size).astype(bool)
+
+
+    def filter(self, criteria_list):
+        """
+        Positions of the events that satisfy every criteria of the list. The list is 
+        compiled the first time it is seen and the compiled filter is reused afterwards
+        for any list with the same signature.
+
+        :param criteria_list: list of tuples (column, Criteria). Qualifier criteria (QIN, 
+            QNIN) use the column name 'qualifiers'.
+        :return: numpy array with the positions of the events, in file order.
+        """
+        signature = tuple(sorted(((column, criteria.get_signature()) for column, criteria in criteria_list), key=repr))
+        entry = self.__compiled_filters.get(signature)
+        if entry is None:
+            entry = (list(criteria_list), self.__compile_filter(criteria_list))
+            if len(self.__compiled_filters) >= self.MAX_COMPILED_FILTERS:
+                # Drop the oldest compiled filter (dicts keep insertion order)
+                del self.__compiled_filters[next(iter(self.__compiled_filters))]
+            self.__compiled_filters[signature] = entry
+        return entry[1]()
+
+
+    def get_qualifier_values(self, qualifier_id, positions):
+        """
+        Value of the first qualifier with the given qualifier_id of each event.
+
+        :param qualifier_id: int, identifier of the qualifier.
+        :param positions: numpy array, positions of the events.
+        :return: list with the qualifier value of each event, None if the event has not
+            got that qualifier.
+        """
+        rows = np.flatnonzero(self.__columns['q_qualifier_id'] == qualifier_id)
+        # Rows are sorted by event, so return_index gives the first qualifier of each one
+        q_events, first_rows = np.unique(self.__get_q_event()[rows], return_index=True)
+        values = np.full(len(positions), None, dtype=object)
+        if len(q_events) > 0:
+            idx = np.minimum(np.searchsorted(q_events, positions), len(q_events) - 1)
+            found = q_events[idx] == positions
+            values[found] = self.__columns['q_value'][rows[first_rows[idx[found]]]]
+        return values.tolist()
+
+
+    def get_event(self, position):
+        """
+        Event object of a position of the store. Its qualifiers_list is a QualifierList
+        over the qualifier columns, so Qualifier objects are only built if it is read.
+
+        :param position: int, position of the event.
+        :return: Event
+        """
+        values = {name: self.__columns[name][position].item() for name in 
+                    self.INT_COLUMNS + self.FLOAT_COLUMNS + self.DATE_COLUMNS}
+        start = self.__columns['q_offsets'][position]
+        end = self.__columns['q_offsets'][position + 1]
+        qualifiers_list = QualifierList(self.__columns['q_id'][start:end], 
+                                        self.__columns['q_qualifier_id'][start:end],
+                                        self.__columns['q_value'][start:end])
+        return Event(qualifiers_list = qualifiers_list, **values)
+
+
+    def get_qualifiers(self, position):
+        """
+        Qualifiers of an event as a list of dicts with their id, qualifier_id and value.
+
+        :param position: int, position of the event.
+        :return: list of dicts.
+        """
+        start = self.__columns['q_offsets'][position]
+        end = self.__columns['q_offsets'][position + 1]
+        return [{"id": id, "qualifier_id": qualifier_id, "value": value} for id, qualifier_id, value in
+                    zip(self.__columns['q_id'][start:end].tolist(),
+                        self.__columns['q_qualifier_id'][start:end].tolist(),
+                        self.__columns['q_value'][start:end].tolist())]
+
+
+    def __compile_filter(self, criteria_list):
+        # EQ/IN criteria over indexed columns are solved with the posting lists of the
+        # inverted indexes, starting from the shortest one. The rest of criteria become 
+        # steps that keep the positions satisfying them. Steps are sorted by the number of
+        # events they let through, so the most selective ones see the most positions.
+        # update keeps the filters that can not select any touched event, so their 
+        # candidates are still valid, but the steps read the columns and qualifier bitmaps
+        # of the store when they are called, not the ones of the version they were
+        # compiled for
+        postings = []
+        steps = []
+        for column, criteria in criteria_list:
+            if column in self.__indexed_columns and criteria.operator in (Operator.EQ, Operator.IN):
+                values = [criteria.value] if criteria.operator == Operator.EQ else set(criteria.value)
+                postings.append(self.__union_positions([self.get_positions(column, value) for value in values]))
+            elif criteria.operator in (Operator.QIN, Operator.QNIN):
+                steps.append((int(np.count_nonzero(self.get_qualifiers_mask(criteria))), 
+                              lambda positions, criteria=criteria: self.__get_qualifiers_matches(criteria, positions)))
+            else:
+                operation = criteria.compile_vectorized_operation()
+                steps.append((self.__estimate_matches(column, criteria), 
+                              lambda positions, column=column, operation=operation: 
+                                    operation(self.__columns[column] if positions is None 
+                                              else self.__columns[column][positions])))
+        steps.sort(key=lambda step: step[0])
+
+        candidates = None
+        for posting in sorted(postings, key=len):
+            candidates = posting if candidates is None else self.__intersect_positions(candidates, posting)
+
+        def compiled_filter():
+            positions = candidates
+            for _, step in steps:
+                if positions is not None and len(positions) == 0:
+                    break
+                matches = step(positions)
+                positions = np.flatnonzero(matches) if positions is None else positions[matches]
+            return np.arange(self.__size) if positions is None else positions
+        return compiled_filter
+
+
+    def __estimate_matches(self, column, criteria):
+        # Number of events matching a column criteria, counted with binary searches over a
+        # sorted copy of the column
+        sorted_values = self.__sorted_columns.get(column)
+        if sorted_values is None:
+            sorted_values = np.sort(self.__columns[column])
+            self.__sorted_columns[column] = sorted_values
+        def count_between(low, high):
+            return int(np.searchsorted(sorted_values, high, side='right') - np.searchsorted(sorted_values, low, side='left'))
+        operator = criteria.operator
+        if operator in (Operator.EQ, Operator.NEQ):
+            matches = count_between(criteria.value, criteria.value)
+            return matches if operator == Operator.EQ else self.__size - matches
+        elif operator in (Operator.IN, Operator.NIN):
+            matches = sum(count_between(value, value) for value in set(criteria.value))
+            return matches if operator == Operator.IN else self.__size - matches
+        elif operator == Operator.LT:
+            return int(np.searchsorted(sorted_values, float(criteria.value), side='left'))
+        elif operator == Operator.LTE:
+            return int(np.searchsorted(sorted_values, float(criteria.value), side='right'))
+        elif operator == Operator.GT:
+            return self.__size - int(np.searchsorted(sorted_values, float(criteria.value), side='right'))
+        elif operator == Operator.GTE:
+            return self.__size - int(np.searchsorted(sorted_values, float(criteria.value), side='left'))
+        elif operator == Operator.BW:
+            return count_between(float(criteria.value[0]), float(criteria.value[1]))
+        return self.__size
+
+
+    @classmethod
+    def __concatenate_columns(cls, stores):
+        columns = {}
+        for name in cls.INT_COLUMNS + cls.FLOAT_COLUMNS + cls.DATE_COLUMNS + cls.QUALIFIER_COLUMNS[1:]:
+            columns[name] = np.concatenate([store.get_column(name) for store in stores])
+        # Offsets of every store are shifted by the qualifiers of the stores before it
+        num_qualifiers = np.cumsum([0] + [len(store.get_column('q_id')) for store in stores])
+        columns['q_offsets'] = np.concatenate([np.zeros(1, dtype=np.int64)] +
+                                    [store.get_column('q_offsets')[1:] + shift 
+                                        for store, shift in zip(stores, num_qualifiers.tolist())])
+        return columns
+
+
+    @classmethod
+    def __take(cls, columns, positions):
+        # Columns with the events at the given positions, in that order
+        taken = {name: columns[name][positions] for name in cls.INT_COLUMNS + cls.FLOAT_COLUMNS + cls.DATE_COLUMNS}
+        starts = columns['q_offsets'][positions]
+        lengths = columns['q_offsets'][positions + 1] - starts
+        offsets = np.concatenate((np.zeros(1, dtype=np.int64), np.cumsum(lengths)))
+        # Qualifier rows of every event: its start plus 0, 1, ... length - 1
+        rows = np.repeat(starts - offsets[:-1], lengths) + np.arange(offsets[-1])
+        taken['q_offsets'] = offsets
+        for name in cls.QUALIFIER_COLUMNS[1:]:
+            taken[name] = columns[name][rows]
+        return taken
+
+
+    def __update_index(self, column, previous_values, changed_positions, old_size):
+        # Posting lists only change for the changed events whose value changed and for 
+        # the appended events, whose positions are greater than any other
+        index = self.__indexes[column]
+        values = self.__columns[column]
+        moved = changed_positions[previous_values[changed_positions] != values[changed_positions]]
+        for position, previous_value, value in zip(moved.tolist(), previous_values[moved].tolist(), values[moved].tolist()):
+            posting = index[previous_value]
+            posting = np.delete(posting, np.searchsorted(posting, position))
+            if len(posting) == 0:
+                del index[previous_value]
+            else:
+                index[previous_value] = self.__read_only(posting)
+            posting = index.get(value, self.__empty_positions())
+            index[value] = self.__read_only(np.insert(posting, np.searchsorted(posting, position), position))
+        appended = np.arange(old_size, self.__size)
+        for value, positions in self.__build_index(values[old_size:]).items():
+            index[value] = self.__read_only(np.concatenate((index.get(value, self.__empty_positions()), 
+                                                            appended[positions])))
+
+
+    @staticmethod
+    def __read_only(positions):
+        positions.setflags(write=False)
+        return positions
+
+
+    @staticmethod
+    def __build_partitions(values):
+        # Partition value -> (start, end) positions of its events
+        if len(values) == 0:
+            return {}
+        starts = np.flatnonzero(np.concatenate(([True], values[1:] != values[:-1])))
+        ends = np.append(starts[1:], len(values))
+        partitions = {}
+        for value, start, end in zip(values[starts].tolist(), starts.tolist(), ends.tolist()):
+            if value in partitions:
+                raise ValueError(f'The events of the partition {value} are not contiguous')
+            partitions[value] = (start, end)
+        return partitions
+
+
+    def __build_index(self, values):
+        # Stable sort keeps the positions of each value in file order
+        order = np.argsort(values, kind='stable')
+        keys, starts = np.unique(values[order], return_index=True)
+        index = {}
+        for key, posting in zip(keys.tolist(), np.split(order, starts[1:])):
+            posting.setflags(write=False)
+            index[key] = posting
+        return index
+
+
+    def __union_positions(self, posting_lists):
+        # Posting lists of different values of a column never share positions
+        if len(posting_lists) == 0:
+            return self.__empty_positions()
+        elif len(posting_lists) == 1:
+            return posting_lists[0]
+        return np.sort(np.concatenate(posting_lists))
+
+
+    @staticmethod
+    def __intersect_positions(shorter, longer):
+        # Binary search of the shorter posting list in the longer one, so the cost 
+        # depends on the size of the shorter list
+        if len(shorter) == 0 or len(longer) == 0:
+            return shorter[:0]
+        idx = np.minimum(np.searchsorted(longer, shorter), len(longer) - 1)
+        return shorter[longer[idx] == shorter]
+
+
+    @staticmethod
+    def __empty_positions():
+        return np.empty(0, dtype=np.int64)
+
+
+    def __get_q_event(self):
+        # Position of the event owning each qualifier row (the CSR offsets expanded)
+        if self.__q_event is None:
+            self.__q_event = np.repeat(np.arange(self.__size), np.diff(self.__columns['q_offsets']))
+        return self.__q_event
+
+
+    def __get_qualifiers_bitmap(self, criteria):
+        bitmap = np.zeros((self.__size + 7) // 8, dtype=np.uint8)
+        for qualifier_id in criteria.value:
+            np.bitwise_or(bitmap, self.__get_qualifier_bitmap(qualifier_id), out=bitmap)
+        if criteria.operator == Operator.QNIN:
+            np.bitwise_not(bitmap, out=bitmap)
+        elif criteria.operator != Operator.QIN:
+            raise ValueError(f"Operator {criteria.operator} is not a qualifier operator")
+        return bitmap
+
+
+    def __get_qualifiers_matches(self, criteria, positions):
+        # Qualifier criteria evaluated only at some positions (all of them if None), reading
+        # their bits from the packed bitmap (the first position is the highest bit of a byte)
+        if positions is None:
+            return self.get_qualifiers_mask(criteria)
+        bitmap = self.__get_qualifiers_bitmap(criteria)
+        return ((bitmap[positions >> 3] >> (7 - (positions & 7))) & 1).astype(bool)
+
+
+    def __get_qualifier_bitmap(self, qualifier_id):
+        bitmap = self.__qualifier_bitmaps.get(qualifier_id)
+        if bitmap is None:
+            presence = np.zeros(self.__size, dtype=bool)
+            presence[self.__get_q_event()[self.__columns['q_qualifier_id'] == qualifier_id]] = True
+            bitmap = np.packbits(presence)
+            self.__qualifier_bitmaps[qualifier_id] = bitmap
+        return bitmap
@@ -1,10 +1,10 @@
 import base64
 import io
 import os
-from datetime import datetime
 from random import sample
 import xml.etree.ElementTree as ET
 
+import numpy as np
 import pandas as pd
 import seaborn as sns
 import matplotlib.pyplot as plt
@@ -15,26 +15,203 @@ from constants import EVENT_IDS, QUALIFIER_IDS, UNDEFINED_INT, UNDEFINED_FLOAT,
 from Operator import *
 from criteria import Criteria
 from event import Event
+from event_store import EventStore
 from game import Game
-from qualifier import Qualifier
+from opta_source import OptaSource
+from parse_cache import ParseCache
+from pass_matrix_builder import PassMatrixBuilder
+from qualifier import QualifierList
+from query_cache import QueryCache
+from stat_tables import StatTables
+from timestamps import TimestampDecoder
 
 
 class Events:
-    
-    def __init__(self, file_path):
-        self.__game = None
-        self.__df_players = []
-        self.__df_teams = []
-        self.__event_list = []        
-        self.__parse_f24opta_file(file_path)
+
+    # Criteria on the event type and the qualifiers that select the events of every stat
+    __STAT_CRITERIA = {
+        'passes': {'crit_event_type_id': Criteria(Operator.EQ, EVENT_IDS['Pass']),
+                    'crit_qualifiers': Criteria(Operator.QNIN,
+                            [QUALIFIER_IDS['Cross'], QUALIFIER_IDS['Free kick taken'],
+                            QUALIFIER_IDS['Corner taken'], QUALIFIER_IDS['Throw In'],
+                            QUALIFIER_IDS['Keeper Throw'], QUALIFIER_IDS['Goal Kick']])},
+        'aerial_duels': {'crit_event_type_id': Criteria(Operator.EQ, EVENT_IDS['Aerial'])},
+        'fouls': {'crit_event_type_id': Criteria(Operator.EQ, EVENT_IDS['Free kick'])},
+        'ball_recoveries': {'crit_event_type_id': Criteria(Operator.EQ, EVENT_IDS['Ball recovery'])},
+        'clearances': {'crit_event_type_id': Criteria(Operator.EQ, EVENT_IDS['Clearance'])},
+        'corners': {'crit_event_type_id': Criteria(Operator.EQ, EVENT_IDS['Pass']),
+                    'crit_qualifiers': Criteria(Operator.QIN, [QUALIFIER_IDS['Corner taken']])},
+        'shots': {'crit_event_type_id': Criteria(Operator.IN, [ EVENT_IDS['Miss'], EVENT_IDS['Post'],
+                                                    EVENT_IDS['Attempt Saved'], EVENT_IDS['Goal'] ])},
+        'crosses': {'crit_event_type_id': Criteria(Operator.EQ, EVENT_IDS['Pass']),
+                    'crit_qualifiers': Criteria(Operator.QIN, [QUALIFIER_IDS['Cross']]),
+                    'extra_crit_qualifiers': Criteria(Operator.QNIN,
+                            [QUALIFIER_IDS['Free kick taken'],QUALIFIER_IDS['Corner taken']])},
+        'tackles': {'crit_event_type_id': Criteria(Operator.EQ, EVENT_IDS['Tackle'])},
+        'interceptions': {'crit_event_type_id': Criteria(Operator.EQ, EVENT_IDS['Interception'])}
+    }
+
+    # Name of every stat in the get_stats_* tables with the labels of its outcome 1 and outcome 0
+    # columns. Stats with a single outcome column have None as the outcome 0 label
+    __STAT_LABELS = {
+        'passes': ('passes', 'successful', 'unsuccessful'),
+        'aerial_duels': ('aerial duels', 'successful', 'unsuccessful'),
+        'fouls': ('fouls', 'won', 'conceded'),
+        'ball_recoveries': ('ball recoveries', 'won', None),
+        'clearances': ('clearances', 'won', 'lost'),
+        'corners': ('corners', 'taken', None),
+        'crosses': ('crosses', 'successful', 'unsuccessful'),
+        'tackles': ('tackles', 'won possession', 'no possession'),
+        'interceptions': ('interceptions', 'successful', None)
+    }
+
+    # Columns of the get_df_* frames of every stat taken from the qualifiers of the events
+    __STAT_QUALIFIER_COLUMNS = {
+        'passes': {"x_end": QUALIFIER_IDS['Pass End X'], "y_end": QUALIFIER_IDS['Pass End Y']},
+        'corners': {"x_end": QUALIFIER_IDS['Pass End X'], "y_end": QUALIFIER_IDS['Pass End Y']},
+        'crosses': {"x_end": QUALIFIER_IDS['Pass End X'], "y_end": QUALIFIER_IDS['Pass End Y']},
+        'shots': {"goalmouth_y": QUALIFIER_IDS['Goal Mouth Y Coordinate'], 
+                "goalmouth_z": QUALIFIER_IDS['Goal Mouth Z Coordinate']}
+    }
+
+    def __init__(self, file_path, streaming = False, query_cache_size = 128, cache_dir = None,
+                 type_ids = None, predicate = None):
+        self.__init_state(query_cache_size, type_ids, predicate)
+        if cache_dir is not None and predicate is not None:
+            raise ValueError('Events loaded with a predicate can not be cached')
+        if cache_dir is not None:
+            self.__load_f24opta_file_cached(file_path, streaming, cache_dir)
+        elif streaming:
+            self.__parse_f24opta_file_streaming(file_path)
+        else:
+            self.__parse_f24opta_file(file_path)
         self.__set_initial_players_df()
 
 
+    @classmethod
+    def from_event_store(cls, event_store, df_teams, game = None, roster = None, type_ids = None,
+                         query_cache_size = 128):
+        events = cls.__new__(cls)
+        events.__init_state(query_cache_size, type_ids, None)
+        events.__event_store = event_store
+        events.__df_teams = df_teams
+        events.__game = game
+        events.__roster = roster
+        events.__set_initial_players_df()
+        return events
+
+
+    @classmethod
+    def from_columnar(cls, metadata, columns, query_cache_size = 128):
+        events = cls.__new__(cls)
+        events.__init_state(query_cache_size, metadata.get('type_ids'), None)
+        # The predicate itself is not kept, only that the events were filtered with one
+        events.__predicate_filtered = metadata.get('predicate_filtered', False)
+        events.__set_columnar(metadata, columns)
+        events.__set_initial_players_df()
+        return events
+
+
+    def to_columnar(self):
+        # Compact representation of the parsed file (see ParseCache): a metadata dict and
+        # the columns of the event store, plus the roster when the events were filtered
+        columns = dict(self.__event_store.get_columns())
+        if self.__roster is not None:
+            columns.update({f'roster_{name}': self.__roster[name] for name in ('team_id', 'player_id')})
+        metadata = {'game': ParseCache.object_to_dict(self.__game),
+                    'type_ids': None if self.__type_ids is None else sorted(self.__type_ids),
+                    'predicate_filtered': self.__predicate_filtered,
+                    'partition_column': self.__event_store.get_partition_column()}
+        return metadata, columns
+
+
+    @classmethod
+    def get_stat_names(cls):
+        return list(cls.__STAT_CRITERIA)
+
+
+    @classmethod
+    def get_stat_labels(cls, stat):
+        return cls.__STAT_LABELS.get(stat)
+
+
+    @classmethod
+    def get_stat_criteria(cls, stat):
+        return dict(cls.__STAT_CRITERIA[stat])
+
+
     def set_squads_info(self, file_path):
         df = self.__parse_squad_file(file_path)
         # Due to loans or tranfers there may be duplicate players
         df.drop_duplicates(inplace = True)
+        self.__df_squads.append(df)
         self.__df_players = pd.merge(self.__df_players, df, left_on='player_id', right_on='player_id', how='inner')
+        # Cached frames were merged with the previous players info
+        self.__query_cache.clear()
+
+
+    def update_from(self, file_path, fn_on_event = None):
+        store = self.__event_store
+        if store.get_partition_column() is not None:
+            raise ValueError('Events of several matches can not be updated from a file')
+        with OptaSource.open(file_path) as f:
+            root = ET.parse(f).getroot()
+        game_tag = root.find('Game')
+        self.__game = self.__parse_game_tag(game_tag)
+
+        # Only the id and last_modified of every event are read: events are only parsed
+        # if they are new or were modified after the loaded version
+        positions_by_id = dict(zip(store.get_column('id').tolist(), range(len(store))))
+        last_modified = store.get_column('last_modified').tolist()
+        old_positions = []
+        delta_rows = []
+        delta_tags = []
+        self.__roster = None
+        for event_tag in game_tag.iter('Event'):
+            if not self.__is_event_tag_selected(event_tag):
+                continue
+            # Each loaded event is matched once, so a repeated id is a new event
+            position = positions_by_id.pop(self.__tag_value_to_int(event_tag.get('id')), -1)
+            old_positions.append(position)
+            if position >= 0:
+                event_last_modified = self.__timestamp_decoder.decode(event_tag.get('last_modified'))
+                # Dates that can not be decoded can not be compared
+                if event_last_modified != UNDEFINED_DATE and event_last_modified == last_modified[position]:
+                    delta_rows.append(-1)
+                    continue
+            delta_rows.append(len(delta_tags))
+            delta_tags.append(event_tag)
+        self.__close_roster()
+
+        old_positions = np.array(old_positions, dtype=np.int64)
+        num_changed = int(np.count_nonzero(old_positions >= 0)) - delta_rows.count(-1)
+        changes = {'inserted': len(delta_tags) - num_changed, 'changed': num_changed, 
+                    'deleted': len(positions_by_id)}
+        if len(delta_tags) > 0 or len(positions_by_id) > 0:
+            delta = EventStore.from_events((self.__parse_event_tag(event_tag) for event_tag in delta_tags),
+                                           date_decoder = self.__timestamp_decoder)
+            delta_rows = np.array(delta_rows, dtype=np.int64)
+            # Previous versions are read before the store is updated
+            changed_events = [] if fn_on_event is None else self.__get_changed_events(store, delta, old_positions, 
+                                                                    delta_rows, list(positions_by_id.values()))
+            touched = store.update(old_positions, delta_rows, delta)
+            self.__query_cache.invalidate(lambda key: self.__is_query_affected(key, touched))
+            for old_event, new_event in changed_events:
+                fn_on_event(old_event, new_event)
+        self.__refresh_players_df()
+        return changes
+
+
+    def get_query_cache_info(self):
+        return self.__query_cache.get_info()
+
+
+    def get_loaded_type_ids(self):
+        return self.__type_ids
+
+
+    def is_predicate_filtered(self):
+        return self.__predicate_filtered
 
 
     def get_df_players(self):
@@ -49,44 +226,37 @@ class Events:
         return self.__game
 
 
-    def get_df_all_events(self):
-        events_list = list(map(lambda ev: {"id": ev.id, "event_id": ev.event_id, "type_id": ev.type_id, "period_id": ev.period_id,
-                                            "min": ev.min, "sec": ev.sec, "player_id": ev.player_id,
-                                            "team_id": ev.team_id, "outcome": ev.outcome, 
-                                            "x_start": ev.x, "y_start": ev.y,
-                                            "qualifiers": [{"id": x.id, "qualifier_id": x.qualifier_id, "value": x.value} for x in ev.qualifiers_list]}, self.__filter_event_list()))
-        df = pd.DataFrame(events_list)
-        return self.__merge_df_with_players_and_teams_info(df)
+    def get_event_store(self):
+        return self.__event_store
 
 
-    def get_df_passes(self, player_id = None, team_id = None, period_id = None):
-        criteria_event_type_id = Criteria(Operator.EQ, EVENT_IDS['Pass'])
-        criteria_passes_qualifiers = Criteria(Operator.QNIN, 
-                            [QUALIFIER_IDS['Cross'], QUALIFIER_IDS['Free kick taken'],
-                            QUALIFIER_IDS['Corner taken'], QUALIFIER_IDS['Throw In'],
-                            QUALIFIER_IDS['Keeper Throw'], QUALIFIER_IDS['Goal Kick']])
-        criteria_player_id = None if player_id is None else Criteria(Operator.EQ, player_id)
-        criteria_team_id = None if team_id is None else Criteria(Operator.EQ, team_id)
-        criteria_period_id = None if period_id is None else Criteria(Operator.EQ, period_id)
+    def get_roster(self):
+        return self.__roster
 
-        filtered_list = self.__filter_event_list(crit_event_type_id = criteria_event_type_id, 
-                                                crit_team_id = criteria_team_id,
-                                                crit_player_id = criteria_player_id,
-                                                crit_period_id = criteria_period_id, 
-                                                crit_qualifiers = criteria_passes_qualifiers)
 
-        if len(filtered_list) == 0:
-            return pd.DataFrame(columns = ['id', 'event_id', 'period_id', 'min', 'sec', 'player_id', 
-                            'team_id', 'outcome', 'x_start', 'y_start', 'x_end', 'y_end'])
-        else:
-            passes = list(map(lambda ev: {"id": ev.id, "event_id": ev.event_id, "period_id": ev.period_id,
-                                            "min": ev.min, "sec": ev.sec, "player_id": ev.player_id,
-                                            "team_id": ev.team_id, "outcome": ev.outcome, 
-                                            "x_start": ev.x, "y_start": ev.y, 
-                                            "x_end": next((q.value for q in ev.qualifiers_list if q.qualifier_id == QUALIFIER_IDS['Pass End X']), None),
-                                            "y_end": next((q.value for q in ev.qualifiers_list if q.qualifier_id == QUALIFIER_IDS['Pass End Y']), None)}, filtered_list))
-            df = pd.DataFrame(passes)
-            return self.__merge_df_with_players_and_teams_info(df)
+    def get_df_all_events(self, allow_filtered = False):
+        """
+        All the loaded events of the match.
+
+        :param allow_filtered: bool, optional, return the loaded events even if they were
+            filtered (type_ids or predicate), so they are only a part of the events of the
+            match. Default is False (filtered events raise ValueError).
+        :return: DataFrame
+        """
+        if not allow_filtered:
+            if self.__predicate_filtered:
+                raise ValueError('The events were filtered (predicate), so they are not all the events '
+                                 'of the match: use get_df_all_events(allow_filtered = True) to get them')
+            if self.__type_ids is not None:
+                raise ValueError(f'Only the types {sorted(self.__type_ids)} were loaded (type_ids), so the events '
+                                 'are not all the events of the match: use get_df_all_events(allow_filtered = True) '
+                                 'to get them')
+        return self.__query_cache.get(('get_df_all_events', ), self.__build_df_all_events)
+
+
+    def get_df_passes(self, player_id = None, team_id = None, period_id = None):
+        return self.__query_cache.get(('get_df_passes', player_id, team_id, period_id),
+                    lambda: self.__build_df_stat('passes', player_id, team_id, period_id))
 
 
     def get_df_passes_successful(self, player_id = None, team_id = None, period_id = None):
@@ -100,26 +270,8 @@ class Events:
 
 
     def get_df_aerial_duels(self, player_id = None, team_id = None, period_id = None):
-        criteria_event_type_id = Criteria(Operator.EQ, EVENT_IDS['Aerial'])
-        criteria_player_id = None if player_id is None else Criteria(Operator.EQ, player_id)
-        criteria_team_id_id = None if team_id is None else Criteria(Operator.EQ, team_id)
-        criteria_period_id = None if period_id is None else Criteria(Operator.EQ, period_id)
-
-        filtered_list = self.__filter_event_list(crit_event_type_id = criteria_event_type_id, 
-                                                crit_team_id = criteria_team_id_id,
-                                                crit_player_id = criteria_player_id,
-                                                crit_period_id = criteria_period_id)
-
-        if len(filtered_list) == 0:
-            return pd.DataFrame(columns=['id', 'event_id', 'period_id', 'min', 'sec', 'player_id', 
-                            'team_id', 'outcome', 'x_start', 'y_start'])
-        else:
-            aerials = list(map(lambda ev: {"id": ev.id, "event_id": ev.event_id, "period_id": ev.period_id,
-                                            "min": ev.min, "sec": ev.sec, "player_id": ev.player_id,
-                                            "team_id": ev.team_id, "outcome": ev.outcome, 
-                                            "x_start": ev.x, "y_start": ev.y}, filtered_list))
-            df = pd.DataFrame(aerials)
-            return self.__merge_df_with_players_and_teams_info(df)
+        return self.__query_cache.get(('get_df_aerial_duels', player_id, team_id, period_id),
+                    lambda: self.__build_df_stat('aerial_duels', player_id, team_id, period_id))
 
 
     def get_df_aerial_duels_successful(self, player_id = None, team_id = None, period_id = None):
@@ -133,26 +285,8 @@ class Events:
 
 
     def get_df_fouls(self, player_id = None, team_id = None, period_id = None):
-        criteria_event_type_id = Criteria(Operator.EQ, EVENT_IDS['Free kick'])
-        criteria_player_id = None if player_id is None else Criteria(Operator.EQ, player_id)
-        criteria_team_id_id = None if team_id is None else Criteria(Operator.EQ, team_id)
-        criteria_period_id = None if period_id is None else Criteria(Operator.EQ, period_id)
-
-        filtered_list = self.__filter_event_list(crit_event_type_id = criteria_event_type_id, 
-                                                crit_team_id = criteria_team_id_id,
-                                                crit_player_id = criteria_player_id,
-                                                crit_period_id = criteria_period_id)
-
-        if len(filtered_list) == 0:
-            return pd.DataFrame(columns=['id', 'event_id', 'period_id', 'min', 'sec', 'player_id', 
-                            'team_id', 'outcome', 'x_start', 'y_start'])
-        else:
-            fouls = list(map(lambda ev: {"id": ev.id, "event_id": ev.event_id, "period_id": ev.period_id,
-                                            "min": ev.min, "sec": ev.sec, "player_id": ev.player_id,
-                                            "team_id": ev.team_id, "outcome": ev.outcome, 
-                                            "x_start": ev.x, "y_start": ev.y}, filtered_list))
-            df = pd.DataFrame(fouls)
-            return self.__merge_df_with_players_and_teams_info(df)
+        return self.__query_cache.get(('get_df_fouls', player_id, team_id, period_id),
+                    lambda: self.__build_df_stat('fouls', player_id, team_id, period_id))
 
 
     def get_df_fouls_won(self, player_id = None, team_id = None, period_id = None):
@@ -166,49 +300,13 @@ class Events:
 
 
     def get_df_ball_recoveries(self, player_id = None, team_id = None, period_id = None):
-        criteria_event_type_id = Criteria(Operator.EQ, EVENT_IDS['Ball recovery'])
-        criteria_player_id = None if player_id is None else Criteria(Operator.EQ, player_id)
-        criteria_team_id_id = None if team_id is None else Criteria(Operator.EQ, team_id)
-        criteria_period_id = None if period_id is None else Criteria(Operator.EQ, period_id)
-
-        filtered_list = self.__filter_event_list(crit_event_type_id = criteria_event_type_id, 
-                                                crit_team_id = criteria_team_id_id,
-                                                crit_player_id = criteria_player_id,
-                                                crit_period_id = criteria_period_id)
-
-        if len(filtered_list) == 0:
-            return pd.DataFrame(columns=['id', 'event_id', 'period_id', 'min', 'sec', 'player_id', 
-                            'team_id', 'outcome', 'x_start', 'y_start'])
-        else:
-            recoveries = list(map(lambda ev: {"id": ev.id, "event_id": ev.event_id, "period_id": ev.period_id,
-                                            "min": ev.min, "sec": ev.sec, "player_id": ev.player_id,
-                                            "team_id": ev.team_id, "outcome": ev.outcome, 
-                                            "x_start": ev.x, "y_start": ev.y}, filtered_list))
-            df = pd.DataFrame(recoveries)
-            return self.__merge_df_with_players_and_teams_info(df)
+        return self.__query_cache.get(('get_df_ball_recoveries', player_id, team_id, period_id),
+                    lambda: self.__build_df_stat('ball_recoveries', player_id, team_id, period_id))
 
 
     def get_df_clearances(self, player_id = None, team_id = None, period_id = None):
-        criteria_event_type_id = Criteria(Operator.EQ, EVENT_IDS['Clearance'])
-        criteria_player_id = None if player_id is None else Criteria(Operator.EQ, player_id)
-        criteria_team_id_id = None if team_id is None else Criteria(Operator.EQ, team_id)
-        criteria_period_id = None if period_id is None else Criteria(Operator.EQ, period_id)
-
-        filtered_list = self.__filter_event_list(crit_event_type_id = criteria_event_type_id, 
-                                                crit_team_id = criteria_team_id_id,
-                                                crit_player_id = criteria_player_id,
-                                                crit_period_id = criteria_period_id)
-
-        if len(filtered_list) == 0:
-            return pd.DataFrame(columns=['id', 'event_id', 'period_id', 'min', 'sec', 'player_id', 
-                            'team_id', 'outcome', 'x_start', 'y_start'])
-        else:
-            clearances = list(map(lambda ev: {"id": ev.id, "event_id": ev.event_id, "period_id": ev.period_id,
-                                            "min": ev.min, "sec": ev.sec, "player_id": ev.player_id,
-                                            "team_id": ev.team_id, "outcome": ev.outcome, 
-                                            "x_start": ev.x, "y_start": ev.y}, filtered_list))
-            df = pd.DataFrame(clearances)
-            return self.__merge_df_with_players_and_teams_info(df)
+        return self.__query_cache.get(('get_df_clearances', player_id, team_id, period_id),
+                    lambda: self.__build_df_stat('clearances', player_id, team_id, period_id))
 
 
     def get_df_clearances_won(self, player_id = None, team_id = None, period_id = None):
@@ -222,93 +320,18 @@ class Events:
 
 
     def get_df_corners(self, player_id = None, team_id = None, period_id = None):
-        criteria_event_type_id = Criteria(Operator.EQ, EVENT_IDS['Pass'])
-        criteria_corners_qualifiers = Criteria(Operator.QIN, 
-                            [QUALIFIER_IDS['Corner taken']])
-        criteria_player_id = None if player_id is None else Criteria(Operator.EQ, player_id)
-        criteria_team_id = None if team_id is None else Criteria(Operator.EQ, team_id)
-        criteria_period_id = None if period_id is None else Criteria(Operator.EQ, period_id)
-
-        filtered_list = self.__filter_event_list(crit_event_type_id = criteria_event_type_id, 
-                                                crit_team_id = criteria_team_id,
-                                                crit_player_id = criteria_player_id,
-                                                crit_period_id = criteria_period_id, 
-                                                crit_qualifiers = criteria_corners_qualifiers)
-
-        if len(filtered_list) == 0:
-            return pd.DataFrame(columns = ['id', 'event_id', 'period_id', 'min', 'sec', 'player_id', 
-                            'team_id', 'outcome', 'x_start', 'y_start', 'x_end', 'y_end'])
-        else:
-            corners = list(map(lambda ev: {"id": ev.id, "event_id": ev.event_id, "period_id": ev.period_id,
-                                            "min": ev.min, "sec": ev.sec, "player_id": ev.player_id,
-                                            "team_id": ev.team_id, "outcome": ev.outcome, 
-                                            "x_start": ev.x, "y_start": ev.y, 
-                                            "x_end": next((q.value for q in ev.qualifiers_list if q.qualifier_id == QUALIFIER_IDS['Pass End X']), None),
-                                            "y_end": next((q.value for q in ev.qualifiers_list if q.qualifier_id == QUALIFIER_IDS['Pass End Y']), None)}, filtered_list))
-            df = pd.DataFrame(corners)
-            return self.__merge_df_with_players_and_teams_info(df)
+        return self.__query_cache.get(('get_df_corners', player_id, team_id, period_id),
+                    lambda: self.__build_df_stat('corners', player_id, team_id, period_id))
 
 
     def get_df_shots(self, player_id = None, team_id = None, period_id = None):
-        criteria_event_type_id = Criteria(Operator.IN, [ EVENT_IDS['Miss'], EVENT_IDS['Post'],
-                                                            EVENT_IDS['Attempt Saved'], EVENT_IDS['Goal'] ])
-        criteria_player_id = None if player_id is None else Criteria(Operator.EQ, player_id)
-        criteria_team_id = None if team_id is None else Criteria(Operator.EQ, team_id)
-        criteria_period_id = None if period_id is None else Criteria(Operator.EQ, period_id)
-
-        filtered_list = self.__filter_event_list(crit_event_type_id = criteria_event_type_id, 
-                                                crit_team_id = criteria_team_id,
-                                                crit_player_id = criteria_player_id,
-                                                crit_period_id = criteria_period_id)
-
-        if len(filtered_list) == 0:
-            return pd.DataFrame(columns = ['id', 'event_id', 'period_id', 'min', 'sec', 'player_id', 
-                            'team_id', 'outcome', 'x_start', 'y_start', 'goalmouth_y', 'goalmouth_z'])
-        else:
-            shots = list(map(lambda ev: {"id": ev.id, "event_id": ev.event_id, "type_id": ev.type_id,
-                                            "period_id": ev.period_id,
-                                            "min": ev.min, "sec": ev.sec, "player_id": ev.player_id,
-                                            "team_id": ev.team_id, "outcome": ev.outcome, 
-                                            "x_start": ev.x, "y_start": ev.y, 
-                                            "goalmouth_y": next((q.value for q in ev.qualifiers_list if q.qualifier_id == QUALIFIER_IDS['Goal Mouth Y Coordinate']), None),
-                                            "goalmouth_z": next((q.value for q in ev.qualifiers_list if q.qualifier_id == QUALIFIER_IDS['Goal Mouth Z Coordinate']), None)}, filtered_list))
-            df = pd.DataFrame(shots)
-            map_types_id = {EVENT_IDS['Miss'] : "Miss",
-                     EVENT_IDS['Post'] : "Post",
-                     EVENT_IDS['Attempt Saved'] : "Attempt Saved",
-                     EVENT_IDS['Goal'] : "Goal"}
-            df['type_name'] = df['type_id'].map(map_types_id)
-            return self.__merge_df_with_players_and_teams_info(df)
+        return self.__query_cache.get(('get_df_shots', player_id, team_id, period_id),
+                    lambda: self.__build_df_stat('shots', player_id, team_id, period_id))
 
 
     def get_df_crosses(self, player_id = None, team_id = None, period_id = None):
-        criteria_event_type_id = Criteria(Operator.EQ, EVENT_IDS['Pass'])
-        criteria_cross_qualifiers = Criteria(Operator.QIN, [QUALIFIER_IDS['Cross']])
-        criteria_extra_cross_qualifiers = Criteria(Operator.QNIN, 
-                            [QUALIFIER_IDS['Free kick taken'],QUALIFIER_IDS['Corner taken']])
-        criteria_player_id = None if player_id is None else Criteria(Operator.EQ, player_id)
-        criteria_team_id = None if team_id is None else Criteria(Operator.EQ, team_id)
-        criteria_period_id = None if period_id is None else Criteria(Operator.EQ, period_id)
-
-        filtered_list = self.__filter_event_list(crit_event_type_id = criteria_event_type_id, 
-                                                crit_team_id = criteria_team_id,
-                                                crit_player_id = criteria_player_id,
-                                                crit_period_id = criteria_period_id, 
-                                                crit_qualifiers = criteria_cross_qualifiers,
-                                                extra_crit_qualifiers = criteria_extra_cross_qualifiers)
-
-        if len(filtered_list) == 0:
-            return pd.DataFrame(columns = ['id', 'event_id', 'period_id', 'min', 'sec', 'player_id', 
-                            'team_id', 'outcome', 'x_start', 'y_start', 'x_end', 'y_end'])
-        else:
-            crosses = list(map(lambda ev: {"id": ev.id, "event_id": ev.event_id, "period_id": ev.period_id,
-                                            "min": ev.min, "sec": ev.sec, "player_id": ev.player_id,
-                                            "team_id": ev.team_id, "outcome": ev.outcome, 
-                                            "x_start": ev.x, "y_start": ev.y, 
-                                            "x_end": next((q.value for q in ev.qualifiers_list if q.qualifier_id == QUALIFIER_IDS['Pass End X']), None),
-                                            "y_end": next((q.value for q in ev.qualifiers_list if q.qualifier_id == QUALIFIER_IDS['Pass End Y']), None)}, filtered_list))
-            df = pd.DataFrame(crosses)
-            return self.__merge_df_with_players_and_teams_info(df)
+        return self.__query_cache.get(('get_df_crosses', player_id, team_id, period_id),
+                    lambda: self.__build_df_stat('crosses', player_id, team_id, period_id))
 
 
     def get_df_crosses_successful(self, player_id = None, team_id = None, period_id = None):
@@ -322,26 +345,8 @@ class Events:
 
 
     def get_df_tackles(self, player_id = None, team_id = None, period_id = None):
-        criteria_event_type_id = Criteria(Operator.EQ, EVENT_IDS['Tackle'])
-        criteria_player_id = None if player_id is None else Criteria(Operator.EQ, player_id)
-        criteria_team_id_id = None if team_id is None else Criteria(Operator.EQ, team_id)
-        criteria_period_id = None if period_id is None else Criteria(Operator.EQ, period_id)
-
-        filtered_list = self.__filter_event_list(crit_event_type_id = criteria_event_type_id, 
-                                                crit_team_id = criteria_team_id_id,
-                                                crit_player_id = criteria_player_id,
-                                                crit_period_id = criteria_period_id)
-
-        if len(filtered_list) == 0:
-            return pd.DataFrame(columns=['id', 'event_id', 'period_id', 'min', 'sec', 'player_id', 
-                            'team_id', 'outcome', 'x_start', 'y_start'])
-        else:
-            tackles = list(map(lambda ev: {"id": ev.id, "event_id": ev.event_id, "period_id": ev.period_id,
-                                            "min": ev.min, "sec": ev.sec, "player_id": ev.player_id,
-                                            "team_id": ev.team_id, "outcome": ev.outcome, 
-                                            "x_start": ev.x, "y_start": ev.y}, filtered_list))
-            df = pd.DataFrame(tackles)
-            return self.__merge_df_with_players_and_teams_info(df)
+        return self.__query_cache.get(('get_df_tackles', player_id, team_id, period_id),
+                    lambda: self.__build_df_stat('tackles', player_id, team_id, period_id))
 
 
     def get_df_tackles_won_possession(self, player_id = None, team_id = None, period_id = None):
@@ -355,32 +360,15 @@ class Events:
 
 
     def get_df_interceptions(self, player_id = None, team_id = None, period_id = None):
-        criteria_event_type_id = Criteria(Operator.EQ, EVENT_IDS['Interception'])
-        criteria_player_id = None if player_id is None else Criteria(Operator.EQ, player_id)
-        criteria_team_id_id = None if team_id is None else Criteria(Operator.EQ, team_id)
-        criteria_period_id = None if period_id is None else Criteria(Operator.EQ, period_id)
-
-        filtered_list = self.__filter_event_list(crit_event_type_id = criteria_event_type_id, 
-                                                crit_team_id = criteria_team_id_id,
-                                                crit_player_id = criteria_player_id,
-                                                crit_period_id = criteria_period_id)
-
-        if len(filtered_list) == 0:
-            return pd.DataFrame(columns=['id', 'event_id', 'period_id', 'min', 'sec', 'player_id', 
-                            'team_id', 'outcome', 'x_start', 'y_start'])
-        else:
-            interceptions = list(map(lambda ev: {"id": ev.id, "event_id": ev.event_id, "period_id": ev.period_id,
-                                            "min": ev.min, "sec": ev.sec, "player_id": ev.player_id,
-                                            "team_id": ev.team_id, "outcome": ev.outcome, 
-                                            "x_start": ev.x, "y_start": ev.y}, filtered_list))
-            df = pd.DataFrame(interceptions)
-            return self.__merge_df_with_players_and_teams_info(df)
+        return self.__query_cache.get(('get_df_interceptions', player_id, team_id, period_id),
+                    lambda: self.__build_df_stat('interceptions', player_id, team_id, period_id))
 
 
     def get_pitch_passes(self, player_id = None, team_id = None, period_id = None):        
         stat = 'passes'
-        df_successful = self.get_df_passes_successful(player_id, team_id, period_id)
-        df_unsuccessful = self.get_df_passes_unsuccessful(player_id, team_id, period_id)
+        df_total = self.get_df_passes(player_id, team_id, period_id)
+        df_successful = df_total.query('outcome == 1').reset_index(drop=True)
+        df_unsuccessful = df_total.query('outcome == 0').reset_index(drop=True)
 
         title = self.__define_plot_title(player_id, team_id, period_id, stat)
         return self.__define_pitch_lines(df_successful, df_unsuccessful, stat, 
@@ -389,8 +377,9 @@ class Events:
 
     def get_pitch_aerial_duels(self, player_id = None, team_id = None, period_id = None):
         stat = 'aerial duels'
-        df_successful = self.get_df_aerial_duels_successful(player_id, team_id, period_id)
-        df_unsuccessful = self.get_df_aerial_duels_unsuccessful(player_id, team_id, period_id)
+        df_total = self.get_df_aerial_duels(player_id, team_id, period_id)
+        df_successful = df_total.query('outcome == 1').reset_index(drop=True)
+        df_unsuccessful = df_total.query('outcome == 0').reset_index(drop=True)
 
         title = self.__define_plot_title(player_id, team_id, period_id, stat)
         return self.__define_pitch_scatter(df_successful, df_unsuccessful, stat, 
@@ -399,8 +388,9 @@ class Events:
 
     def get_pitch_fouls(self, player_id = None, team_id = None, period_id = None):
         stat = 'fouls'
-        df_successful = self.get_df_fouls_won(player_id, team_id, period_id)
-        df_unsuccessful = self.get_df_fouls_conceded(player_id, team_id, period_id)
+        df_total = self.get_df_fouls(player_id, team_id, period_id)
+        df_successful = df_total.query('outcome == 1').reset_index(drop=True)
+        df_unsuccessful = df_total.query('outcome == 0').reset_index(drop=True)
 
         title = self.__define_plot_title(player_id, team_id, period_id, stat)
         return self.__define_pitch_scatter(df_successful, df_unsuccessful, stat, 
@@ -418,8 +408,9 @@ class Events:
 
     def get_pitch_clearances(self, player_id = None, team_id = None, period_id = None):
         stat = 'clearances'
-        df_successful = self.get_df_clearances_won(player_id, team_id, period_id)
-        df_unsuccessful = self.get_df_clearances_lost(player_id, team_id, period_id)
+        df_total = self.get_df_clearances(player_id, team_id, period_id)
+        df_successful = df_total.query('outcome == 1').reset_index(drop=True)
+        df_unsuccessful = df_total.query('outcome == 0').reset_index(drop=True)
 
         title = self.__define_plot_title(player_id, team_id, period_id, stat)
         return self.__define_pitch_scatter(df_successful, df_unsuccessful, stat, 
@@ -446,8 +437,9 @@ class Events:
 
     def get_pitch_crosses(self, player_id = None, team_id = None, period_id = None):
         stat = 'crosses'
-        df_successful = self.get_df_crosses_successful(player_id, team_id, period_id)
-        df_unsuccessful = self.get_df_crosses_unsuccessful(player_id, team_id, period_id)
+        df_total = self.get_df_crosses(player_id, team_id, period_id)
+        df_successful = df_total.query('outcome == 1').reset_index(drop=True)
+        df_unsuccessful = df_total.query('outcome == 0').reset_index(drop=True)
 
         title = self.__define_plot_title(player_id, team_id, period_id, stat)
         return self.__define_pitch_lines(df_successful, df_unsuccessful, stat, 
@@ -456,8 +448,9 @@ class Events:
 
     def get_pitch_tackles(self, player_id = None, team_id = None, period_id = None):
         stat = 'tackles'
-        df_successful = self.get_df_tackles_won_possession(player_id, team_id, period_id)
-        df_unsuccessful = self.get_df_tackles_no_possession(player_id, team_id, period_id)
+        df_total = self.get_df_tackles(player_id, team_id, period_id)
+        df_successful = df_total.query('outcome == 1').reset_index(drop=True)
+        df_unsuccessful = df_total.query('outcome == 0').reset_index(drop=True)
 
         title = self.__define_plot_title(player_id, team_id, period_id, stat)
         return self.__define_pitch_scatter(df_successful, df_unsuccessful, stat, 
@@ -474,123 +467,128 @@ class Events:
                 title, self.__perform_subtitle())
 
 
+    def get_all_stats(self, team_id = None, stats = None):
+        stats = list(self.__STAT_CRITERIA) if stats is None else list(stats)
+        for stat in stats:
+            if stat not in self.__STAT_CRITERIA:
+                raise ValueError(f'Unknown stat: {stat}')
+        positions_list = [self.__filter_stat_events(stat) for stat in stats]
+        df = self.__get_df_from_positions(np.concatenate(positions_list), with_type_id = True)
+        df['stat'] = np.repeat(stats, [len(positions) for positions in positions_list])
+        df = self.__merge_df_with_players_and_teams_info(df)
+
+        player_ids = list(self.__get_dict_all_players(team_id = team_id))
+        all_stats = {}
+        for stat, df_stat in zip(stats, [df[df['stat'] == stat] for stat in stats]):
+            if stat == 'shots':
+                all_stats[stat] = self.__get_shots_stat(df_stat, player_ids)
+            else:
+                label_stat, label_outcome1, label_outcome0 = self.__STAT_LABELS[stat]
+                if label_outcome0 is None:
+                    all_stats[stat] = self.__get_specific_stat_one_outcome(label_stat, df_stat, player_ids,
+                                                label_outcome1 = label_outcome1)
+                else:
+                    all_stats[stat] = self.__get_specific_stat(label_stat, df_stat, player_ids,
+                                                label_outcome1 = label_outcome1, label_outcome0 = label_outcome0)
+        return all_stats
+
+
     def get_stats_passes(self, team_id = None):
-        return self.__get_specific_stat('passes', self.get_df_passes, team_id = team_id)
+        return self.get_all_stats(team_id = team_id, stats = ['passes'])['passes']
 
 
     def get_stats_aerial_duels(self, team_id = None):
-        return self.__get_specific_stat('aerial duels', self.get_df_aerial_duels, team_id = team_id)
+        return self.get_all_stats(team_id = team_id, stats = ['aerial_duels'])['aerial_duels']
 
 
     def get_stats_fouls(self, team_id = None):
-        return self.__get_specific_stat('fouls', self.get_df_fouls, team_id = team_id, 
-                        label_outcome1='won', label_outcome0='conceded')
+        return self.get_all_stats(team_id = team_id, stats = ['fouls'])['fouls']
 
 
     def get_stats_ball_recoveries(self, team_id = None):
-        return self.__get_specific_stat_one_outcome('ball recoveries', self.get_df_ball_recoveries, 
-                        team_id = team_id, label_outcome1='won')
+        return self.get_all_stats(team_id = team_id, stats = ['ball_recoveries'])['ball_recoveries']
 
 
     def get_stats_clearances(self, team_id = None):
-        return self.__get_specific_stat('clearances', self.get_df_clearances, 
-                        team_id = team_id, label_outcome1='won', label_outcome0='lost')
+        return self.get_all_stats(team_id = team_id, stats = ['clearances'])['clearances']
 
 
     def get_stats_corners(self, team_id = None):
-        return self.__get_specific_stat_one_outcome('corners', self.get_df_corners, 
-                        team_id = team_id, label_outcome1='taken')
+        return self.get_all_stats(team_id = team_id, stats = ['corners'])['corners']
 
 
     def get_stats_crosses(self, team_id = None):
-        return self.__get_specific_stat('crosses', self.get_df_crosses, team_id = team_id)
+        return self.get_all_stats(team_id = team_id, stats = ['crosses'])['crosses']
 
 
     def get_stats_tackles(self, team_id = None):
-        return self.__get_specific_stat('tackles', self.get_df_tackles, team_id = team_id, 
-                        label_outcome1='won possession', label_outcome0='no possession')
+        return self.get_all_stats(team_id = team_id, stats = ['tackles'])['tackles']
 
 
     def get_stats_shots(self, team_id = None):
-        df = pd.DataFrame(columns=['player_id', 'player_name', 'on_target', 'off_target', 
-                'goal', 'attempt_saved', 'post', 'miss'])
-        player_ids = self.__get_dict_all_players(team_id = team_id)
-        for plid in player_ids:
-            df_player_shots = self.get_df_shots(player_id = plid)
-            player_name = ''
-            if 'player_name' in self.__df_players.columns:
-                player_name = self.__df_players.loc[self.__df_players['player_id'] == plid, 'player_name'].iloc[0]
-            goal = len(df_player_shots.query(f"type_id == {EVENT_IDS['Goal']}")) if not df_player_shots.empty else 0
-            attempt_saved = len(df_player_shots.query(f"type_id == {EVENT_IDS['Attempt Saved']}")) if not df_player_shots.empty else 0
-            post = len(df_player_shots.query(f"type_id == {EVENT_IDS['Post']}")) if not df_player_shots.empty else 0
-            miss = len(df_player_shots.query(f"type_id == {EVENT_IDS['Miss']}")) if not df_player_shots.empty else 0
-            on_target = int(goal) + int(attempt_saved)
-            off_target = int(post) + int(miss)
-            df.loc[len(df)] = [plid, player_name, on_target, off_target, goal, attempt_saved, post, miss]
-        df['player_id'] = pd.Series(df['player_id'] ,dtype = pd.Int64Dtype())
-        df['on_target'] = pd.Series(df['on_target'] ,dtype = pd.Int64Dtype())
-        df['off_target'] = pd.Series(df['off_target'] ,dtype = pd.Int64Dtype())
-        df['goal'] = pd.Series(df['goal'] ,dtype = pd.Int64Dtype())
-        df['attempt_saved'] = pd.Series(df['attempt_saved'] ,dtype = pd.Int64Dtype())
-        df['post'] = pd.Series(df['post'] ,dtype = pd.Int64Dtype())
-        df['miss'] = pd.Series(df['miss'] ,dtype = pd.Int64Dtype())
-        return df.sort_values(by=['goal', 'attempt_saved', 'post', 'miss'], ascending=[False, False, False, False])
+        return self.get_all_stats(team_id = team_id, stats = ['shots'])['shots']
 
 
     def get_stats_interceptions(self, team_id = None):
-        return self.__get_specific_stat_one_outcome('interceptions', self.get_df_interceptions, 
-                        team_id = team_id)
+        return self.get_all_stats(team_id = team_id, stats = ['interceptions'])['interceptions']
 
 
-    def get_bar_chart_passes(self, team_id = None):
-        return self.__get_concrete_bar_chart('passes', self.get_stats_passes, team_id = team_id)
+    def get_bar_chart_passes(self, team_id = None, df_stats = None):
+        df_stats = self.get_stats_passes(team_id = team_id) if df_stats is None else df_stats
+        return self.__get_concrete_bar_chart('passes', df_stats)
 
 
-    def get_bar_chart_aerial_duels(self, team_id = None):
-        return self.__get_concrete_bar_chart('aerial duels', self.get_stats_aerial_duels, team_id = team_id)
+    def get_bar_chart_aerial_duels(self, team_id = None, df_stats = None):
+        df_stats = self.get_stats_aerial_duels(team_id = team_id) if df_stats is None else df_stats
+        return self.__get_concrete_bar_chart('aerial duels', df_stats)
 
 
-    def get_bar_chart_fouls(self, team_id = None):
-        return self.__get_concrete_bar_chart('fouls', self.get_stats_fouls, team_id = team_id,
+    def get_bar_chart_fouls(self, team_id = None, df_stats = None):
+        df_stats = self.get_stats_fouls(team_id = team_id) if df_stats is None else df_stats
+        return self.__get_concrete_bar_chart('fouls', df_stats,
                     label_outcome1='won', label_outcome0='conceded')
 
 
-    def get_bar_chart_ball_recoveries(self, team_id = None):
-        return self.__get_concrete_bar_chart_one_outcome('ball_recoveries', self.get_stats_ball_recoveries, 
-                    team_id = team_id, label_outcome1='won')
+    def get_bar_chart_ball_recoveries(self, team_id = None, df_stats = None):
+        df_stats = self.get_stats_ball_recoveries(team_id = team_id) if df_stats is None else df_stats
+        return self.__get_concrete_bar_chart_one_outcome('ball_recoveries', df_stats, label_outcome1='won')
 
 
-    def get_bar_chart_clearances(self, team_id = None):
-        return self.__get_concrete_bar_chart('clearances', self.get_stats_clearances, team_id = team_id,
+    def get_bar_chart_clearances(self, team_id = None, df_stats = None):
+        df_stats = self.get_stats_clearances(team_id = team_id) if df_stats is None else df_stats
+        return self.__get_concrete_bar_chart('clearances', df_stats,
                     label_outcome1='won', label_outcome0='lost')
 
 
-    def get_bar_chart_corners(self, team_id = None):
-        return self.__get_concrete_bar_chart_one_outcome('corners', self.get_stats_corners, 
-                    team_id = team_id, label_outcome1='taken')
+    def get_bar_chart_corners(self, team_id = None, df_stats = None):
+        df_stats = self.get_stats_corners(team_id = team_id) if df_stats is None else df_stats
+        return self.__get_concrete_bar_chart_one_outcome('corners', df_stats, label_outcome1='taken')
 
 
-    def get_bar_chart_crosses(self, team_id = None):
-        return self.__get_concrete_bar_chart('crosses', self.get_stats_crosses, team_id = team_id)
+    def get_bar_chart_crosses(self, team_id = None, df_stats = None):
+        df_stats = self.get_stats_crosses(team_id = team_id) if df_stats is None else df_stats
+        return self.__get_concrete_bar_chart('crosses', df_stats)
 
 
-    def get_bar_chart_tackles(self, team_id = None):
-        return self.__get_concrete_bar_chart('tackles', self.get_stats_tackles, team_id = team_id,  
+    def get_bar_chart_tackles(self, team_id = None, df_stats = None):
+        df_stats = self.get_stats_tackles(team_id = team_id) if df_stats is None else df_stats
+        return self.__get_concrete_bar_chart('tackles', df_stats,
                     label_outcome1='won possession', label_outcome0='no possession')
 
 
-    def get_bar_chart_interceptions(self, team_id = None):
-        return self.__get_concrete_bar_chart_one_outcome('interceptions', 
-                    self.get_stats_interceptions, team_id = team_id)
+    def get_bar_chart_interceptions(self, team_id = None, df_stats = None):
+        df_stats = self.get_stats_interceptions(team_id = team_id) if df_stats is None else df_stats
+        return self.__get_concrete_bar_chart_one_outcome('interceptions', df_stats)
 
 
-    def get_bar_chart_shots(self, team_id = None):        
+    def get_bar_chart_shots(self, team_id = None, df_stats = None):
         columns = ['player_id', 'goal', 'attempt_saved', 'post', 'miss']
         df_index = 'player_id'
         if 'player_name' in self.__df_players.columns:
             columns = ['player_name', 'goal', 'attempt_saved', 'post', 'miss']
             df_index = 'player_name' 
-        df = self.get_stats_shots(team_id = team_id).loc[:, columns]
+        df_stats = self.get_stats_shots(team_id = team_id) if df_stats is None else df_stats
+        df = df_stats.loc[:, columns]
         df.sort_values(by=['goal', 'attempt_saved', 'post', 'miss'], ascending=[True, True, True, True], inplace=True)
         df.set_index(df_index, inplace=True)
 
@@ -607,6 +605,7 @@ class Events:
 
 
     def get_player_heatmap(self, player_id):
+        self.__check_loaded_type_ids(None, 'heatmaps')
         df_all_events = self.get_df_all_events()
         df_player_events = df_all_events.loc[df_all_events['player_id'] == player_id]
 
@@ -629,6 +628,7 @@ class Events:
 
 
     def get_team_players_heatmap(self, team_id):
+        self.__check_loaded_type_ids(None, 'heatmaps')
         df_all_events = self.get_df_all_events()
         df_team_events = df_all_events.loc[df_all_events['team_id'] == team_id]
         player_ids_list = pd.unique(df_team_events['player_id']).tolist()
@@ -696,6 +696,23 @@ class Events:
         return plt
 
 
+    def get_pass_matrix(self, team_id, period_id = None, minute_from = None, minute_to = None):
+        # Receivers are the players of the next events of the team, so every event is needed
+        self.__check_loaded_type_ids(None, 'pass matrices')
+        if self.__game is None:
+            raise ValueError('The events are of many matches: use EventsCollection.get_pass_matrices')
+        df_teams = self.__df_teams[self.__df_teams['team_id'] == team_id]
+        if len(df_teams) == 0:
+            raise ValueError(f'Unknown team_id: {team_id}')
+        player_names = None
+        if 'player_name' in self.__df_players.columns:
+            player_names = dict(zip(self.__df_players['player_id'].tolist(), self.__df_players['player_name'].tolist()))
+        return PassMatrixBuilder.build(self.__event_store, team_id, df_teams['team_name'].iloc[0],
+                                       {self.__game.match_id: self.__game}, player_names = player_names,
+                                       period_id = period_id, minute_from = minute_from,
+                                       minute_to = minute_to)[self.__game.match_id]
+
+
     def create_team_report(self, team_id, file_output):
         __location__ = os.path.realpath(
                 os.path.join(os.getcwd(), os.path.dirname(__file__)))
@@ -712,13 +729,16 @@ class Events:
         match_info = match_info[0:match_info.index('Additional info:')]
         dict_params["{{ MATCH_INFO }}"] = f"{match_info}. TEAM REPORT: {team_name}"
 
+        # Every stat table of the report is computed at once
+        all_stats = self.get_all_stats(team_id = team_id)
+
         # PASSES
         columns_passes = ['player_name', 'num_passes', 'successful', 'unsuccessful', 'ratio']
-        df_passes = self.get_stats_passes(team_id=team_id).loc[:, columns_passes]
+        df_passes = all_stats['passes'].loc[:, columns_passes]
         df_passes.sort_values(by=['num_passes'], ascending=[False], inplace=True)
         dict_params["{{ TABLE_PASSES }}"] = str(df_passes.to_html(index=False))
 
-        barchart_passes = self.get_bar_chart_passes(team_id=team_id)
+        barchart_passes = self.get_bar_chart_passes(df_stats=all_stats['passes'])
         dict_params["{{ BARCHART_PASSES }}"] = self.__figure_to_base64(barchart_passes)
 
         pitch1_passes = self.get_pitch_passes(team_id=team_id, period_id=1)
@@ -730,63 +750,57 @@ class Events:
         dict_params["{{ HEATMAP_PASSES }}"] = self.__figure_to_base64(heatmap_passes)
 
         # SHOTS        
-        df_shots = self.get_stats_shots(team_id=team_id)
-        df_shots.drop('player_id', axis=1, inplace=True)
+        df_shots = all_stats['shots'].drop('player_id', axis=1)
         dict_params["{{ TABLE_SHOTS }}"] = str(df_shots.to_html(index=False))
 
-        barchart_shots = self.get_bar_chart_shots(team_id=team_id)
+        barchart_shots = self.get_bar_chart_shots(df_stats=all_stats['shots'])
         dict_params["{{ BARCHART_SHOTS }}"] = self.__figure_to_base64(barchart_shots)
 
         pitch_shots = self.get_pitch_shots(team_id=team_id)
         dict_params["{{ PITCH_SHOTS }}"] = self.__figure_to_base64(pitch_shots)
 
         # CORNERS
-        df_corners = self.get_stats_corners(team_id=team_id)
-        df_corners.drop(['player_id', 'taken'], axis=1, inplace=True)
+        df_corners = all_stats['corners'].drop(['player_id', 'taken'], axis=1)
         dict_params["{{ TABLE_CORNERS }}"] = str(df_corners.to_html(index=False))
 
         pitch_corners = self.get_pitch_corners(team_id=team_id)
         dict_params["{{ PITCH_CORNERS }}"] = self.__figure_to_base64(pitch_corners)
 
         # CROSSES
-        df_crosses = self.get_stats_crosses(team_id=team_id)
-        df_crosses.drop('player_id', axis=1, inplace=True)
+        df_crosses = all_stats['crosses'].drop('player_id', axis=1)
         df_crosses.sort_values(by=['num_crosses'], ascending=[False], inplace=True)
         dict_params["{{ TABLE_CROSSES }}"] = str(df_crosses.to_html(index=False))
 
-        barchart_crosses = self.get_bar_chart_crosses(team_id=team_id)
+        barchart_crosses = self.get_bar_chart_crosses(df_stats=all_stats['crosses'])
         dict_params["{{ BARCHART_CROSSES }}"] = self.__figure_to_base64(barchart_crosses)
 
         pitch_crosses = self.get_pitch_crosses(team_id=team_id)
         dict_params["{{ PITCH_CROSSES }}"] = self.__figure_to_base64(pitch_crosses)
 
         # BALL RECOVERIES
-        df_recoveries = self.get_stats_ball_recoveries(team_id=team_id)
-        df_recoveries.drop(['player_id', 'won'], axis=1, inplace=True)
+        df_recoveries = all_stats['ball_recoveries'].drop(['player_id', 'won'], axis=1)
         dict_params["{{ TABLE_RECOVERIES }}"] = str(df_recoveries.to_html(index=False))
         
         pitch_recoveries = self.get_pitch_ball_recoveries(team_id=team_id)
         dict_params["{{ PITCH_RECOVERIES }}"] = self.__figure_to_base64(pitch_recoveries)
 
         # AERIALS
-        df_aerials = self.get_stats_aerial_duels(team_id=team_id)
-        df_aerials.drop('player_id', axis=1, inplace=True)
+        df_aerials = all_stats['aerial_duels'].drop('player_id', axis=1)
         df_aerials.sort_values(by=['num_aerial duels'], ascending=[False], inplace=True)
         dict_params["{{ TABLE_AERIALS }}"] = str(df_aerials.to_html(index=False))
 
-        barchart_aerials = self.get_bar_chart_aerial_duels(team_id=team_id)
+        barchart_aerials = self.get_bar_chart_aerial_duels(df_stats=all_stats['aerial_duels'])
         dict_params["{{ BARCHART_AERIALS }}"] = self.__figure_to_base64(barchart_aerials)
 
         pitch_aerials = self.get_pitch_aerial_duels(team_id=team_id)
         dict_params["{{ PITCH_AERIALS }}"] = self.__figure_to_base64(pitch_aerials)
 
         # CLEARANCES
-        df_clearances = self.get_stats_clearances(team_id=team_id)
-        df_clearances.drop('player_id', axis=1, inplace=True)
+        df_clearances = all_stats['clearances'].drop('player_id', axis=1)
         df_clearances.sort_values(by=['num_clearances'], ascending=[False], inplace=True)
         dict_params["{{ TABLE_CLEARANCES }}"] = str(df_clearances.to_html(index=False))
 
-        barchart_clearances = self.get_bar_chart_clearances(team_id=team_id)
+        barchart_clearances = self.get_bar_chart_clearances(df_stats=all_stats['clearances'])
         dict_params["{{ BARCHART_CLEARANCES }}"] = self.__figure_to_base64(barchart_clearances)
 
         pitch_clearances = self.get_pitch_clearances(team_id=team_id)
@@ -801,17 +815,89 @@ class Events:
         self.__convert_html_to_pdf(report_html, file_output)
 
 
+    def __init_state(self, query_cache_size, type_ids, predicate):
+        self.__game = None
+        self.__df_players = []
+        self.__df_squads = []
+        self.__player_ids = []
+        self.__df_teams = []
+        self.__event_store = None
+        self.__query_cache = QueryCache(max_size = query_cache_size)
+        self.__timestamp_decoder = TimestampDecoder(('%Y-%m-%dT%H:%M:%S', '%Y-%m-%d'))
+        # Event filters applied by the parser (see __is_event_tag_selected). When any of 
+        # them is set, the roster keeps the team_id and player_id of every event of the file
+        self.__type_ids = None if type_ids is None else frozenset(type_ids)
+        self.__predicate = predicate
+        self.__predicate_filtered = predicate is not None
+        self.__roster = None
+
+
+    def __load_f24opta_file_cached(self, file_path, streaming, cache_dir):
+        parse_cache = ParseCache(cache_dir)
+        kind = 'f24' if self.__type_ids is None else f"f24-types-{'-'.join(map(str, sorted(self.__type_ids)))}"
+        # File objects are read once, to hash and parse the same content
+        file_path = OptaSource.to_cacheable(file_path)
+        key = parse_cache.get_key(file_path, kind)
+        cached = parse_cache.load(key)
+        if cached is None:
+            if streaming:
+                self.__parse_f24opta_file_streaming(file_path)
+            else:
+                self.__parse_f24opta_file(file_path)
+            parse_cache.store(key, *self.to_columnar())
+        else:
+            self.__set_columnar(*cached)
+
+
+    def __set_columnar(self, metadata, columns):
+        columns = dict(columns)
+        self.__game = Game(**metadata['game'])
+        self.__set_initial_teams_df(self.__game.home_team_id, self.__game.home_team_name,
+                                    self.__game.away_team_id, self.__game.away_team_name)
+        if 'roster_team_id' in columns:
+            self.__roster = {name: columns.pop(f'roster_{name}') for name in ('team_id', 'player_id')}
+        self.__event_store = EventStore(columns, partition_column = metadata.get('partition_column'))
+
+
     def __parse_f24opta_file(self, file_path):
-        tree = ET.parse(file_path)
+        with OptaSource.open(file_path) as f:
+            tree = ET.parse(f)
         root = tree.getroot()
         game_tag = root.find('Game')
         self.__game = self.__parse_game_tag(game_tag)
-        self.__event_list = self.__parse_event_tags(game_tag)
+        self.__event_store = EventStore.from_events(self.__parse_event_tags(game_tag),
+                                                    date_decoder = self.__timestamp_decoder)
+        self.__close_roster()
+
+
+    def __parse_f24opta_file_streaming(self, file_path):
+        self.__event_store = EventStore.from_events(self.__iterparse_event_tags(file_path),
+                                                    date_decoder = self.__timestamp_decoder)
+        self.__close_roster()
+
+
+    def __iterparse_event_tags(self, file_path):
+        # Events are built as soon as their closing tag is read and the element is
+        # released right away, so the full XML tree is never kept in memory
+        game_tag = None
+        with OptaSource.open(file_path) as f:
+            for xml_event, tag in ET.iterparse(f, events=('start', 'end')):
+                if xml_event == 'start':
+                    if tag.tag == 'Game':
+                        game_tag = tag
+                        self.__game = self.__parse_game_tag(game_tag)
+                elif tag.tag == 'Event':
+                    if self.__is_event_tag_selected(tag):
+                        yield self.__parse_event_tag(tag)
+                    tag.clear()
+                    if game_tag is not None:
+                        game_tag.remove(tag)
 
 
     def __parse_squad_file(self, file_path):
         df_players = pd.DataFrame(columns=['player_id', 'player_name', 'first_name', 'last_name', 'known_name'])
-        tree = ET.parse(file_path)
+        with OptaSource.open(file_path) as f:
+            tree = ET.parse(f)
         root = tree.getroot()        
         list_team_tag = root.findall('.//Team')
         for team_tag in list_team_tag:
@@ -835,15 +921,22 @@ class Events:
 
 
     def __set_initial_players_df(self):
-        set_player_ids = set()
-        for ev in self.__event_list:
-            if ev.player_id is not None and ev.player_id != UNDEFINED_INT:
-                set_player_ids.add(ev.player_id)
+        set_player_ids = self.__get_dict_all_players()
+        self.__player_ids = list(set_player_ids)
         df = pd.DataFrame(list(set_player_ids)) 
         df.columns = ['player_id']
         self.__df_players = df
 
 
+    def __refresh_players_df(self):
+        # The players only change if some event of a new player was inserted or the last
+        # event of a player was deleted
+        if list(self.__get_dict_all_players()) != self.__player_ids:
+            self.__set_initial_players_df()
+            for df in self.__df_squads:
+                self.__df_players = pd.merge(self.__df_players, df, left_on='player_id', right_on='player_id', how='inner')
+
+
     def __set_initial_teams_df(self, home_team_id, home_team_name, away_team_id, away_team_name):
         df_teams = pd.DataFrame(columns=['team_id', 'team_name'])
         df_teams.loc[0] = [home_team_id, home_team_name]
@@ -859,13 +952,13 @@ class Events:
         away_team_name = self.__tag_value_to_str(game_tag.get('away_team_name'))
         competition_id = self.__tag_value_to_int(game_tag.get('competition_id'))
         competition_name = self.__tag_value_to_str(game_tag.get('competition_name'))
-        game_date = self.__tag_value_to_datetime(game_tag.get('game_date'))
+        game_date = self.__timestamp_decoder.decode(game_tag.get('game_date'))
         home_score = self.__tag_value_to_int(game_tag.get('home_score'))
         home_team_id = self.__tag_value_to_int(game_tag.get('home_team_id'))
         home_team_name = self.__tag_value_to_str(game_tag.get('home_team_name'))
         matchday = self.__tag_value_to_int(game_tag.get('matchday'))
-        period_1_start = self.__tag_value_to_datetime(game_tag.get('period_1_start'))
-        period_2_start = self.__tag_value_to_datetime(game_tag.get('period_2_start'))
+        period_1_start = self.__timestamp_decoder.decode(game_tag.get('period_1_start'))
+        period_2_start = self.__timestamp_decoder.decode(game_tag.get('period_2_start'))
         season_id = self.__tag_value_to_int(game_tag.get('season_id'))
         season_name = self.__tag_value_to_str(game_tag.get('season_name'))
         self.__set_initial_teams_df(home_team_id, home_team_name, away_team_id, away_team_name)
@@ -892,8 +985,9 @@ class Events:
         keypass = self.__tag_value_to_int(event_tag.get('keypass'))
         x = self.__tag_value_to_float(event_tag.get('x'))
         y = self.__tag_value_to_float(event_tag.get('y'))
-        timestamp = self.__tag_value_to_datetime(event_tag.get('timestamp'))
-        last_modified = self.__tag_value_to_datetime(event_tag.get('last_modified'))
+        # Dates are kept raw and decoded column-wise when the event store is built
+        timestamp = event_tag.get('timestamp')
+        last_modified = event_tag.get('last_modified')
         qualifiers_list = self.__parse_qualifier_tags(event_tag)
         return Event(id = id, event_id = event_id, type_id = type_id, period_id = period_id,
                     min = min, sec = sec, team_id = team_id, player_id = player_id,
@@ -902,67 +996,175 @@ class Events:
                     qualifiers_list = qualifiers_list)
 
 
-    def __parse_qualifier_tag(self, qualifier_tag):
-        id = self.__tag_value_to_int(qualifier_tag.get('id'))
-        qualifier_id = self.__tag_value_to_int(qualifier_tag.get('qualifier_id'))
-        value = self.__tag_value_to_str(qualifier_tag.get('value'))
-        return Qualifier(id = id, qualifier_id = qualifier_id, value = value)
-
-
     def __parse_event_tags(self, game_tag):
-        events_list = []
         for event in game_tag.iter('Event'):
-            events_list.append(self.__parse_event_tag(event))
-        return events_list
+            if self.__is_event_tag_selected(event):
+                yield self.__parse_event_tag(event)
+
+
+    def __is_event_tag_selected(self, event_tag):
+        # Filters are checked on the raw attributes, before any conversion. The team and
+        # player of every event are kept apart, so the players of the match do not 
+        # depend on the events that were loaded
+        if self.__type_ids is None and self.__predicate is None:
+            return True
+        if self.__roster is None:
+            self.__roster = {'team_id': [], 'player_id': []}
+        self.__roster['team_id'].append(self.__tag_value_to_int(event_tag.get('team_id')))
+        self.__roster['player_id'].append(self.__tag_value_to_int(event_tag.get('player_id')))
+        if self.__type_ids is not None and self.__tag_value_to_int(event_tag.get('type_id')) not in self.__type_ids:
+            return False
+        return self.__predicate is None or bool(self.__predicate(event_tag.attrib))
+
+
+    def __close_roster(self):
+        if self.__type_ids is not None or self.__predicate is not None:
+            roster = self.__roster or {'team_id': [], 'player_id': []}
+            self.__roster = {name: np.array(values, dtype=np.int64) for name, values in roster.items()}
 
 
     def __parse_qualifier_tags(self, event_tag):
-        qualifier_list = []
-        for qualifier in event_tag.iter('Q'):
-            qualifier_list.append(self.__parse_qualifier_tag(qualifier))
-        return qualifier_list
+        # Qualifiers are kept raw: Qualifier objects are only built if they are read
+        ids = []
+        qualifier_ids = []
+        values = []
+        for qualifier_tag in event_tag.iter('Q'):
+            ids.append(self.__tag_value_to_int(qualifier_tag.get('id')))
+            qualifier_ids.append(self.__tag_value_to_int(qualifier_tag.get('qualifier_id')))
+            values.append(self.__tag_value_to_str(qualifier_tag.get('value')))
+        return QualifierList(ids, qualifier_ids, values)
+
+
+    @staticmethod
+    def __get_changed_events(store, delta, old_positions, delta_rows, deleted_positions):
+        # Pairs (previous version, new version) of the changed, inserted and deleted events
+        changed = (old_positions >= 0) & (delta_rows >= 0)
+        changed_events = [(store.get_event(position), delta.get_event(row)) for position, row in 
+                            zip(old_positions[changed].tolist(), delta_rows[changed].tolist())]
+        changed_events.extend((None, delta.get_event(row)) for row in delta_rows[old_positions < 0].tolist())
+        changed_events.extend((store.get_event(position), None) for position in deleted_positions)
+        return changed_events
+
+
+    def __is_query_affected(self, key, touched):
+        # A cached frame is affected if any touched event (see EventStore.update) is selected
+        # by its query
+        if key[0] == 'get_df_all_events':
+            return len(touched) > 0
+        stat = key[0][len('get_df_'):]
+        player_id, team_id, period_id = key[1:]
+        return len(self.__filter_stat_events(stat, player_id = player_id, team_id = team_id, 
+                                             period_id = period_id, event_store = touched)) > 0
 
 
     def __filter_event_list(self, crit_event_type_id = None, crit_team_id = None, crit_player_id = None,
                             crit_period_id = None, crit_min = None, crit_sec = None,
                             crit_outcome = None, crit_x = None, crit_y = None,
-                            crit_qualifiers = None, extra_crit_qualifiers = None):
-        return list(filter(lambda ev: self.__filter_event(ev, crit_event_type_id, crit_team_id, 
-                        crit_player_id, crit_period_id, crit_min, crit_sec, crit_outcome,
-                        crit_x, crit_y, crit_qualifiers, extra_crit_qualifiers), self.__event_list))
-
-
-    def __filter_event(self, ev, crit_event_type_id = None, crit_team_id = None, crit_player_id = None,
-                        crit_period_id = None, crit_min = None, crit_sec = None, crit_outcome = None,
-                        crit_x = None, crit_y = None, crit_qualifiers = None, 
-                        extra_crit_qualifiers = None):
-        if (crit_event_type_id is not None and not self.__check_criteria(ev.type_id, crit_event_type_id)
-            or crit_player_id is not None and not self.__check_criteria(ev.player_id, crit_player_id)
-            or crit_team_id is not None and not self.__check_criteria(ev.team_id, crit_team_id)
-            or crit_period_id is not None and not self.__check_criteria(ev.period_id, crit_period_id)
-            or crit_min is not None and not self.__check_criteria(ev.min, crit_min)
-            or crit_sec is not None and not self.__check_criteria(ev.sec, crit_sec)
-            or crit_outcome is not None and not self.__check_criteria(ev.outcome, crit_outcome)
-            or crit_x is not None and not self.__check_criteria(ev.x, crit_x)
-            or crit_y is not None and not self.__check_criteria(ev.y, crit_y)
-            or crit_qualifiers is not None and not self.__check_criteria(ev.qualifiers_list, crit_qualifiers)
-            or extra_crit_qualifiers is not None and not self.__check_criteria(ev.qualifiers_list, extra_crit_qualifiers)):
-            return False
+                            crit_qualifiers = None, extra_crit_qualifiers = None, event_store = None):
+        criteria_list = [(column, criteria) for column, criteria in 
+                            (('type_id', crit_event_type_id), ('player_id', crit_player_id),
+                            ('team_id', crit_team_id), ('period_id', crit_period_id),
+                            ('min', crit_min), ('sec', crit_sec), ('outcome', crit_outcome),
+                            ('x', crit_x), ('y', crit_y), ('qualifiers', crit_qualifiers), 
+                            ('qualifiers', extra_crit_qualifiers)) if criteria is not None]
+        return (self.__event_store if event_store is None else event_store).filter(criteria_list)
+
+
+    def __build_df_all_events(self):
+        filtered_positions = self.__filter_event_list()
+        df = self.__get_df_from_positions(filtered_positions, with_type_id = True)
+        df["qualifiers"] = [self.__event_store.get_qualifiers(i) for i in filtered_positions]
+        return self.__merge_df_with_players_and_teams_info(df)
+
+
+    def __build_df_stat(self, stat, player_id = None, team_id = None, period_id = None):
+        filtered_positions = self.__filter_stat_events(stat, player_id = player_id, 
+                                                     team_id = team_id, period_id = period_id)
+        qualifier_columns = self.__STAT_QUALIFIER_COLUMNS.get(stat)
+
+        if len(filtered_positions) == 0:
+            partition_column = self.__event_store.get_partition_column()
+            return pd.DataFrame(columns = ([] if partition_column is None else [partition_column]) +
+                            ['id', 'event_id', 'period_id', 'min', 'sec', 'player_id', 
+                            'team_id', 'outcome', 'x_start', 'y_start'] + list(qualifier_columns or []))
+        elif stat == 'shots':
+            df = self.__get_df_from_positions(filtered_positions, with_type_id = True,
+                                            qualifier_columns = qualifier_columns)
+            map_types_id = {EVENT_IDS['Miss'] : "Miss",
+                     EVENT_IDS['Post'] : "Post",
+                     EVENT_IDS['Attempt Saved'] : "Attempt Saved",
+                     EVENT_IDS['Goal'] : "Goal"}
+            df['type_name'] = df['type_id'].map(map_types_id)
+            return self.__merge_df_with_players_and_teams_info(df)
         else:
-            return True
+            df = self.__get_df_from_positions(filtered_positions, qualifier_columns = qualifier_columns)
+            return self.__merge_df_with_players_and_teams_info(df)
 
 
-    def __check_criteria(self, attr_value, criteria):
-        return criteria.perform_operation(attr_value)
+    def __filter_stat_events(self, stat, player_id = None, team_id = None, period_id = None, event_store = None):
+        criteria_event_type_id = self.__STAT_CRITERIA[stat]['crit_event_type_id']
+        self.__check_loaded_type_ids(criteria_event_type_id.value if criteria_event_type_id.operator == Operator.IN 
+                                        else [criteria_event_type_id.value], stat.replace('_', ' '))
+        criteria_player_id = None if player_id is None else Criteria(Operator.EQ, player_id)
+        criteria_team_id = None if team_id is None else Criteria(Operator.EQ, team_id)
+        criteria_period_id = None if period_id is None else Criteria(Operator.EQ, period_id)
+        return self.__filter_event_list(crit_team_id = criteria_team_id, crit_player_id = criteria_player_id,
+                                        crit_period_id = criteria_period_id, event_store = event_store,
+                                        **self.__STAT_CRITERIA[stat])
+
+
+    def __get_df_from_positions(self, positions, with_type_id = False, qualifier_columns = None):
+        store = self.__event_store
+        data = {}
+        # Stores of several matches tell the match of every event
+        partition_column = store.get_partition_column()
+        if partition_column is not None:
+            data[partition_column] = store.get_column(partition_column)[positions]
+        data.update({"id": store.get_column('id')[positions], 
+                    "event_id": store.get_column('event_id')[positions]})
+        if with_type_id:
+            data["type_id"] = store.get_column('type_id')[positions]
+        data.update({"period_id": store.get_column('period_id')[positions],
+                    "min": store.get_column('min')[positions], 
+                    "sec": store.get_column('sec')[positions],
+                    "player_id": store.get_column('player_id')[positions],
+                    "team_id": store.get_column('team_id')[positions], 
+                    "outcome": store.get_column('outcome')[positions],
+                    "x_start": store.get_column('x')[positions], 
+                    "y_start": store.get_column('y')[positions]})
+        if qualifier_columns is not None:
+            for column, qualifier_id in qualifier_columns.items():
+                data[column] = store.get_qualifier_values(qualifier_id, positions)
+        return pd.DataFrame(data)
 
 
     def __get_dict_all_players(self, team_id = None):
-        set_player_ids = set()
-        for ev in self.__event_list:
-            if ev.player_id is not None and ev.player_id != UNDEFINED_INT:
-                if team_id is None or (ev.team_id is not None and ev.team_id == team_id):
-                    set_player_ids.add(ev.player_id)
-        return set_player_ids
+        if self.__roster is not None:
+            player_ids = self.__roster['player_id']
+            if team_id is not None:
+                player_ids = player_ids[self.__roster['team_id'] == team_id]
+        else:
+            player_ids = self.__event_store.get_column('player_id')
+            if team_id is not None:
+                player_ids = player_ids[self.__event_store.get_positions('team_id', team_id)]
+        # Sorted by player_id, so the order does not depend on how the events were loaded
+        # or updated (e.g. LiveStats returns the players in the same order)
+        return sorted(set(player_ids[player_ids != UNDEFINED_INT].tolist()))
+
+
+    def __check_loaded_type_ids(self, type_ids, label):
+        # type_ids None means that every event type is needed. A predicate may have
+        # dropped events of any type, so nothing can be computed from its loads
+        if self.__predicate_filtered:
+            raise ValueError(f'{label.capitalize()} need all the events of their types, but the events '
+                            'were filtered (predicate)')
+        if self.__type_ids is None:
+            return
+        missing = None if type_ids is None else sorted(set(type_ids) - self.__type_ids)
+        if missing is None or len(missing) > 0:
+            needed = 'all the event types' if missing is None else f'the event types {missing}'
+            raise ValueError(f'{label.capitalize()} need {needed}, but only the types '
+                            f'{sorted(self.__type_ids)} were loaded (type_ids)')
 
 
     def __define_pitch_lines(self, df_successful, df_unsuccessful, label_stat = '', 
@@ -1091,49 +1293,45 @@ class Events:
         return plt
 
 
-    def __get_specific_stat(self, stat, fn_get_stat, team_id = None,
+    def __get_specific_stat(self, stat, df_stat, player_ids,
                             label_outcome1 = 'successful', label_outcome0 = 'unsuccessful'):
-        num_stat = f'num_{stat}'
-        df = pd.DataFrame(columns=['player_id', 'player_name', num_stat, label_outcome1, label_outcome0, 'ratio'])
-        player_ids = self.__get_dict_all_players(team_id = team_id)
-        for plid in player_ids:
-            df_player = fn_get_stat(player_id = plid)
-            player_name = ''
-            if 'player_name' in self.__df_players.columns:
-                player_name = self.__df_players.loc[self.__df_players['player_id'] == plid, 'player_name'].iloc[0]
-            num_successful = len(df_player.query('outcome == 1')) if not df_player.empty else 0
-            num_unsuccessful = len(df_player.query('outcome == 0')) if not df_player.empty else 0
-            ratio = self.__compute_percentage(num_successful / (num_successful + num_unsuccessful) if (num_successful + num_unsuccessful) else 0)
-            df.loc[len(df)] = [plid, player_name, len(df_player.index), num_successful, num_unsuccessful, ratio]
-        df['player_id'] = pd.Series(df['player_id'] ,dtype = pd.Int64Dtype())
-        df[num_stat] = pd.Series(df[num_stat] ,dtype = pd.Int64Dtype())
-        df[label_outcome1] = pd.Series(df[label_outcome1] ,dtype = pd.Int64Dtype())
-        df[label_outcome0] = pd.Series(df[label_outcome0] ,dtype = pd.Int64Dtype())
-        return df.sort_values(by=['ratio', label_outcome1, label_outcome0], ascending=[False, False, True])
-
-
-    def __get_specific_stat_one_outcome(self, stat, fn_get_stat, team_id = None, 
+        df_counts = self.__count_by_player(df_stat, player_ids, StatTables.OUTCOME_CONDITIONS)
+        return StatTables.get_specific_stat(stat, df_counts, player_ids, self.__get_player_names(player_ids),
+                                            label_outcome1 = label_outcome1, label_outcome0 = label_outcome0)
+
+
+    def __get_specific_stat_one_outcome(self, stat, df_stat, player_ids,
                             label_outcome1 = 'successful'):
-        num_stat = f'num_{stat}'
-        df = pd.DataFrame(columns=['player_id', 'player_name', num_stat, label_outcome1])
-        player_ids = self.__get_dict_all_players(team_id = team_id)
-        for plid in player_ids:
-            df_player = fn_get_stat(player_id = plid)
-            player_name = ''
-            if 'player_name' in self.__df_players.columns:
-                player_name = self.__df_players.loc[self.__df_players['player_id'] == plid, 'player_name'].iloc[0]
-            num_successful = len(df_player) if not df_player.empty else 0 
-            df.loc[len(df)] = [plid, player_name, len(df_player.index), num_successful]
-        df['player_id'] = pd.Series(df['player_id'] ,dtype = pd.Int64Dtype())
-        df[num_stat] = pd.Series(df[num_stat] ,dtype = pd.Int64Dtype())
-        df[label_outcome1] = pd.Series(df[label_outcome1] ,dtype = pd.Int64Dtype())        
-        return df.sort_values(by=[label_outcome1], ascending=[False])
+        df_counts = self.__count_by_player(df_stat, player_ids, StatTables.OUTCOME_CONDITIONS)
+        return StatTables.get_specific_stat_one_outcome(stat, df_counts, player_ids, self.__get_player_names(player_ids),
+                                                        label_outcome1 = label_outcome1)
+
+
+    def __get_shots_stat(self, df_shots, player_ids):
+        df_counts = self.__count_by_player(df_shots, player_ids, StatTables.SHOT_CONDITIONS)
+        return StatTables.get_shots_stat(df_counts, player_ids, self.__get_player_names(player_ids))
+
 
+    def __count_by_player(self, df_stat, player_ids, conditions):
+        # Number of rows of each player for every condition (label -> (column, value)), 
+        # aggregated from a single frame with the events of the stat of every player of the match.
+        # A condition with column None counts all the rows of the player
+        if df_stat.empty:
+            return pd.DataFrame(0, index=player_ids, columns=list(conditions), dtype='int64')
+        data = {'player_id': df_stat['player_id']}
+        for label, (column, value) in conditions.items():
+            data[label] = True if column is None else df_stat[column] == value
+        df_counts = pd.DataFrame(data).groupby('player_id').sum()
+        return df_counts.reindex(player_ids, fill_value=0).astype('int64')
 
-    def __get_concrete_bar_chart(self, stat, fn_get_stat, team_id = None,
+
+    def __get_player_names(self, player_ids):
+        return StatTables.get_player_names(self.__df_players, player_ids)
+
+
+    def __get_concrete_bar_chart(self, stat, df,
                     label_outcome1 = 'successful', label_outcome0 = 'unsuccessful'):
         plt.rcParams["figure.figsize"] = [10, 6]
-        df = fn_get_stat(team_id = team_id)
         df_for_chart = self.__prepare_df_for_chart(df, label_outcome1, label_outcome0)  
         df_for_chart.plot(kind="barh", stacked=True, bottom=0.24) \
                     .legend(loc='lower right', ncol=2, title="Type")        
@@ -1146,10 +1344,9 @@ class Events:
         return plt
 
 
-    def __get_concrete_bar_chart_one_outcome(self, stat, fn_get_stat, team_id = None,
+    def __get_concrete_bar_chart_one_outcome(self, stat, df,
                     label_outcome1 = 'successful'):
         plt.rcParams["figure.figsize"] = [10, 6]
-        df = fn_get_stat(team_id = team_id)
         df_for_chart = self.__prepare_df_for_chart_one_outcome(df, label_outcome1)  
         df_for_chart.plot(kind="barh", bottom=0) \
                     .legend(loc='lower right', ncol=2, title="Type")        
@@ -1267,19 +1464,3 @@ class Events:
             return float(value)
         except (ValueError, TypeError):
             return UNDEFINED_FLOAT
-    
-
-    @staticmethod
-    def __tag_value_to_datetime(value):
-        for fmt in ('%Y-%m-%dT%H:%M:%S', '%Y-%m-%d'):
-            try:
-                return datetime.strptime(value, fmt)
-            except (ValueError, TypeError):
-                pass
-        return UNDEFINED_DATE
-
-
-    @staticmethod
-    def __compute_percentage(x):
-        return round(x * 100, 2)
-
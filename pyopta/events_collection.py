@@ -0,0 +1,314 @@
+import fnmatch
+import os
+
+import numpy as np
+import pandas as pd
+
+from event_store import EventStore
+from events import Events
+from game import Game
+from pass_matrix_builder import PassMatrixBuilder
+from season_pass_matrix import SeasonPassMatrix
+
+
+class EventsCollection:
+    """
+    Events of many Opta F24 files (e.g. a whole season) in a single columnar store.
+
+    The event stores of the files are concatenated one after another and partitioned
+    by match_id, so a query over all the matches is one scan of the store instead of
+    one query per file. The get_df_* and get_stats_* methods accept a match_id to
+    query a single match: its events are a slice of the store, so nothing is copied.
+    The Game of every file is kept as a row of the matches table (get_df_matches),
+    which is used to group stats by matchday.
+    """
+
+    # Columns of the frames of every match in the order of the Game attributes
+    MATCH_COLUMNS = list(Game.__slots__)
+
+    def __init__(self, dir_path, file_pattern = '*.xml', query_cache_size = 128, cache_dir = None,
+                 type_ids = None) -> None:
+        """
+        Constructor for the EventsCollection class.
+
+        :param dir_path: str, directory with the Opta F24 files.
+        :param file_pattern: str, optional, shell pattern of the names of the files to load.
+            Default is '*.xml'.
+        :param query_cache_size: int, optional, frames kept by the query cache of the
+            collection and of every match (see QueryCache). Default is 128.
+        :param cache_dir: str, optional, directory of the on-disk cache of parsed files
+            (see ParseCache). Default is None (no cache).
+        :param type_ids: list of int, optional, event types to load (see Events). Default
+            is None (all the events).
+        :return: None
+        """
+        file_names = sorted(fnmatch.filter(os.listdir(dir_path), file_pattern))
+        if len(file_names) == 0:
+            raise ValueError(f'There are no files matching {file_pattern} in {dir_path}')
+        games = []
+        stores = []
+        rosters = []
+        list_df_teams = []
+        for file_name in file_names:
+            events = Events(os.path.join(dir_path, file_name), query_cache_size = 0,
+                            cache_dir = cache_dir, type_ids = type_ids)
+            games.append(events.get_match_info())
+            stores.append(events.get_event_store())
+            rosters.append(events.get_roster())
+            list_df_teams.append(events.get_df_teams())
+
+        match_ids = [game.match_id for game in games]
+        self.__query_cache_size = query_cache_size
+        self.__type_ids = type_ids
+        self.__squad_files = []
+        self.__games = dict(zip(match_ids, games))
+        self.__match_events = {}
+        self.__event_store = EventStore.concatenate(stores, 'match_id', match_ids)
+        self.__roster = self.__concatenate_rosters(rosters, match_ids)
+        self.__df_teams = pd.concat(list_df_teams, ignore_index = True) \
+                            .drop_duplicates('team_id').reset_index(drop = True)
+        self.__df_matches = pd.DataFrame([[getattr(game, column) for column in self.MATCH_COLUMNS]
+                                          for game in games], columns = self.MATCH_COLUMNS)
+        self.__events = Events.from_event_store(self.__event_store, self.__df_teams, roster = self.__roster,
+                                                type_ids = type_ids, query_cache_size = query_cache_size)
+
+
+    def set_squads_info(self, file_path):
+        """
+        Adds the players info of a squads file to the collection and to its matches.
+
+        :param file_path: str, path of the Opta squads file.
+        :return: None
+        """
+        self.__squad_files.append(file_path)
+        self.__events.set_squads_info(file_path)
+        for events in self.__match_events.values():
+            events.set_squads_info(file_path)
+
+
+    def get_match_ids(self):
+        return list(self.__games)
+
+
+    def get_df_matches(self):
+        return self.__df_matches.copy()
+
+
+    def get_df_players(self):
+        return self.__events.get_df_players()
+
+
+    def get_df_teams(self):
+        return self.__df_teams.copy()
+
+
+    def get_match_events(self, match_id):
+        """
+        Events of a single match of the collection. They share the columns of the
+        collection store and are built the first time they are requested.
+
+        :param match_id: int, identifier of the match.
+        :return: Events
+        """
+        events = self.__match_events.get(match_id)
+        if events is None:
+            game = self.__games.get(match_id)
+            if game is None:
+                raise KeyError(f'Unknown match_id: {match_id}')
+            roster = None
+            if self.__roster is not None:
+                in_match = self.__roster['match_id'] == match_id
+                roster = {name: values[in_match] for name, values in self.__roster.items()}
+            df_teams = self.__df_teams[self.__df_teams['team_id'].isin([game.home_team_id, game.away_team_id])] \
+                            .reset_index(drop = True)
+            events = Events.from_event_store(self.__event_store.get_partition(match_id), df_teams,
+                                             game = game, roster = roster, type_ids = self.__type_ids,
+                                             query_cache_size = self.__query_cache_size)
+            for file_path in self.__squad_files:
+                events.set_squads_info(file_path)
+            self.__match_events[match_id] = events
+        return events
+
+
+    def get_df_all_events(self, match_id = None, allow_filtered = False):
+        return self.__get_events(match_id).get_df_all_events(allow_filtered = allow_filtered)
+
+
+    def get_df_passes(self, player_id = None, team_id = None, period_id = None, match_id = None):
+        return self.__get_events(match_id).get_df_passes(player_id, team_id, period_id)
+
+
+    def get_df_aerial_duels(self, player_id = None, team_id = None, period_id = None, match_id = None):
+        return self.__get_events(match_id).get_df_aerial_duels(player_id, team_id, period_id)
+
+
+    def get_df_fouls(self, player_id = None, team_id = None, period_id = None, match_id = None):
+        return self.__get_events(match_id).get_df_fouls(player_id, team_id, period_id)
+
+
+    def get_df_ball_recoveries(self, player_id = None, team_id = None, period_id = None, match_id = None):
+        return self.__get_events(match_id).get_df_ball_recoveries(player_id, team_id, period_id)
+
+
+    def get_df_clearances(self, player_id = None, team_id = None, period_id = None, match_id = None):
+        return self.__get_events(match_id).get_df_clearances(player_id, team_id, period_id)
+
+
+    def get_df_corners(self, player_id = None, team_id = None, period_id = None, match_id = None):
+        return self.__get_events(match_id).get_df_corners(player_id, team_id, period_id)
+
+
+    def get_df_shots(self, player_id = None, team_id = None, period_id = None, match_id = None):
+        return self.__get_events(match_id).get_df_shots(player_id, team_id, period_id)
+
+
+    def get_df_crosses(self, player_id = None, team_id = None, period_id = None, match_id = None):
+        return self.__get_events(match_id).get_df_crosses(player_id, team_id, period_id)
+
+
+    def get_df_tackles(self, player_id = None, team_id = None, period_id = None, match_id = None):
+        return self.__get_events(match_id).get_df_tackles(player_id, team_id, period_id)
+
+
+    def get_df_interceptions(self, player_id = None, team_id = None, period_id = None, match_id = None):
+        return self.__get_events(match_id).get_df_interceptions(player_id, team_id, period_id)
+
+
+    def get_all_stats(self, team_id = None, stats = None, match_id = None):
+        return self.__get_events(match_id).get_all_stats(team_id = team_id, stats = stats)
+
+
+    def get_stats_passes(self, team_id = None, match_id = None):
+        return self.get_all_stats(team_id = team_id, stats = ['passes'], match_id = match_id)['passes']
+
+
+    def get_stats_aerial_duels(self, team_id = None, match_id = None):
+        return self.get_all_stats(team_id = team_id, stats = ['aerial_duels'], match_id = match_id)['aerial_duels']
+
+
+    def get_stats_fouls(self, team_id = None, match_id = None):
+        return self.get_all_stats(team_id = team_id, stats = ['fouls'], match_id = match_id)['fouls']
+
+
+    def get_stats_ball_recoveries(self, team_id = None, match_id = None):
+        return self.get_all_stats(team_id = team_id, stats = ['ball_recoveries'], match_id = match_id)['ball_recoveries']
+
+
+    def get_stats_clearances(self, team_id = None, match_id = None):
+        return self.get_all_stats(team_id = team_id, stats = ['clearances'], match_id = match_id)['clearances']
+
+
+    def get_stats_corners(self, team_id = None, match_id = None):
+        return self.get_all_stats(team_id = team_id, stats = ['corners'], match_id = match_id)['corners']
+
+
+    def get_stats_crosses(self, team_id = None, match_id = None):
+        return self.get_all_stats(team_id = team_id, stats = ['crosses'], match_id = match_id)['crosses']
+
+
+    def get_stats_tackles(self, team_id = None, match_id = None):
+        return self.get_all_stats(team_id = team_id, stats = ['tackles'], match_id = match_id)['tackles']
+
+
+    def get_stats_shots(self, team_id = None, match_id = None):
+        return self.get_all_stats(team_id = team_id, stats = ['shots'], match_id = match_id)['shots']
+
+
+    def get_stats_interceptions(self, team_id = None, match_id = None):
+        return self.get_all_stats(team_id = team_id, stats = ['interceptions'], match_id = match_id)['interceptions']
+
+
+    def get_stats_by(self, stat, by = ('matchday', 'team_id')):
+        """
+        Totals of a stat grouped by any columns of its events and of the matches table
+        (e.g. matchday, team_id, match_id, player_id...). They are aggregated from the
+        events of every match at once.
+
+        :param stat: str, name of the stat (see Events.get_stat_names).
+        :param by: tuple of str, optional, columns to group by. Default is
+            ('matchday', 'team_id').
+        :return: DataFrame with the group columns (and team_name if the stat is grouped
+            by team_id), num_{stat} and the outcome columns of the get_stats_* table of
+            the stat.
+        """
+        if stat not in Events.get_stat_names():
+            raise ValueError(f'Unknown stat: {stat}')
+        by = list(by)
+        df = getattr(self.__events, f'get_df_{stat}')()
+        df = pd.merge(df, self.__df_matches, on = 'match_id', how = 'inner')
+        if stat == 'shots':
+            num_stat = 'num_shots'
+            # Frames without shots have not got the type_name column
+            type_names = df['type_name'] if 'type_name' in df.columns else pd.Series('', index = df.index)
+            outcomes = {'goal': type_names == 'Goal', 'attempt_saved': type_names == 'Attempt Saved',
+                        'post': type_names == 'Post', 'miss': type_names == 'Miss'}
+        else:
+            label_stat, label_outcome1, label_outcome0 = Events.get_stat_labels(stat)
+            num_stat = f'num_{label_stat}'
+            outcomes = {label_outcome1: df['outcome'] == 1}
+            if label_outcome0 is not None:
+                outcomes[label_outcome0] = df['outcome'] == 0
+        df_counts = pd.DataFrame({column: df[column] for column in by} | {num_stat: 1} | outcomes) \
+                        .groupby(by).sum().astype('int64').reset_index()
+        for column in [num_stat] + list(outcomes):
+            df_counts[column] = pd.Series(df_counts[column], dtype = pd.Int64Dtype())
+        if 'team_id' in by:
+            df_counts = pd.merge(df_counts, self.__df_teams, on = 'team_id', how = 'left')
+        return df_counts.sort_values(by = by).reset_index(drop = True)
+
+
+    def get_pass_matrices(self, team_id, period_id = None, minute_from = None, minute_to = None):
+        """
+        Pass matrices of a team in every match of the collection, built from the events
+        of all the matches at once (see PassMatrixBuilder).
+
+        :param team_id: int, identifier of the team.
+        :param period_id: int, optional, only the passes of a period.
+        :param minute_from: float, optional, only the passes from this minute (included).
+        :param minute_to: float, optional, only the passes until this minute (not included).
+        :return: dict of PassMatrix indexed by match_id, only with the matches of the team.
+        """
+        if self.__type_ids is not None:
+            raise ValueError('Pass matrices need all the event types, but only the types '
+                             f'{sorted(self.__type_ids)} were loaded (type_ids)')
+        df_teams = self.__df_teams[self.__df_teams['team_id'] == team_id]
+        if len(df_teams) == 0:
+            raise ValueError(f'Unknown team_id: {team_id}')
+        games = {match_id: game for match_id, game in self.__games.items()
+                    if team_id in (game.home_team_id, game.away_team_id)}
+        df_players = self.__events.get_df_players()
+        player_names = None
+        if 'player_name' in df_players.columns:
+            player_names = dict(zip(df_players['player_id'].tolist(), df_players['player_name'].tolist()))
+        return PassMatrixBuilder.build(self.__event_store, team_id, df_teams['team_name'].iloc[0], games,
+                                       player_names = player_names, period_id = period_id,
+                                       minute_from = minute_from, minute_to = minute_to)
+
+
+    def get_season_pass_matrix(self, team_id, period_id = None, minute_from = None, minute_to = None):
+        """
+        Pass matrix of a team in all the matches of the collection (see get_pass_matrices).
+
+        :return: SeasonPassMatrix
+        """
+        season_pass_matrix = SeasonPassMatrix()
+        for pass_matrix in self.get_pass_matrices(team_id, period_id = period_id, minute_from = minute_from,
+                                                  minute_to = minute_to).values():
+            season_pass_matrix.add_match(pass_matrix)
+        return season_pass_matrix
+
+
+    def __get_events(self, match_id):
+        return self.__events if match_id is None else self.get_match_events(match_id)
+
+
+    @staticmethod
+    def __concatenate_rosters(rosters, match_ids):
+        # The roster of a file is None when all its events were loaded: then its team
+        # and player ids are the ones of the events
+        if all(roster is None for roster in rosters):
+            return None
+        roster = {name: np.concatenate([values[name] for values in rosters]) for name in ('team_id', 'player_id')}
+        roster['match_id'] = np.repeat(np.array(match_ids, dtype=np.int64),
+                                       [len(values['team_id']) for values in rosters])
+        return roster
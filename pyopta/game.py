@@ -1,38 +1,59 @@
 from datetime import date
-from typing import Union
 
 from constants import (
     UNDEFINED_INT, UNDEFINED_DATE)
 
 
 class Game:
-    def __init__(self, **kwargs) -> None:
+    __slots__ = ('match_id', 'competition_id', 'competition_name', 'season_id', 'season_name',
+                 'matchday', 'game_date', 'period_1_start', 'period_2_start', 'home_team_id',
+                 'home_team_name', 'home_score', 'away_team_id', 'away_team_name', 'away_score',
+                 'additional_info')
+
+    def __init__(self, match_id: int = UNDEFINED_INT, competition_id: int = UNDEFINED_INT,
+                 competition_name: str = "", season_id: int = UNDEFINED_INT, season_name: str = "",
+                 matchday: int = UNDEFINED_INT, game_date: date = UNDEFINED_DATE,
+                 period_1_start: date = UNDEFINED_DATE, period_2_start: date = UNDEFINED_DATE,
+                 home_team_id: int = UNDEFINED_INT, home_team_name: str = "", home_score: int = UNDEFINED_INT,
+                 away_team_id: int = UNDEFINED_INT, away_team_name: str = "", away_score: int = UNDEFINED_INT,
+                 additional_info: str = "") -> None:
         """
         Constructor for the Game class.
 
-        :param kwargs: dictionary, optional, contains values for the properties of the Game object.
+        :param match_id: int, optional, the identifier of the match. Default is UNDEFINED_INT.
+        :param competition_id: int, optional, the identifier of the competition. Default is UNDEFINED_INT.
+        :param competition_name: str, optional, the name of the competition. Default is an empty string.
+        :param season_id: int, optional, the identifier of the season. Default is UNDEFINED_INT.
+        :param season_name: str, optional, the name of the season. Default is an empty string.
+        :param matchday: int, optional, the matchday of the match. Default is UNDEFINED_INT.
+        :param game_date: date, optional, the date of the match. Default is UNDEFINED_DATE.
+        :param period_1_start: date, optional, the start of the first half. Default is UNDEFINED_DATE.
+        :param period_2_start: date, optional, the start of the second half. Default is UNDEFINED_DATE.
+        :param home_team_id: int, optional, the identifier of the home team. Default is UNDEFINED_INT.
+        :param home_team_name: str, optional, the name of the home team. Default is an empty string.
+        :param home_score: int, optional, the goals of the home team. Default is UNDEFINED_INT.
+        :param away_team_id: int, optional, the identifier of the away team. Default is UNDEFINED_INT.
+        :param away_team_name: str, optional, the name of the away team. Default is an empty string.
+        :param away_score: int, optional, the goals of the away team. Default is UNDEFINED_INT.
+        :param additional_info: str, optional, additional information of the match. Default is an empty string.
         :return: None
         """
-        prop_defaults: dict[str, Union[int, str, date]] = {
-            "match_id": UNDEFINED_INT,
-            "competition_id": UNDEFINED_INT,
-            "competition_name": "",
-            "season_id": UNDEFINED_INT,
-            "season_name": "",
-            "matchday": UNDEFINED_INT,
-            "game_date": UNDEFINED_DATE,
-            "period_1_start": UNDEFINED_DATE,
-            "period_2_start": UNDEFINED_DATE,
-            "home_team_id": UNDEFINED_INT,
-            "home_team_name": "",
-            "home_score": UNDEFINED_INT,
-            "away_team_id": UNDEFINED_INT,
-            "away_team_name": "",
-            "away_score": UNDEFINED_INT,
-            "additional_info": ""
-        }
-        self.__dict__.update(prop_defaults)
-        self.__dict__.update(kwargs)
+        self.match_id = match_id
+        self.competition_id = competition_id
+        self.competition_name = competition_name
+        self.season_id = season_id
+        self.season_name = season_name
+        self.matchday = matchday
+        self.game_date = game_date
+        self.period_1_start = period_1_start
+        self.period_2_start = period_2_start
+        self.home_team_id = home_team_id
+        self.home_team_name = home_team_name
+        self.home_score = home_score
+        self.away_team_id = away_team_id
+        self.away_team_name = away_team_name
+        self.away_score = away_score
+        self.additional_info = additional_info
 
     def __str__(self) -> str:
         """
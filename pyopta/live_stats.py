@@ -0,0 +1,276 @@
+import pandas as pd
+
+from constants import UNDEFINED_INT
+from Operator import *
+from events import Events
+from stat_tables import StatTables
+
+
+class LiveStats:
+    """
+    Accumulators of the stats of a match that are updated event by event, so the
+    get_stats_* tables of a live match can be refreshed without scanning its events.
+
+    For every stat (see Events.get_stat_names) the accumulators keep the counts of
+    StatTables.OUTCOME_CONDITIONS (SHOT_CONDITIONS for shots) of every player and of
+    every team. Adding, removing or updating an event only touches the counts of that
+    event, and the tables are the same ones that the get_stats_* methods of Events
+    return for the same events.
+
+    The accumulators are seeded with the events of an Events object and can then be
+    fed with the changes of its updates:
+
+        live_stats = LiveStats(events)
+        events.update_from(file_path, fn_on_event = live_stats.update_event)
+    """
+
+    def __init__(self, events) -> None:
+        """
+        Constructor for the LiveStats class.
+
+        :param events: Events, events of the match. Its players info is used to name
+            the players of the tables.
+        :return: None
+        """
+        if events.is_predicate_filtered():
+            raise ValueError('Live stats need all the events of their types, but the events were '
+                             'filtered (predicate)')
+        self.__events = events
+        self.__stats = Events.get_stat_names()
+        self.__criteria = {stat: list(Events.get_stat_criteria(stat).values()) for stat in self.__stats}
+        # stat -> player_id / team_id -> counts of the conditions of the stat
+        self.__player_counts = {stat: {} for stat in self.__stats}
+        self.__team_counts = {stat: {} for stat in self.__stats}
+        # player_id -> number of events, in the order the players appear (also by team_id)
+        self.__players = {}
+        self.__team_players = {}
+        self.__seed(events)
+
+
+    def add_event(self, event):
+        """
+        Adds an event to the accumulators.
+
+        :param event: Event
+        :return: None
+        """
+        self.__count_event(event, 1)
+
+
+    def remove_event(self, event):
+        """
+        Removes from the accumulators an event that was added before.
+
+        :param event: Event
+        :return: None
+        """
+        self.__count_event(event, -1)
+
+
+    def update_event(self, old_event, new_event):
+        """
+        Replaces an event of the accumulators with its new version. Either of them can
+        be None to insert or delete an event, so this method can be passed as the
+        fn_on_event of Events.update_from.
+
+        :param old_event: Event, previous version of the event (None if it is new).
+        :param new_event: Event, new version of the event (None if it was deleted).
+        :return: None
+        """
+        if old_event is not None:
+            self.remove_event(old_event)
+        if new_event is not None:
+            self.add_event(new_event)
+
+
+    def get_all_stats(self, team_id = None, stats = None):
+        stats = list(self.__stats) if stats is None else list(stats)
+        for stat in stats:
+            if stat not in self.__player_counts:
+                raise ValueError(f'Unknown stat: {stat}')
+        player_ids = list(self.__get_dict_all_players(team_id = team_id))
+        df_players = self.__events.get_df_players()
+        player_names = StatTables.get_player_names(df_players, player_ids)
+        # With players info, events of players without info are not counted (as in Events)
+        counted_ids = None if 'player_name' not in df_players.columns else set(df_players['player_id'].tolist())
+        all_stats = {}
+        for stat in stats:
+            df_counts = self.__get_df_counts(stat, player_ids, counted_ids)
+            if stat == 'shots':
+                all_stats[stat] = StatTables.get_shots_stat(df_counts, player_ids, player_names)
+            else:
+                label_stat, label_outcome1, label_outcome0 = Events.get_stat_labels(stat)
+                if label_outcome0 is None:
+                    all_stats[stat] = StatTables.get_specific_stat_one_outcome(label_stat, df_counts, player_ids,
+                                                player_names, label_outcome1 = label_outcome1)
+                else:
+                    all_stats[stat] = StatTables.get_specific_stat(label_stat, df_counts, player_ids,
+                                                player_names, label_outcome1 = label_outcome1,
+                                                label_outcome0 = label_outcome0)
+        return all_stats
+
+
+    def get_stats_passes(self, team_id = None):
+        return self.get_all_stats(team_id = team_id, stats = ['passes'])['passes']
+
+
+    def get_stats_aerial_duels(self, team_id = None):
+        return self.get_all_stats(team_id = team_id, stats = ['aerial_duels'])['aerial_duels']
+
+
+    def get_stats_fouls(self, team_id = None):
+        return self.get_all_stats(team_id = team_id, stats = ['fouls'])['fouls']
+
+
+    def get_stats_ball_recoveries(self, team_id = None):
+        return self.get_all_stats(team_id = team_id, stats = ['ball_recoveries'])['ball_recoveries']
+
+
+    def get_stats_clearances(self, team_id = None):
+        return self.get_all_stats(team_id = team_id, stats = ['clearances'])['clearances']
+
+
+    def get_stats_corners(self, team_id = None):
+        return self.get_all_stats(team_id = team_id, stats = ['corners'])['corners']
+
+
+    def get_stats_crosses(self, team_id = None):
+        return self.get_all_stats(team_id = team_id, stats = ['crosses'])['crosses']
+
+
+    def get_stats_tackles(self, team_id = None):
+        return self.get_all_stats(team_id = team_id, stats = ['tackles'])['tackles']
+
+
+    def get_stats_shots(self, team_id = None):
+        return self.get_all_stats(team_id = team_id, stats = ['shots'])['shots']
+
+
+    def get_stats_interceptions(self, team_id = None):
+        return self.get_all_stats(team_id = team_id, stats = ['interceptions'])['interceptions']
+
+
+    def get_team_stats(self, stat):
+        """
+        Totals of a stat of every team.
+
+        :param stat: str, name of the stat (see Events.get_stat_names).
+        :return: DataFrame with team_id, team_name, num_{stat} and the outcome columns
+            of the get_stats_* table of the stat.
+        """
+        if stat not in self.__team_counts:
+            raise ValueError(f'Unknown stat: {stat}')
+        df_teams = self.__events.get_df_teams()
+        team_ids = df_teams['team_id'].tolist()
+        counts = [self.__team_counts[stat].get(team_id, self.__empty_counts(stat)) for team_id in team_ids]
+        if stat == 'shots':
+            num_stat = 'num_shots'
+            columns = list(StatTables.SHOT_CONDITIONS)
+            data = {column: [c[i] for c in counts] for i, column in enumerate(columns)}
+            data = {num_stat: [sum(c) for c in counts]} | data
+        else:
+            label_stat, label_outcome1, label_outcome0 = Events.get_stat_labels(stat)
+            num_stat = f'num_{label_stat}'
+            data = {num_stat: [c[0] for c in counts]}
+            if label_outcome0 is None:
+                # Single outcome stats count all their events (see get_specific_stat_one_outcome)
+                data[label_outcome1] = data[num_stat]
+            else:
+                data[label_outcome1] = [c[1] for c in counts]
+                data[label_outcome0] = [c[2] for c in counts]
+        df = pd.DataFrame({'team_id': team_ids, 'team_name': df_teams['team_name'].tolist()} | data)
+        for column in data:
+            df[column] = pd.Series(df[column], dtype = pd.Int64Dtype())
+        return df
+
+
+    def __seed(self, events):
+        # The counts start with the events of the match, read from the columns of the store
+        store = events.get_event_store()
+        q_offsets = store.get_column('q_offsets').tolist()
+        q_qualifier_ids = store.get_column('q_qualifier_id').tolist()
+        for position, (type_id, team_id, player_id, outcome) in enumerate(zip(
+                    store.get_column('type_id').tolist(), store.get_column('team_id').tolist(),
+                    store.get_column('player_id').tolist(), store.get_column('outcome').tolist())):
+            self.__count(type_id, team_id, player_id, outcome,
+                         q_qualifier_ids[q_offsets[position]:q_offsets[position + 1]], 1)
+
+
+    def __count_event(self, event, increment):
+        qualifiers_list = event.qualifiers_list
+        if hasattr(qualifiers_list, 'get_raw'):
+            qualifier_ids = qualifiers_list.get_raw()[1]
+        else:
+            qualifier_ids = [q.qualifier_id for q in qualifiers_list]
+        self.__count(event.type_id, event.team_id, event.player_id, event.outcome, qualifier_ids, increment)
+
+
+    def __count(self, type_id, team_id, player_id, outcome, qualifier_ids, increment):
+        self.__count_player(team_id, player_id, increment)
+        qualifier_ids = set(qualifier_ids.tolist() if hasattr(qualifier_ids, 'tolist') else qualifier_ids)
+        for stat in self.__stats:
+            if not self.__is_stat_event(self.__criteria[stat], type_id, qualifier_ids):
+                continue
+            if stat == 'shots':
+                conditions = StatTables.SHOT_CONDITIONS.values()
+            else:
+                conditions = StatTables.OUTCOME_CONDITIONS.values()
+            values = {'type_id': type_id, 'outcome': outcome}
+            deltas = [increment if column is None or values[column] == value else 0 for column, value in conditions]
+            for counts_by_key, key in ((self.__player_counts[stat], player_id), (self.__team_counts[stat], team_id)):
+                counts = counts_by_key.get(key)
+                if counts is None:
+                    counts = counts_by_key[key] = self.__empty_counts(stat)
+                for i, delta in enumerate(deltas):
+                    counts[i] += delta
+
+
+    def __count_player(self, team_id, player_id, increment):
+        if player_id == UNDEFINED_INT:
+            return
+        for players in (self.__players, self.__team_players.setdefault(team_id, {})):
+            num_events = players.get(player_id, 0) + increment
+            if num_events > 0:
+                players[player_id] = num_events
+            else:
+                players.pop(player_id, None)
+
+
+    @staticmethod
+    def __is_stat_event(criteria_list, type_id, qualifier_ids):
+        for criteria in criteria_list:
+            if criteria.operator == Operator.QIN:
+                if qualifier_ids.isdisjoint(criteria.value):
+                    return False
+            elif criteria.operator == Operator.QNIN:
+                if not qualifier_ids.isdisjoint(criteria.value):
+                    return False
+            elif not criteria.perform_operation(type_id):
+                return False
+        return True
+
+
+    def __get_dict_all_players(self, team_id = None):
+        # Same players, in the same order, as Events: sorted by player_id
+        roster = self.__events.get_roster()
+        if roster is not None:
+            # Events loaded with filters: the players are the ones of all the events of the
+            # file, read at every call because every update of the events reads them again
+            player_ids = roster['player_id']
+            if team_id is not None:
+                player_ids = player_ids[roster['team_id'] == team_id]
+            return sorted(set(player_ids[player_ids != UNDEFINED_INT].tolist()))
+        return sorted(self.__players if team_id is None else self.__team_players.get(team_id, {}))
+
+
+    def __get_df_counts(self, stat, player_ids, counted_ids):
+        columns = list(StatTables.SHOT_CONDITIONS if stat == 'shots' else StatTables.OUTCOME_CONDITIONS)
+        rows = [self.__player_counts[stat].get(player_id, self.__empty_counts(stat))
+                    if counted_ids is None or player_id in counted_ids else self.__empty_counts(stat)
+                for player_id in player_ids]
+        return pd.DataFrame(rows, index = player_ids, columns = columns, dtype = 'int64')
+
+
+    @staticmethod
+    def __empty_counts(stat):
+        return [0] * len(StatTables.SHOT_CONDITIONS if stat == 'shots' else StatTables.OUTCOME_CONDITIONS)
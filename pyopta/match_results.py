@@ -7,6 +7,8 @@ import matplotlib.pyplot as plt
 from mplsoccer import Radar, FontManager, grid
 
 from constants import UNDEFINED_INT
+from opta_source import OptaSource
+from parse_cache import ParseCache
 from player import Player
 from team import Team
 
@@ -19,12 +21,28 @@ class MatchResults:
     Parameters:
     file_path (str): The path to the Opta F9 xml file that contains the data
     """    
-    def __init__(self, file_path):
-        self.__teams = []
-        self.__players = []
-        self.__players_stats = []
-        self.__all_stat_types_set = set()
-        self.__parse_f9opta_file(file_path)
+    def __init__(self, file_path, cache_dir = None):
+        self.__init_state()
+        if cache_dir is not None:
+            self.__load_f9opta_file_cached(file_path, cache_dir)
+        else:
+            self.__parse_f9opta_file(file_path)
+
+
+    @classmethod
+    def from_columnar(cls, metadata, columns = None):
+        match_results = cls.__new__(cls)
+        match_results.__init_state()
+        match_results.__set_columnar(metadata)
+        return match_results
+
+
+    def to_columnar(self):
+        # F9 files are small, so everything is kept in the metadata (there are no columns)
+        return ({'teams': [ParseCache.object_to_dict(t) for t in self.__teams],
+                'players': [ParseCache.object_to_dict(p) for p in self.__players],
+                'players_stats': self.__players_stats,
+                'all_stat_types': sorted(self.__all_stat_types_set)}, {})
 
     
     def get_df_players_stats(self):
@@ -192,8 +210,36 @@ class MatchResults:
         return plt
 
 
+    def __load_f9opta_file_cached(self, file_path, cache_dir):
+        parse_cache = ParseCache(cache_dir)
+        # File objects are read once, to hash and parse the same content
+        file_path = OptaSource.to_cacheable(file_path)
+        key = parse_cache.get_key(file_path, 'f9')
+        cached = parse_cache.load(key)
+        if cached is None:
+            self.__parse_f9opta_file(file_path)
+            parse_cache.store(key, *self.to_columnar())
+        else:
+            self.__set_columnar(cached[0])
+
+
+    def __init_state(self):
+        self.__teams = []
+        self.__players = []
+        self.__players_stats = []
+        self.__all_stat_types_set = set()
+
+
+    def __set_columnar(self, metadata):
+        self.__teams = [Team(**t) for t in metadata['teams']]
+        self.__players = [Player(**p) for p in metadata['players']]
+        self.__players_stats = metadata['players_stats']
+        self.__all_stat_types_set = set(metadata['all_stat_types'])
+
+
     def __parse_f9opta_file(self, file_path):
-        tree = ET.parse(file_path)
+        with OptaSource.open(file_path) as f:
+            tree = ET.parse(f)
         root = tree.getroot()
         
         list_team_tag = root.findall('.//Team')
@@ -0,0 +1,86 @@
+import gzip
+import io
+import zipfile
+from contextlib import contextmanager
+
+
+class OptaSource:
+    """
+    Inputs accepted by the parsers of Opta files (Events, PassMatrix, MatchResults):
+
+    - the path of a file. It can be gzip compressed or a zip archive with a single member.
+    - the content of a file as bytes.
+    - a binary file object (e.g. an open file, a member of a zip archive opened with
+      ZipFile.open or a network stream).
+
+    Compressed content is detected by its magic bytes (not by the file name) and
+    decompressed while it is parsed, so it is never written to a temporary file nor
+    fully decompressed in memory.
+    """
+
+    GZIP_MAGIC = b'\x1f\x8b'
+
+    @staticmethod
+    @contextmanager
+    def open(source):
+        """
+        Opens a source as a binary file object with the (decompressed) XML content.
+
+        :param source: str, path-like, bytes or binary file object.
+        :return: context manager of a binary file object. Files opened here are closed
+            on exit; file objects passed as source are left open.
+        """
+        if isinstance(source, (bytes, bytearray, memoryview)):
+            f = io.BytesIO(source)
+        elif hasattr(source, 'read'):
+            f = source
+        elif zipfile.is_zipfile(source):
+            with zipfile.ZipFile(source) as archive:
+                names = [info.filename for info in archive.infolist() if not info.is_dir()]
+                if len(names) != 1:
+                    raise ValueError(f'The zip archive {source} has {len(names)} files: open its members '
+                                     'with ZipFile.open or iterate them with batch.iter_zip')
+                with archive.open(names[0]) as member:
+                    with OptaSource.open(member) as f:
+                        yield f
+            return
+        else:
+            f = open(source, 'rb')
+        try:
+            if OptaSource.__peek(f, len(OptaSource.GZIP_MAGIC)) == OptaSource.GZIP_MAGIC:
+                with gzip.GzipFile(fileobj = f, mode = 'rb') as gz:
+                    yield gz
+            else:
+                yield f
+        finally:
+            if f is not source:
+                f.close()
+
+
+    @staticmethod
+    def to_cacheable(source):
+        """
+        Source that can be hashed by ParseCache and parsed afterwards: file objects can
+        only be read once, so their content is read into bytes. Paths and bytes are
+        returned as they are.
+
+        :param source: str, path-like, bytes or binary file object.
+        :return: str, path-like or bytes.
+        """
+        if hasattr(source, 'read'):
+            return source.read()
+        return source
+
+
+    @staticmethod
+    def __peek(f, size):
+        # First bytes of a file object without consuming them. Streams that can not peek
+        # nor seek are taken as uncompressed
+        if hasattr(f, 'peek'):
+            return f.peek(size)[:size]
+        if f.seekable():
+            position = f.tell()
+            head = f.read(size)
+            f.seek(position)
+            return head
+        return b''
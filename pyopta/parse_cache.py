@@ -0,0 +1,133 @@
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+from datetime import datetime
+
+import numpy as np
+
+
+class ParseCache:
+    """
+    On-disk cache of parsed Opta files.
+
+    Every entry is a directory of the cache directory named after the kind of file,
+    the parser version and the sha256 of the file content, so editing a file or
+    changing the parser never returns stale data. An entry holds a metadata.json
+    file (scalar values, lists and dicts; datetimes are supported) and one .npy file
+    per column. Columns are memory-mapped when the entry is loaded, so a warm load
+    skips the XML parsing entirely and only reads the pages that are used.
+    """
+
+    # Increase it whenever the parsers change what they produce
+    PARSER_VERSION = 2
+    METADATA_FILE = 'metadata.json'
+
+    def __init__(self, cache_dir) -> None:
+        """
+        Constructor for the ParseCache class.
+
+        :param cache_dir: str, directory of the cache. It is created if it does not exist.
+        :return: None
+        """
+        self.__cache_dir = cache_dir
+        os.makedirs(cache_dir, exist_ok = True)
+
+
+    def get_key(self, source, kind):
+        """
+        Key of the cache entry of a file.
+
+        :param source: str or bytes, path of the Opta file or its content (see
+            OptaSource.to_cacheable).
+        :param kind: str, kind of file (e.g. 'f24', 'f27', 'f9').
+        :return: str
+        """
+        digest = hashlib.sha256()
+        if isinstance(source, (bytes, bytearray, memoryview)):
+            digest.update(source)
+        else:
+            with open(source, 'rb') as f:
+                for chunk in iter(lambda: f.read(1 << 20), b''):
+                    digest.update(chunk)
+        return f'{kind}-v{self.PARSER_VERSION}-{digest.hexdigest()}'
+
+
+    def load(self, key):
+        """
+        Reads a cache entry.
+
+        :param key: str, key of the entry (see get_key).
+        :return: tuple (metadata, columns) with the metadata dict and a dict of read-only
+            memory-mapped numpy arrays indexed by column name, or None if the entry does
+            not exist.
+        """
+        entry_dir = os.path.join(self.__cache_dir, key)
+        try:
+            with open(os.path.join(entry_dir, self.METADATA_FILE), 'r') as f:
+                entry = json.load(f, object_hook = self.__decode_value)
+        except FileNotFoundError:
+            return None
+        columns = {name: np.load(os.path.join(entry_dir, f'{i}.npy'), mmap_mode = 'r')
+                    for i, name in enumerate(entry['columns'])}
+        return entry['metadata'], columns
+
+
+    def store(self, key, metadata, columns = None):
+        """
+        Writes a cache entry. The entry is written in a temporary directory and renamed,
+        so concurrent readers never see a partial entry.
+
+        :param key: str, key of the entry (see get_key).
+        :param metadata: dict, JSON serializable values (datetimes are supported).
+        :param columns: dict, optional, numpy arrays indexed by column name. Object arrays
+            are stored as unicode strings. Default is None (no columns).
+        :return: None
+        """
+        columns = {} if columns is None else columns
+        tmp_dir = tempfile.mkdtemp(dir = self.__cache_dir, prefix = '.tmp-')
+        try:
+            for i, values in enumerate(columns.values()):
+                values = np.asarray(values)
+                if values.dtype == object:
+                    values = values.astype(str)
+                np.save(os.path.join(tmp_dir, f'{i}.npy'), values)
+            with open(os.path.join(tmp_dir, self.METADATA_FILE), 'w') as f:
+                json.dump({'columns': list(columns), 'metadata': metadata}, f,
+                            default = self.__encode_value)
+            os.replace(tmp_dir, os.path.join(self.__cache_dir, key))
+        except OSError:
+            # The cache is best effort: if the entry can not be written (e.g. another
+            # process stored it first) the file is just parsed again next time
+            pass
+        finally:
+            shutil.rmtree(tmp_dir, ignore_errors = True)
+
+
+    @staticmethod
+    def object_to_dict(obj):
+        """
+        Attributes of a slotted model object (Game, Player, Team...) as a dict that can 
+        be stored in the metadata and passed back to the constructor of its class.
+
+        :param obj: object, instance of a class with __slots__.
+        :return: dict
+        """
+        return {name: getattr(obj, name) for name in obj.__slots__}
+
+
+    @staticmethod
+    def __encode_value(value):
+        if isinstance(value, datetime):
+            return {'__datetime__': value.isoformat()}
+        if isinstance(value, np.generic):
+            return value.item()
+        raise TypeError(f'Value of type {type(value).__name__} can not be cached')
+
+
+    @staticmethod
+    def __decode_value(value):
+        if '__datetime__' in value:
+            return datetime.fromisoformat(value['__datetime__'])
+        return value
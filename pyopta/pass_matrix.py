@@ -1,31 +1,85 @@
-from datetime import datetime
 import xml.etree.ElementTree as ET
 
 import matplotlib.pyplot as plt
 from matplotlib.colors import to_rgba
+import numpy as np
 import pandas as pd
 
 from mplsoccer.pitch import Pitch
 
-from constants import UNDEFINED_DATE, UNDEFINED_FLOAT, UNDEFINED_INT
+from constants import UNDEFINED_FLOAT, UNDEFINED_INT
 from game import Game
+from opta_source import OptaSource
+from parse_cache import ParseCache
+from pass_network import PassNetwork
+from timestamps import TimestampDecoder
 
 
 class PassMatrix:
     
-    def __init__(self, file_path):
-        self.__team_id = None
-        self.__team_name = None
-        self.__match = None
-        self.__df_pass_matrix = None
-        self.__parse_f27opta_file(file_path)
+    def __init__(self, file_path, cache_dir = None):
+        self.__init_state()
+        if cache_dir is not None:
+            self.__load_f27opta_file_cached(file_path, cache_dir)
+        else:
+            self.__parse_f27opta_file(file_path)
+
+
+    @classmethod
+    def from_columnar(cls, metadata, columns):
+        pass_matrix = cls.__new__(cls)
+        pass_matrix.__init_state()
+        pass_matrix.__set_columnar(metadata, columns)
+        return pass_matrix
+
+
+    def to_columnar(self):
+        # Compact representation of the parsed file (see ParseCache): a metadata dict and
+        # the columns of the pass matrix
+        return ({'team_id': self.__team_id, 'team_name': self.__team_name, 
+                'match': ParseCache.object_to_dict(self.__match)},
+                {column: self.__df_pass_matrix[column].to_numpy() for column in self.__df_pass_matrix.columns})
 
 
     def get_df_pass_matrix(self):
         return self.__df_pass_matrix
 
 
-    def get_pitch_pass_matrix(self, with_subs = False, team_color='#FF0000', passes_color='#eeeeee', min_passes = 1):
+    def get_match_info(self):
+        return self.__match
+
+
+    def get_team_id(self):
+        return self.__team_id
+
+
+    def get_team_name(self):
+        return self.__team_name
+
+
+    def get_pass_network(self):
+        return self.__pass_network
+
+
+    def get_df_network_metrics(self):
+        return self.__pass_network.get_df_metrics()
+
+
+    def get_top_links(self, k = 10):
+        return self.__pass_network.get_top_links(k = k)
+
+
+    def get_pitch_pass_matrix(self, with_subs = False, team_color='#FF0000', passes_color='#eeeeee', min_passes = 1,
+                              secondary_title = None):
+        self.get_figure_pass_matrix(with_subs = with_subs, team_color = team_color, passes_color = passes_color,
+                                    min_passes = min_passes, secondary_title = secondary_title)
+        return plt
+
+
+    def get_figure_pass_matrix(self, with_subs = False, team_color='#FF0000', passes_color='#eeeeee', min_passes = 1,
+                               secondary_title = None):
+        # The figure is only drawn through its own axes, so it can be rendered and saved
+        # without the pyplot state (the caller closes it, e.g. with plt.close(fig))
         PASSES_MAX_LINE_WIDTH = 14
         MAX_MARKER_SIZE = 800
 
@@ -39,6 +93,12 @@ class PassMatrix:
         df_mean_norm.rename(columns = {'from_name_x':'from_name'}, inplace = True)
         df_line_passes_norm = self.__df_pass_matrix[(self.__df_pass_matrix.to_id != UNDEFINED_INT) & 
                                 (self.__df_pass_matrix.num_passes >= min_passes)]
+        # Players without location (e.g. receivers without info in the file) are not drawn
+        df_mean_norm = df_mean_norm[(df_mean_norm.from_x != UNDEFINED_FLOAT) & (df_mean_norm.from_y != UNDEFINED_FLOAT)]
+        df_line_passes_norm = df_line_passes_norm[(df_line_passes_norm.from_x != UNDEFINED_FLOAT) & 
+                                (df_line_passes_norm.from_y != UNDEFINED_FLOAT) &
+                                (df_line_passes_norm.to_x != UNDEFINED_FLOAT) & 
+                                (df_line_passes_norm.to_y != UNDEFINED_FLOAT)]
         
 
         pitch = Pitch(pitch_type = 'opta', pitch_color='grass', line_color='white',
@@ -96,7 +156,8 @@ class PassMatrix:
             
         # TITLES
         main_title = f'Pass matrix - {self.__team_name}'
-        secondary_title = f'{self.__match.competition_name} ({self.__match.season_name}). Date: {self.__match.game_date}. {self.__match.home_team_name} - {self.__match.away_team_name}'
+        if secondary_title is None:
+            secondary_title = f'{self.__match.competition_name} ({self.__match.season_name}). Date: {self.__match.game_date}. {self.__match.home_team_name} - {self.__match.away_team_name}'
         
         axs['title'].text(0.5, 0.7, main_title, color='#000000',
                   va='center', ha='center', fontsize=18)
@@ -124,17 +185,53 @@ class PassMatrix:
                             12 - 2.5 * i,
                             f"{df_top['from_jersey_num'].astype(int).iloc[i]} --> {df_top['to_jersey_num'].iloc[i]}: {df_top['num_passes'].iloc[i]} passes.",
                             color='#000000', fontsize=6)
-        return plt
+        return fig
+
+
+    def __load_f27opta_file_cached(self, file_path, cache_dir):
+        parse_cache = ParseCache(cache_dir)
+        # File objects are read once, to hash and parse the same content
+        file_path = OptaSource.to_cacheable(file_path)
+        key = parse_cache.get_key(file_path, 'f27')
+        cached = parse_cache.load(key)
+        if cached is None:
+            self.__parse_f27opta_file(file_path)
+            parse_cache.store(key, *self.to_columnar())
+        else:
+            self.__set_columnar(*cached)
+
+
+    def __init_state(self):
+        self.__team_id = None
+        self.__team_name = None
+        self.__match = None
+        self.__df_pass_matrix = None
+        self.__pass_network = None
+        self.__timestamp_decoder = TimestampDecoder(('%Y-%m-%dT%H:%M:%S', '%Y-%m-%d %H:%M:%S', '%Y-%m-%d'))
+
+
+    def __set_columnar(self, metadata, columns):
+        self.__team_id = metadata['team_id']
+        self.__team_name = metadata['team_name']
+        self.__match = Game(**metadata['match'])
+        self.__df_pass_matrix = pd.DataFrame(columns)
+        self.__pass_network = PassNetwork.from_df_pass_matrix(self.__df_pass_matrix)
 
 
     def __parse_f27opta_file(self, file_path):
-        tree = ET.parse(file_path)
+        with OptaSource.open(file_path) as f:
+            tree = ET.parse(f)
         root = tree.getroot()        
         self.__match = self.__parse_soccerfeed_tag(root)
+        player_tags = root.findall('Player')
+        # Attributes of every player decoded once, indexed by player_id to look up the receivers
+        list_dict_from = [self.__parse_player_attributes(player_tag) for player_tag in player_tags]
+        players_index = {dict_from['from_id']: dict_from for dict_from in list_dict_from}
         list_players_matrix = []
-        for player_tag in root.findall('Player'):
-            list_players_matrix.extend(self.__parse_player_tag(player_tag, root))
+        for player_tag, dict_from in zip(player_tags, list_dict_from):
+            list_players_matrix.extend(self.__parse_player_tag(player_tag, dict_from, players_index))
         self.__df_pass_matrix = pd.DataFrame(list_players_matrix)
+        self.__pass_network = PassNetwork.from_df_pass_matrix(self.__df_pass_matrix)
 
 
     def __parse_soccerfeed_tag(self, soccerfeed_tag):
@@ -143,7 +240,7 @@ class PassMatrix:
         away_team_name = self.__tag_value_to_str(soccerfeed_tag.get('away_team_name'))
         competition_id = self.__tag_value_to_int(soccerfeed_tag.get('competition_id'))
         competition_name = self.__tag_value_to_str(soccerfeed_tag.get('competition_name'))
-        game_date = self.__tag_value_to_datetime(soccerfeed_tag.get('game_date'))
+        game_date = self.__timestamp_decoder.decode(soccerfeed_tag.get('game_date'))
         home_team_id = self.__tag_value_to_int(soccerfeed_tag.get('home_team_id'))
         home_team_name = self.__tag_value_to_str(soccerfeed_tag.get('home_team_name'))
         season_id = self.__tag_value_to_int(soccerfeed_tag.get('season_id'))
@@ -157,15 +254,18 @@ class PassMatrix:
                     season_id = season_id, season_name = season_name)
 
 
-    def __parse_player_tag(self, player_tag, root):        
+    def __parse_player_attributes(self, player_tag):
         from_id = self.__tag_value_to_int(player_tag.get('player_id'))
         from_name = self.__tag_value_to_str(player_tag.get('player_name'))
         from_jersey_num = self.__tag_value_to_int(player_tag.get('jersey_num'))
         from_position = self.__tag_value_to_str(player_tag.get('position'))
         from_x = self.__tag_value_to_float(player_tag.get('x'))
         from_y = self.__tag_value_to_float(player_tag.get('y'))
-        dict_from = {'from_id': from_id, 'from_name': from_name, 'from_jersey_num': from_jersey_num,
-                        'from_position': from_position, 'from_x': from_x, 'from_y': from_y}
+        return {'from_id': from_id, 'from_name': from_name, 'from_jersey_num': from_jersey_num,
+                'from_position': from_position, 'from_x': from_x, 'from_y': from_y}
+
+
+    def __parse_player_tag(self, player_tag, dict_from, players_index):
         to_players = player_tag.findall('Player')
         if len(to_players) == 0:
             dict_to = {'to_id': UNDEFINED_INT, 'to_name': '', 'to_position': '', 
@@ -177,27 +277,26 @@ class PassMatrix:
                 to_id = self.__tag_value_to_int(to_tag.get('player_id'))
                 to_name = self.__tag_value_to_str(to_tag.get('player_name'))
                 num_passes = self.__tag_value_to_int(to_tag.text)
-                for root_player in root.findall('Player'):
-                    if self.__tag_value_to_int(root_player.get('player_id')) == to_id:
-                        to_jersey_num = self.__tag_value_to_int(root_player.get('jersey_num'))
-                        to_position = self.__tag_value_to_str(root_player.get('position'))
-                        to_x = self.__tag_value_to_float(root_player.get('x'))
-                        to_y = self.__tag_value_to_float(root_player.get('y'))
-                        dict_to = {'to_id': to_id, 'to_name': to_name, 
-                                        'to_jersey_num': to_jersey_num,
-                                        'to_position': to_position, 'to_x': to_x, 
-                                        'to_y': to_y, 'num_passes': num_passes} 
+                # Receivers without their own Player tag have no jersey number, position nor location
+                to_player = players_index.get(to_id, {})
+                dict_to = {'to_id': to_id, 'to_name': to_name, 
+                                'to_jersey_num': to_player.get('from_jersey_num', UNDEFINED_INT),
+                                'to_position': to_player.get('from_position', ''),
+                                'to_x': to_player.get('from_x', UNDEFINED_FLOAT), 
+                                'to_y': to_player.get('from_y', UNDEFINED_FLOAT), 'num_passes': num_passes} 
                 list_player_matrix.append({**dict_from, **dict_to})
             return list_player_matrix
 
 
     def __get_df_total_passes(self):
-        df_sum_from = self.__df_pass_matrix.groupby(['from_id','from_name'], as_index=False)['num_passes'].sum()
-        df_sum_to = self.__df_pass_matrix.groupby(['to_id','to_name'], as_index=False)['num_passes'].sum()
-        df_merge = pd.merge(df_sum_from, df_sum_to, left_on='from_id', right_on='to_id', how='outer').fillna(0)
-        df_merge['total_passes'] = (df_merge['num_passes_x'] + df_merge['num_passes_y'])
-        df_merge = df_merge.astype({"from_id": int, "total_passes": int})
-        return df_merge.loc[:, ['from_id', 'from_name', 'total_passes']]
+        # Passes made and received by every passer, from the adjacency matrix
+        df_total = self.__df_pass_matrix.loc[:, ['from_id', 'from_name']].drop_duplicates().reset_index(drop=True)
+        positions = self.__pass_network.get_player_positions(df_total['from_id'].to_numpy())
+        total_passes = self.__pass_network.get_out_degree(weighted = True) + \
+                            self.__pass_network.get_in_degree(weighted = True)
+        # Passers that are not in the network (position -1) take the 0 appended at the end
+        df_total['total_passes'] = np.append(total_passes, 0)[positions].astype(int)
+        return df_total
 
 
     @staticmethod
@@ -223,16 +322,6 @@ class PassMatrix:
             return UNDEFINED_FLOAT
 
 
-    @staticmethod
-    def __tag_value_to_datetime(value):
-        for fmt in ('%Y-%m-%dT%H:%M:%S', '%Y-%m-%d %H:%M:%S', '%Y-%m-%d'):
-            try:
-                return datetime.strptime(value, fmt)
-            except (ValueError, TypeError):
-                pass
-        return UNDEFINED_DATE
-
-
     @staticmethod
     def __order_players(df):
         df_ordered = df.copy()
@@ -0,0 +1,177 @@
+import numpy as np
+import pandas as pd
+
+from constants import EVENT_IDS, QUALIFIER_IDS, UNDEFINED_FLOAT, UNDEFINED_INT
+from parse_cache import ParseCache
+from pass_matrix import PassMatrix
+
+
+class PassMatrixBuilder:
+    """
+    Builds pass matrices (as in Opta F27 files) from the events of Opta F24 files.
+
+    - The receiver of a successful pass is the player of the next event of the same
+      team in the same period of the match. Passes whose next event is of the passer
+      or is the last one of the period are not counted.
+    - The location of every player is the average location of their events in the
+      selected period and time window (the events without coordinates are not counted).
+    - The jersey number and position of every player are the ones of the team set-up
+      event of the match (qualifiers Involved, Jersey Number and Player Position).
+    - Only the players of the team with some event in the selected period and time
+      window are in the matrix.
+
+    Everything is computed with operations over whole columns of the event store, so a
+    store with the events of many matches (partitioned by match_id, see EventsCollection)
+    is processed at once.
+    """
+
+    POSITIONS = {1: 'Goalkeeper', 2: 'Defender', 3: 'Midfielder', 4: 'Forward', 5: 'Substitute'}
+
+    @staticmethod
+    def build(event_store, team_id, team_name, games, player_names = None, period_id = None, minute_from = None,
+              minute_to = None):
+        """
+        Pass matrices of a team in every match of an event store.
+
+        :param event_store: EventStore, with all the events of the matches (the receivers
+            are the players of the next events, so the events can not be filtered by type).
+        :param team_id: int, identifier of the team.
+        :param team_name: str, name of the team.
+        :param games: dict, Game of every match indexed by match_id. A store without
+            partition column has the events of a single match.
+        :param player_names: dict, optional, names of the players indexed by player_id.
+        :param period_id: int, optional, only the passes of a period.
+        :param minute_from: float, optional, only the passes from this minute of the match
+            clock (included).
+        :param minute_to: float, optional, only the passes until this minute of the match
+            clock (not included).
+        :return: dict of PassMatrix indexed by match_id, in the order of games.
+        """
+        columns = event_store.get_columns()
+        partition_column = event_store.get_partition_column()
+        if partition_column is not None:
+            matches = columns[partition_column]
+        elif len(games) == 1:
+            matches = np.full(len(event_store), next(iter(games)), dtype=np.int64)
+        else:
+            raise ValueError('An event store without partition column has the events of a single match')
+        periods = columns['period_id']
+        seconds = columns['min'].astype(np.float64) * 60 + columns['sec']
+
+        # Events of the players of the team, sorted by match, period and match clock
+        actors = np.flatnonzero((columns['team_id'] == team_id) & (columns['player_id'] != UNDEFINED_INT))
+        actors = actors[np.lexsort((actors, seconds[actors], periods[actors], matches[actors]))]
+        in_window = np.ones(len(actors), dtype=bool)
+        if period_id is not None:
+            in_window &= periods[actors] == period_id
+        if minute_from is not None:
+            in_window &= seconds[actors] >= minute_from * 60
+        if minute_to is not None:
+            in_window &= seconds[actors] < minute_to * 60
+
+        # Receiver: the player of the next event of the team in the same match and period
+        players = columns['player_id'][actors]
+        receivers = np.full(len(actors), UNDEFINED_INT, dtype=np.int64)
+        same_period = (matches[actors][1:] == matches[actors][:-1]) & (periods[actors][1:] == periods[actors][:-1])
+        receivers[:-1] = np.where(same_period, players[1:], UNDEFINED_INT)
+        passes = in_window & (columns['type_id'][actors] == EVENT_IDS['Pass'])
+        successful = passes & (columns['outcome'][actors] == 1) & (receivers != UNDEFINED_INT) & \
+                        (receivers != players)
+        df_links = pd.DataFrame({'match_id': matches[actors][successful], 'from_id': players[successful],
+                                 'to_id': receivers[successful]})
+        df_links = df_links.groupby(['match_id', 'from_id', 'to_id'], sort = True).size() \
+                            .rename('num_passes').astype(np.int64).reset_index()
+
+        # Players with events in the window, in the order they first appear, with the
+        # average location of their events in the window
+        df_players = pd.DataFrame({'match_id': matches[actors][in_window], 'player_id': players[in_window]}) \
+                            .drop_duplicates().reset_index(drop = True)
+        located = in_window & (columns['x'][actors] != UNDEFINED_FLOAT) & (columns['y'][actors] != UNDEFINED_FLOAT)
+        df_locations = pd.DataFrame({'match_id': matches[actors][located], 'player_id': players[located],
+                                     'x': columns['x'][actors][located], 'y': columns['y'][actors][located]}) \
+                            .groupby(['match_id', 'player_id']).mean().reset_index()
+        df_players = pd.merge(df_players, df_locations, on = ['match_id', 'player_id'], how = 'left')
+        df_players = pd.merge(df_players, PassMatrixBuilder.__get_df_team_set_up(event_store, matches, team_id),
+                              on = ['match_id', 'player_id'], how = 'left')
+        player_names = {} if player_names is None else player_names
+        df_players = pd.DataFrame({
+            'match_id': df_players['match_id'].to_numpy(dtype=np.int64),
+            'player_id': df_players['player_id'].to_numpy(dtype=np.int64),
+            'name': [player_names.get(player_id, '') for player_id in df_players['player_id'].tolist()],
+            'jersey_num': df_players['jersey_num'].fillna(UNDEFINED_INT).to_numpy(dtype=np.int64),
+            'position': df_players['position'].fillna('').astype(str).to_numpy(dtype=object),
+            'x': df_players['x'].fillna(UNDEFINED_FLOAT).to_numpy(dtype=np.float64),
+            'y': df_players['y'].fillna(UNDEFINED_FLOAT).to_numpy(dtype=np.float64)})
+
+        df = PassMatrixBuilder.__get_df_pass_matrix(df_players, df_links)
+        match_ids = df['match_id'].to_numpy()
+        pass_matrices = {}
+        for match_id, game in games.items():
+            # df is sorted by match, so the rows of a match are a slice
+            start, end = np.searchsorted(match_ids, [match_id, match_id + 1]) if len(df) > 0 else (0, 0)
+            df_match = df.iloc[start:end].drop(columns = 'match_id').reset_index(drop = True)
+            pass_matrices[match_id] = PassMatrix.from_columnar(
+                        {'team_id': team_id, 'team_name': team_name, 'match': ParseCache.object_to_dict(game)},
+                        {column: df_match[column].to_numpy() for column in df_match.columns})
+        return pass_matrices
+
+
+    @staticmethod
+    def __get_df_pass_matrix(df_players, df_links):
+        # Rows of the pass matrix of every match: one per link of every passer, or a row
+        # without receiver for the players without passes
+        df_from = df_players.rename(columns = {'player_id': 'from_id', 'name': 'from_name',
+                                               'jersey_num': 'from_jersey_num', 'position': 'from_position',
+                                               'x': 'from_x', 'y': 'from_y'})
+        df_to = df_players.rename(columns = {'player_id': 'to_id', 'name': 'to_name', 'jersey_num': 'to_jersey_num',
+                                             'position': 'to_position', 'x': 'to_x', 'y': 'to_y'})
+        df_from['order'] = np.arange(len(df_from))
+        df = pd.merge(df_from, df_links, on = ['match_id', 'from_id'], how = 'left')
+        df = pd.merge(df, df_to, on = ['match_id', 'to_id'], how = 'left')
+        df = df.sort_values(['match_id', 'order'], kind = 'stable').reset_index(drop = True)
+        without_passes = df['num_passes'].isna().to_numpy()
+        with_receiver = ~without_passes
+        df['to_id'] = df['to_id'].fillna(UNDEFINED_INT).astype(np.int64)
+        df['num_passes'] = df['num_passes'].fillna(0).astype(np.int64)
+        df['to_name'] = df['to_name'].where(with_receiver, '').fillna('')
+        df['to_position'] = df['to_position'].where(with_receiver, '').fillna('')
+        # As in F27 files, the jersey number is missing in the rows without receiver
+        df['to_jersey_num'] = df['to_jersey_num'].where(with_receiver).fillna(
+                                    pd.Series(np.where(without_passes, np.nan, UNDEFINED_INT))).astype(np.float64)
+        for column in ('to_x', 'to_y'):
+            df[column] = df[column].fillna(UNDEFINED_FLOAT).astype(np.float64)
+        return df.loc[:, ['match_id', 'from_id', 'from_name', 'from_jersey_num', 'from_position', 'from_x', 'from_y',
+                          'to_id', 'to_name', 'to_jersey_num', 'to_position', 'to_x', 'to_y', 'num_passes']]
+
+
+    @staticmethod
+    def __get_df_team_set_up(event_store, matches, team_id):
+        # Jersey number and position of the players in the team set-up events of the team
+        positions = np.intersect1d(event_store.get_positions('type_id', EVENT_IDS['Team set up']),
+                                   event_store.get_positions('team_id', team_id))
+        rows = []
+        for match_id, involved, set_up_positions, jersey_nums in zip(
+                    matches[positions].tolist(),
+                    event_store.get_qualifier_values(QUALIFIER_IDS['Involved'], positions),
+                    event_store.get_qualifier_values(QUALIFIER_IDS['Player Position'], positions),
+                    event_store.get_qualifier_values(QUALIFIER_IDS['Jersey Number'], positions)):
+            player_ids = PassMatrixBuilder.__split_values(involved)
+            set_up_positions = PassMatrixBuilder.__split_values(set_up_positions)
+            jersey_nums = PassMatrixBuilder.__split_values(jersey_nums)
+            for i, player_id in enumerate(player_ids):
+                position = set_up_positions[i] if i < len(set_up_positions) else UNDEFINED_INT
+                rows.append([match_id, player_id, jersey_nums[i] if i < len(jersey_nums) else UNDEFINED_INT,
+                             PassMatrixBuilder.POSITIONS.get(position, '')])
+        return pd.DataFrame(rows, columns = ['match_id', 'player_id', 'jersey_num', 'position']) \
+                    .drop_duplicates(['match_id', 'player_id']).astype({'match_id': np.int64, 'player_id': np.int64})
+
+
+    @staticmethod
+    def __split_values(value):
+        values = []
+        for item in ('' if value is None else value).split(','):
+            try:
+                values.append(int(item))
+            except ValueError:
+                values.append(UNDEFINED_INT)
+        return values
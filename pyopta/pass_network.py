@@ -0,0 +1,207 @@
+import numpy as np
+import pandas as pd
+
+from constants import UNDEFINED_INT
+
+
+class PassNetwork:
+    """
+    Passing network of a team as a dense adjacency matrix: the cell (i, j) is the
+    number of passes from the player i to the player j, where i and j are positions
+    in the player index (get_player_ids).
+
+    The network metrics are computed on the whole matrix with numpy, so they do not
+    need any pandas grouping or merging:
+
+    - degree: number of team mates a player passes to (out) or receives from (in),
+      or the number of passes if it is weighted.
+    - centrality: eigenvector centrality of the passes between every two players in
+      both directions, scaled so the most central player has 1.
+    - clustering: weighted clustering coefficient (geometric mean of the passes of
+      the triangles of a player) of the same undirected network.
+    - top links: the pairs of players with the most passes.
+    """
+
+    def __init__(self, player_ids, player_names, adjacency) -> None:
+        """
+        Constructor for the PassNetwork class.
+
+        :param player_ids: list of int, identifiers of the players (the player index).
+        :param player_names: list of str, names of the players, in the same order.
+        :param adjacency: numpy array (players x players), passes between the players.
+        :return: None
+        """
+        self.__player_ids = np.asarray(player_ids, dtype=np.int64)
+        self.__player_names = list(player_names)
+        self.__adjacency = np.asarray(adjacency, dtype=np.int64)
+        self.__player_index = pd.Index(self.__player_ids)
+
+
+    @classmethod
+    def from_passes(cls, from_ids, to_ids, num_passes, player_names = None):
+        """
+        Builds the network from a list of links. Links with an undefined player are
+        not counted and the passes of repeated links are added up.
+
+        :param from_ids: array-like of int, passer of every link.
+        :param to_ids: array-like of int, receiver of every link.
+        :param num_passes: array-like of int, passes of every link.
+        :param player_names: dict, optional, names of the players indexed by player_id.
+        :return: PassNetwork. Its players are the passers and then the receivers, in the
+            order they first appear.
+        """
+        from_ids = np.asarray(from_ids, dtype=np.int64)
+        to_ids = np.asarray(to_ids, dtype=np.int64)
+        num_passes = np.asarray(num_passes, dtype=np.int64)
+        player_ids = pd.unique(np.concatenate([from_ids, to_ids]))
+        player_ids = player_ids[player_ids != UNDEFINED_INT]
+        player_index = pd.Index(player_ids)
+        valid = (from_ids != UNDEFINED_INT) & (to_ids != UNDEFINED_INT)
+        adjacency = np.zeros((len(player_ids), len(player_ids)), dtype=np.int64)
+        np.add.at(adjacency, (player_index.get_indexer(from_ids[valid]), player_index.get_indexer(to_ids[valid])),
+                  num_passes[valid])
+        player_names = {} if player_names is None else player_names
+        return cls(player_ids, [player_names.get(player_id, '') for player_id in player_ids.tolist()], adjacency)
+
+
+    @classmethod
+    def from_df_pass_matrix(cls, df):
+        """
+        Builds the network of a pass matrix (see PassMatrix.get_df_pass_matrix).
+
+        :param df: DataFrame with from_id, from_name, to_id, to_name and num_passes.
+        :return: PassNetwork
+        """
+        if len(df) == 0:
+            return cls([], [], np.zeros((0, 0), dtype=np.int64))
+        # Names of the passers first, they are the ones of the players info of the file
+        player_names = dict(zip(df['to_id'].tolist(), df['to_name'].tolist()))
+        player_names.update(zip(df['from_id'].tolist(), df['from_name'].tolist()))
+        return cls.from_passes(df['from_id'].to_numpy(), df['to_id'].to_numpy(), df['num_passes'].to_numpy(),
+                               player_names = player_names)
+
+
+    def get_player_ids(self):
+        return self.__player_ids.copy()
+
+
+    def get_player_names(self):
+        return list(self.__player_names)
+
+
+    def get_player_positions(self, player_ids):
+        """
+        Positions of some players in the player index.
+
+        :param player_ids: array-like of int, identifiers of the players.
+        :return: numpy array of int, -1 for the players that are not in the network.
+        """
+        return self.__player_index.get_indexer(np.asarray(player_ids, dtype=np.int64))
+
+
+    def get_adjacency_matrix(self):
+        return self.__adjacency.copy()
+
+
+    def get_out_degree(self, weighted = False):
+        """
+        Out degree of every player, in the order of the player index.
+
+        :param weighted: bool, optional, number of passes made instead of the number of
+            team mates that received them. Default is False.
+        :return: numpy array of int
+        """
+        if weighted:
+            return self.__adjacency.sum(axis=1)
+        return np.count_nonzero(self.__adjacency, axis=1)
+
+
+    def get_in_degree(self, weighted = False):
+        """
+        In degree of every player, in the order of the player index.
+
+        :param weighted: bool, optional, number of passes received instead of the number
+            of team mates that made them. Default is False.
+        :return: numpy array of int
+        """
+        if weighted:
+            return self.__adjacency.sum(axis=0)
+        return np.count_nonzero(self.__adjacency, axis=0)
+
+
+    def get_centrality(self):
+        """
+        Weighted eigenvector centrality of every player, in the order of the player index.
+
+        :return: numpy array of float between 0 and 1 (0 for players without passes).
+        """
+        symmetric = self.__get_symmetric()
+        if len(symmetric) == 0 or not symmetric.any():
+            return np.zeros(len(symmetric))
+        # Principal eigenvector of the symmetric matrix (eigh sorts the eigenvalues in ascending order)
+        eigenvector = np.abs(np.linalg.eigh(symmetric)[1][:, -1])
+        return eigenvector / eigenvector.max()
+
+
+    def get_clustering(self):
+        """
+        Weighted clustering coefficient of every player, in the order of the player
+        index. The passes are normalized by the maximum passes between two players.
+
+        :return: numpy array of float between 0 and 1 (0 for players with less than two
+            team mates).
+        """
+        symmetric = self.__get_symmetric()
+        if len(symmetric) == 0 or not symmetric.any():
+            return np.zeros(len(symmetric))
+        weights = np.cbrt(symmetric / symmetric.max())
+        triangles = np.einsum('ij,jk,ki->i', weights, weights, weights)
+        degree = np.count_nonzero(symmetric, axis=1)
+        possible = degree * (degree - 1)
+        clustering = np.zeros(len(symmetric))
+        np.divide(triangles, possible, out=clustering, where=possible > 0)
+        return clustering
+
+
+    def get_df_metrics(self):
+        """
+        Network metrics of every player.
+
+        :return: DataFrame with player_id, player_name, out_degree, in_degree,
+            passes_made, passes_received, centrality and clustering.
+        """
+        return pd.DataFrame({'player_id': self.__player_ids, 'player_name': self.__player_names,
+                             'out_degree': self.get_out_degree(), 'in_degree': self.get_in_degree(),
+                             'passes_made': self.get_out_degree(weighted = True),
+                             'passes_received': self.get_in_degree(weighted = True),
+                             'centrality': self.get_centrality(), 'clustering': self.get_clustering()})
+
+
+    def get_top_links(self, k = 10):
+        """
+        Links with the most passes.
+
+        :param k: int, optional, number of links. Default is 10.
+        :return: DataFrame with from_id, from_name, to_id, to_name and num_passes, sorted
+            by num_passes (descending) and then by the player index. Empty if k is not
+            positive.
+        """
+        flat = self.__adjacency.ravel()
+        candidates = np.flatnonzero(flat) if k > 0 else np.zeros(0, dtype=np.int64)
+        if 0 < k < len(candidates):
+            # Only the links with at least the passes of the k-th link are sorted
+            threshold = np.partition(flat[candidates], len(candidates) - k)[len(candidates) - k]
+            candidates = candidates[flat[candidates] >= threshold]
+        candidates = candidates[np.argsort(-flat[candidates], kind='stable')][:k]
+        from_positions, to_positions = np.divmod(candidates, max(len(self.__player_ids), 1))
+        names = np.array(self.__player_names, dtype=object)
+        return pd.DataFrame({'from_id': self.__player_ids[from_positions], 'from_name': names[from_positions],
+                             'to_id': self.__player_ids[to_positions], 'to_name': names[to_positions],
+                             'num_passes': flat[candidates]})
+
+
+    def __get_symmetric(self):
+        # Passes between every two players in both directions, without self passes
+        symmetric = (self.__adjacency + self.__adjacency.T).astype(np.float64)
+        np.fill_diagonal(symmetric, 0)
+        return symmetric
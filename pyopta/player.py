@@ -2,6 +2,8 @@ from constants import UNDEFINED_INT
 
 
 class Player:
+    __slots__ = ('player_id', 'team_id', 'match_position', 'first', 'last', 'known')
+
     def __init__(self, player_id: int = UNDEFINED_INT, team_id: int = UNDEFINED_INT,
                  match_position: str = "", first: str = "", last: str = "",
                  known: str = "") -> None:
@@ -1,19 +1,75 @@
-from typing import Union
+from collections.abc import Sequence
 from constants import UNDEFINED_INT
 
 
 class Qualifier:
-    def __init__(self, **kwargs) -> None:
+    __slots__ = ('id', 'qualifier_id', 'value')
+
+    def __init__(self, id: int = UNDEFINED_INT, qualifier_id: int = UNDEFINED_INT, value: str = "") -> None:
         """
         Constructor for the Qualifier class.
 
-        :param kwargs: dictionary, optional, contains values for the properties of the Qualifier object.
+        :param id: int, optional, the unique identifier of the qualifier. Default is UNDEFINED_INT.
+        :param qualifier_id: int, optional, the type of the qualifier (see QUALIFIER_IDS). Default is UNDEFINED_INT.
+        :param value: str, optional, the value of the qualifier. Default is an empty string.
         :return: None
         """
-        prop_defaults: dict[str, Union[int, str]] = {
-            "id": UNDEFINED_INT,
-            "qualifier_id": UNDEFINED_INT,
-            "value": ""
-        }
-        self.__dict__.update(prop_defaults)
-        self.__dict__.update(kwargs)
+        self.id = id
+        self.qualifier_id = qualifier_id
+        self.value = value
+
+
+class QualifierList(Sequence):
+    """
+    Qualifiers of an event kept as raw parallel sequences of ids, qualifier_ids and
+    values. The Qualifier objects are only built the first time an item is read
+    (by index, iteration or a qualifier Criteria), so events whose qualifiers are
+    never used do not pay for them.
+    """
+
+    __slots__ = ('__ids', '__qualifier_ids', '__values', '__qualifiers')
+
+    def __init__(self, ids, qualifier_ids, values) -> None:
+        """
+        Constructor for the QualifierList class.
+
+        :param ids: list or numpy array, id of each qualifier.
+        :param qualifier_ids: list or numpy array, qualifier_id of each qualifier.
+        :param values: list or numpy array, value of each qualifier.
+        :return: None
+        """
+        self.__ids = ids
+        self.__qualifier_ids = qualifier_ids
+        self.__values = values
+        self.__qualifiers = None
+
+
+    def __len__(self):
+        return len(self.__ids)
+
+
+    def __getitem__(self, index):
+        if self.__qualifiers is None:
+            self.__qualifiers = [Qualifier(id = id, qualifier_id = qualifier_id, value = value) 
+                                    for id, qualifier_id, value in zip(self.__to_list(self.__ids), 
+                                        self.__to_list(self.__qualifier_ids), self.__to_list(self.__values))]
+        return self.__qualifiers[index]
+
+
+    def __repr__(self):
+        return f'QualifierList({len(self)} qualifiers)'
+
+
+    def get_raw(self):
+        """
+        Raw data of the qualifiers, without building Qualifier objects.
+
+        :return: tuple (ids, qualifier_ids, values).
+        """
+        return self.__ids, self.__qualifier_ids, self.__values
+
+
+    @staticmethod
+    def __to_list(values):
+        # numpy arrays are turned into lists of python values
+        return values.tolist() if hasattr(values, 'tolist') else values
@@ -0,0 +1,100 @@
+from collections import OrderedDict
+
+
+class QueryCache:
+    """
+    Bounded LRU cache of the DataFrames built by the get_df_* queries of Events.
+
+    Entries are keyed by the name of the query and its arguments. When the cache is
+    full the least recently used entry is discarded. Callers always get a copy of
+    the cached frame, including the lists and dicts of its object columns (e.g. the
+    qualifiers of get_df_all_events), so modifying a result does not corrupt the cache.
+    """
+
+    def __init__(self, max_size = 128) -> None:
+        """
+        Constructor for the QueryCache class.
+
+        :param max_size: int, maximum number of frames kept. 0 disables the cache.
+        :return: None
+        """
+        self.__max_size = max_size
+        self.__entries = OrderedDict()
+        self.__hits = 0
+        self.__misses = 0
+
+
+    def get(self, key, fn_compute):
+        """
+        Returns a copy of the frame cached with the key, computing and storing it first
+        if it is not in the cache.
+
+        :param key: tuple, name of the query followed by its arguments.
+        :param fn_compute: function, builds the frame when the key is not cached.
+        :return: DataFrame
+        """
+        if key in self.__entries:
+            self.__hits += 1
+            self.__entries.move_to_end(key)
+            return self.__copy(self.__entries[key])
+        self.__misses += 1
+        df = fn_compute()
+        if self.__max_size > 0:
+            self.__entries[key] = df
+            if len(self.__entries) > self.__max_size:
+                self.__entries.popitem(last = False)
+        return self.__copy(df)
+
+
+    def clear(self):
+        """
+        Discards every cached frame. Hit and miss counters are kept.
+
+        :return: None
+        """
+        self.__entries.clear()
+
+
+    def invalidate(self, fn_is_affected):
+        """
+        Discards the cached frames whose key is affected by a change of the data.
+
+        :param fn_is_affected: function, receives the key of a cached frame and returns
+            True if the frame has to be discarded.
+        :return: int, number of frames discarded.
+        """
+        affected = [key for key in self.__entries if fn_is_affected(key)]
+        for key in affected:
+            del self.__entries[key]
+        return len(affected)
+
+
+    def get_info(self):
+        """
+        Usage counters of the cache.
+
+        :return: dict, with hits, misses, size (cached frames) and max_size.
+        """
+        return {'hits': self.__hits, 'misses': self.__misses,
+                'size': len(self.__entries), 'max_size': self.__max_size}
+
+
+    @staticmethod
+    def __copy(df):
+        # DataFrame.copy does not copy the Python objects of the cells, so the lists and
+        # dicts of object columns are copied too
+        df = df.copy()
+        for column in df.columns[df.dtypes == object]:
+            values = df[column].tolist()
+            if any(isinstance(value, (list, dict)) for value in values):
+                df[column] = [QueryCache.__copy_value(value) for value in values]
+        return df
+
+
+    @staticmethod
+    def __copy_value(value):
+        if isinstance(value, list):
+            return [QueryCache.__copy_value(item) for item in value]
+        if isinstance(value, dict):
+            return {key: QueryCache.__copy_value(item) for key, item in value.items()}
+        return value
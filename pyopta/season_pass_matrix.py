@@ -0,0 +1,231 @@
+import numpy as np
+import pandas as pd
+
+from constants import UNDEFINED_FLOAT, UNDEFINED_INT
+from game import Game
+from parse_cache import ParseCache
+from pass_matrix import PassMatrix
+from pass_network import PassNetwork
+
+
+class SeasonPassMatrix:
+    """
+    Pass matrix of a team over many matches (e.g. a season), accumulated match by
+    match from the pass matrices of its Opta F27 files.
+
+    The passes between every two players are kept as a sparse matrix indexed by
+    player_id (coordinate lists of passer, receiver and passes). The links of every
+    new match are appended to it and the repeated links are added up when the matrix
+    is read, so adding a match never reprocesses the previous ones.
+
+    The location of every player is the average of their locations in the matches,
+    weighted by their minutes in every match when they are known (every match weighs
+    the same otherwise).
+
+    The season matrix is drawn with the same pitch as the pass matrix of a match
+    (see PassMatrix.get_pitch_pass_matrix).
+    """
+
+    def __init__(self) -> None:
+        """
+        Constructor for the SeasonPassMatrix class. Matches are added with add_match.
+
+        :return: None
+        """
+        self.__team_id = None
+        self.__team_name = None
+        self.__competition_name = ''
+        self.__season_name = ''
+        self.__match_ids = []
+        # Links of the matches not added up yet, and the added up links
+        self.__pending_links = []
+        self.__links = (np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64))
+        # player_id -> info of the player: name, jersey number, matches by position, and
+        # the weighted sums of the locations
+        self.__players = {}
+
+
+    @classmethod
+    def from_files(cls, file_paths, minutes_by_match = None, cache_dir = None):
+        """
+        Season pass matrix of some Opta F27 files of the same team.
+
+        :param file_paths: list of str, paths of the Opta F27 files.
+        :param minutes_by_match: dict, optional, minutes of every player indexed by
+            match_id and then by player_id (see add_match).
+        :param cache_dir: str, optional, directory of the on-disk cache of parsed files
+            (see ParseCache). Default is None (no cache).
+        :return: SeasonPassMatrix
+        """
+        minutes_by_match = {} if minutes_by_match is None else minutes_by_match
+        season_pass_matrix = cls()
+        for file_path in file_paths:
+            pass_matrix = PassMatrix(file_path, cache_dir = cache_dir)
+            season_pass_matrix.add_match(pass_matrix,
+                                         minutes = minutes_by_match.get(pass_matrix.get_match_info().match_id))
+        return season_pass_matrix
+
+
+    def add_match(self, pass_matrix, minutes = None):
+        """
+        Adds the passes and locations of a match.
+
+        :param pass_matrix: PassMatrix, pass matrix of the team in the match.
+        :param minutes: dict, optional, minutes played by every player in the match
+            indexed by player_id (e.g. the mins_played stat of the Opta F9 file). Players
+            that are not in it do not count for the average locations. Default is None
+            (the location of every player in the match weighs the same).
+        :return: None
+        """
+        match = pass_matrix.get_match_info()
+        if self.__team_id is None:
+            self.__team_id = pass_matrix.get_team_id()
+            self.__team_name = pass_matrix.get_team_name()
+            self.__competition_name = match.competition_name
+            self.__season_name = match.season_name
+        elif pass_matrix.get_team_id() != self.__team_id:
+            raise ValueError(f'The pass matrix is of the team {pass_matrix.get_team_id()}, '
+                             f'not of the team {self.__team_id}')
+        if match.match_id in self.__match_ids:
+            raise ValueError(f'The match {match.match_id} was already added')
+
+        df = pass_matrix.get_df_pass_matrix()
+        if len(df) > 0:
+            self.__pending_links.append((df['from_id'].to_numpy(dtype=np.int64), df['to_id'].to_numpy(dtype=np.int64),
+                                         df['num_passes'].to_numpy(dtype=np.int64)))
+            df_players = df.drop_duplicates('from_id')
+            for player_id, name, jersey_num, position, x, y in zip(
+                        df_players['from_id'].tolist(), df_players['from_name'].tolist(),
+                        df_players['from_jersey_num'].tolist(), df_players['from_position'].tolist(),
+                        df_players['from_x'].tolist(), df_players['from_y'].tolist()):
+                if player_id == UNDEFINED_INT:
+                    continue
+                weight = 1 if minutes is None else minutes.get(player_id, 0)
+                self.__add_player(player_id, name, jersey_num, position, x, y, weight)
+        self.__match_ids.append(match.match_id)
+
+
+    def get_match_ids(self):
+        return list(self.__match_ids)
+
+
+    def get_df_players(self):
+        """
+        Players of the season pass matrix.
+
+        :return: DataFrame with player_id, player_name, jersey_num, position (the one
+            played most, Substitute if the player never started), x, y and matches.
+        """
+        rows = [[player_id] + self.__get_player_values(player) + [sum(player['positions'].values())]
+                    for player_id, player in self.__players.items()]
+        return pd.DataFrame(rows, columns = ['player_id', 'player_name', 'jersey_num', 'position', 'x', 'y',
+                                             'matches'])
+
+
+    def get_df_pass_matrix(self):
+        """
+        Passes of every player to every team mate in all the matches, in the format of
+        PassMatrix.get_df_pass_matrix.
+
+        :return: DataFrame
+        """
+        from_ids, to_ids, num_passes = self.__get_links()
+        values = {player_id: self.__get_player_values(player) for player_id, player in self.__players.items()}
+        # Links of every passer, in the order the players were added
+        starts = np.searchsorted(from_ids, list(values), side='left')
+        ends = np.searchsorted(from_ids, list(values), side='right')
+        list_players_matrix = []
+        for (from_id, (from_name, from_jersey_num, from_position, from_x, from_y)), start, end in zip(
+                    values.items(), starts.tolist(), ends.tolist()):
+            dict_from = {'from_id': from_id, 'from_name': from_name, 'from_jersey_num': from_jersey_num,
+                         'from_position': from_position, 'from_x': from_x, 'from_y': from_y}
+            if start == end:
+                dict_to = {'to_id': UNDEFINED_INT, 'to_name': '', 'to_position': '',
+                           'to_x': UNDEFINED_FLOAT, 'to_y': UNDEFINED_FLOAT, 'num_passes': 0}
+                list_players_matrix.append({**dict_from, **dict_to})
+                continue
+            for to_id, passes in zip(to_ids[start:end].tolist(), num_passes[start:end].tolist()):
+                to_name, to_jersey_num, to_position, to_x, to_y = values.get(
+                            to_id, ['', UNDEFINED_INT, '', UNDEFINED_FLOAT, UNDEFINED_FLOAT])
+                dict_to = {'to_id': to_id, 'to_name': to_name, 'to_jersey_num': to_jersey_num,
+                           'to_position': to_position, 'to_x': to_x, 'to_y': to_y, 'num_passes': passes}
+                list_players_matrix.append({**dict_from, **dict_to})
+        return pd.DataFrame(list_players_matrix)
+
+
+    def get_pass_network(self):
+        from_ids, to_ids, num_passes = self.__get_links()
+        player_names = {player_id: player['name'] for player_id, player in self.__players.items()}
+        return PassNetwork.from_passes(from_ids, to_ids, num_passes, player_names = player_names)
+
+
+    def to_pass_matrix(self):
+        """
+        Season pass matrix as a PassMatrix, with a match info that only has the
+        competition and the season.
+
+        :return: PassMatrix
+        """
+        df = self.get_df_pass_matrix()
+        match = Game(competition_name = self.__competition_name, season_name = self.__season_name)
+        return PassMatrix.from_columnar({'team_id': self.__team_id, 'team_name': self.__team_name,
+                                         'match': ParseCache.object_to_dict(match)},
+                                        {column: df[column].to_numpy() for column in df.columns})
+
+
+    def get_pitch_pass_matrix(self, with_subs = False, team_color='#FF0000', passes_color='#eeeeee', min_passes = 1):
+        secondary_title = f'{self.__competition_name} ({self.__season_name}). {len(self.__match_ids)} matches'
+        return self.to_pass_matrix().get_pitch_pass_matrix(with_subs = with_subs, team_color = team_color,
+                                                           passes_color = passes_color, min_passes = min_passes,
+                                                           secondary_title = secondary_title)
+
+
+    def get_figure_pass_matrix(self, with_subs = False, team_color='#FF0000', passes_color='#eeeeee', min_passes = 1):
+        secondary_title = f'{self.__competition_name} ({self.__season_name}). {len(self.__match_ids)} matches'
+        return self.to_pass_matrix().get_figure_pass_matrix(with_subs = with_subs, team_color = team_color,
+                                                            passes_color = passes_color, min_passes = min_passes,
+                                                            secondary_title = secondary_title)
+
+
+    def __add_player(self, player_id, name, jersey_num, position, x, y, weight):
+        player = self.__players.get(player_id)
+        if player is None:
+            player = self.__players[player_id] = {'name': name, 'jersey_num': jersey_num, 'positions': {},
+                                                  'sum_x': 0.0, 'sum_y': 0.0, 'sum_weights': 0.0}
+        # The name and jersey number of the last match
+        player['name'] = name
+        player['jersey_num'] = jersey_num
+        player['positions'][position] = player['positions'].get(position, 0) + 1
+        if x != UNDEFINED_FLOAT and y != UNDEFINED_FLOAT and weight > 0:
+            player['sum_x'] += weight * x
+            player['sum_y'] += weight * y
+            player['sum_weights'] += weight
+
+
+    @staticmethod
+    def __get_player_values(player):
+        positions = {position: count for position, count in player['positions'].items() if position != 'Substitute'}
+        position = max(positions, key = positions.get) if len(positions) > 0 else 'Substitute'
+        if player['sum_weights'] > 0:
+            x = player['sum_x'] / player['sum_weights']
+            y = player['sum_y'] / player['sum_weights']
+        else:
+            x = UNDEFINED_FLOAT
+            y = UNDEFINED_FLOAT
+        return [player['name'], player['jersey_num'], position, x, y]
+
+
+    def __get_links(self):
+        # Adds up the pending links with the previous ones: the links are sorted by passer
+        # and receiver, without repeated pairs nor undefined players
+        if len(self.__pending_links) > 0:
+            from_ids, to_ids, num_passes = (np.concatenate(arrays) for arrays in
+                                            zip(self.__links, *self.__pending_links))
+            valid = (from_ids != UNDEFINED_INT) & (to_ids != UNDEFINED_INT)
+            pairs, inverse = np.unique(np.stack([from_ids[valid], to_ids[valid]], axis=1), axis=0,
+                                       return_inverse=True)
+            passes = np.bincount(inverse.ravel(), weights=num_passes[valid], minlength=len(pairs)).astype(np.int64)
+            kept = passes > 0
+            self.__links = (pairs[kept, 0].copy(), pairs[kept, 1].copy(), passes[kept])
+            self.__pending_links = []
+        return self.__links
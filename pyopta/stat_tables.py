@@ -0,0 +1,120 @@
+import pandas as pd
+
+from constants import EVENT_IDS
+
+
+class StatTables:
+    """
+    Builds the tables returned by the get_stats_* methods from the number of events of
+    every player, so the tables are the same whether the counts are aggregated from
+    the events of the match (Events) or accumulated event by event (LiveStats).
+
+    Counts are DataFrames indexed by player_id with one int64 column per condition:
+    OUTCOME_CONDITIONS for every stat but shots and SHOT_CONDITIONS for shots. A 
+    condition is a (column, value) pair of the events it counts (None counts them all).
+    """
+
+    OUTCOME_CONDITIONS = {'total': (None, None), 'outcome1': ('outcome', 1), 'outcome0': ('outcome', 0)}
+    SHOT_CONDITIONS = {'goal': ('type_id', EVENT_IDS['Goal']),
+                       'attempt_saved': ('type_id', EVENT_IDS['Attempt Saved']),
+                       'post': ('type_id', EVENT_IDS['Post']),
+                       'miss': ('type_id', EVENT_IDS['Miss'])}
+
+    @staticmethod
+    def get_specific_stat(stat, df_counts, player_ids, player_names,
+                            label_outcome1 = 'successful', label_outcome0 = 'unsuccessful'):
+        """
+        Table of a stat with two outcomes (e.g. passes).
+
+        :param stat: str, label of the stat (e.g. 'aerial duels').
+        :param df_counts: DataFrame, counts of OUTCOME_CONDITIONS of every player.
+        :param player_ids: list of int, players of the table, in order.
+        :param player_names: list of str, name of every player.
+        :param label_outcome1: str, optional, label of the outcome 1 column. Default is 'successful'.
+        :param label_outcome0: str, optional, label of the outcome 0 column. Default is 'unsuccessful'.
+        :return: DataFrame
+        """
+        num_stat = f'num_{stat}'
+        rows = []
+        for plid, player_name, num_total, num_successful, num_unsuccessful in zip(player_ids, 
+                    player_names, df_counts['total'].tolist(),
+                    df_counts['outcome1'].tolist(), df_counts['outcome0'].tolist()):
+            ratio = StatTables.compute_percentage(num_successful / (num_successful + num_unsuccessful) if (num_successful + num_unsuccessful) else 0)
+            rows.append([plid, player_name, num_total, num_successful, num_unsuccessful, ratio])
+        df = pd.DataFrame(rows, columns=['player_id', 'player_name', num_stat, label_outcome1, label_outcome0, 'ratio'])
+        df['player_id'] = pd.Series(df['player_id'] ,dtype = pd.Int64Dtype())
+        df[num_stat] = pd.Series(df[num_stat] ,dtype = pd.Int64Dtype())
+        df[label_outcome1] = pd.Series(df[label_outcome1] ,dtype = pd.Int64Dtype())
+        df[label_outcome0] = pd.Series(df[label_outcome0] ,dtype = pd.Int64Dtype())
+        return df.sort_values(by=['ratio', label_outcome1, label_outcome0], ascending=[False, False, True])
+
+
+    @staticmethod
+    def get_specific_stat_one_outcome(stat, df_counts, player_ids, player_names,
+                            label_outcome1 = 'successful'):
+        """
+        Table of a stat with a single outcome (e.g. corners).
+
+        :param stat: str, label of the stat (e.g. 'corners').
+        :param df_counts: DataFrame, counts of OUTCOME_CONDITIONS of every player.
+        :param player_ids: list of int, players of the table, in order.
+        :param player_names: list of str, name of every player.
+        :param label_outcome1: str, optional, label of the outcome column. Default is 'successful'.
+        :return: DataFrame
+        """
+        num_stat = f'num_{stat}'
+        df = pd.DataFrame({'player_id': player_ids, 'player_name': player_names, 
+                            num_stat: df_counts['total'].tolist(), label_outcome1: df_counts['total'].tolist()},
+                            columns=['player_id', 'player_name', num_stat, label_outcome1])
+        df['player_id'] = pd.Series(df['player_id'] ,dtype = pd.Int64Dtype())
+        df[num_stat] = pd.Series(df[num_stat] ,dtype = pd.Int64Dtype())
+        df[label_outcome1] = pd.Series(df[label_outcome1] ,dtype = pd.Int64Dtype())        
+        return df.sort_values(by=[label_outcome1], ascending=[False])
+
+
+    @staticmethod
+    def get_shots_stat(df_counts, player_ids, player_names):
+        """
+        Table of the shots.
+
+        :param df_counts: DataFrame, counts of SHOT_CONDITIONS of every player.
+        :param player_ids: list of int, players of the table, in order.
+        :param player_names: list of str, name of every player.
+        :return: DataFrame
+        """
+        df = pd.DataFrame({'player_id': player_ids, 'player_name': player_names,
+                            'on_target': (df_counts['goal'] + df_counts['attempt_saved']).tolist(),
+                            'off_target': (df_counts['post'] + df_counts['miss']).tolist(),
+                            'goal': df_counts['goal'].tolist(), 'attempt_saved': df_counts['attempt_saved'].tolist(),
+                            'post': df_counts['post'].tolist(), 'miss': df_counts['miss'].tolist()},
+                            columns=['player_id', 'player_name', 'on_target', 'off_target', 
+                                    'goal', 'attempt_saved', 'post', 'miss'])
+        df['player_id'] = pd.Series(df['player_id'] ,dtype = pd.Int64Dtype())
+        df['on_target'] = pd.Series(df['on_target'] ,dtype = pd.Int64Dtype())
+        df['off_target'] = pd.Series(df['off_target'] ,dtype = pd.Int64Dtype())
+        df['goal'] = pd.Series(df['goal'] ,dtype = pd.Int64Dtype())
+        df['attempt_saved'] = pd.Series(df['attempt_saved'] ,dtype = pd.Int64Dtype())
+        df['post'] = pd.Series(df['post'] ,dtype = pd.Int64Dtype())
+        df['miss'] = pd.Series(df['miss'] ,dtype = pd.Int64Dtype())
+        return df.sort_values(by=['goal', 'attempt_saved', 'post', 'miss'], ascending=[False, False, False, False])
+
+
+    @staticmethod
+    def get_player_names(df_players, player_ids):
+        """
+        Names of the players, empty strings if there is no players info (see
+        Events.set_squads_info).
+
+        :param df_players: DataFrame, players of the match.
+        :param player_ids: list of int.
+        :return: list
+        """
+        if 'player_name' not in df_players.columns:
+            return [''] * len(player_ids)
+        player_names = df_players.drop_duplicates('player_id').set_index('player_id')['player_name']
+        return player_names.reindex(player_ids).tolist()
+
+
+    @staticmethod
+    def compute_percentage(x):
+        return round(x * 100, 2)
@@ -2,6 +2,8 @@ from constants import UNDEFINED_INT
 
 
 class Team:
+    __slots__ = ('team_id', 'team_name')
+
     def __init__(self, team_id: int = UNDEFINED_INT, team_name: str = "") -> None:
         """
         Constructor for the Team class.
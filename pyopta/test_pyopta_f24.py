@@ -1,5 +1,10 @@
+import copy
 import os
+import tempfile
+import xml.etree.ElementTree as ET
+import pandas as pd
 from events import Events
+from live_stats import LiveStats
 
 script_dir = os.path.dirname(__file__)
 
@@ -25,6 +30,45 @@ print("------------------")
 print(opta_f24.get_df_teams())
 print("------------------")
 
+print("CHECKING THAT CACHED FRAMES CAN NOT BE CORRUPTED...")
+print("------------------")
+qualifiers = opta_f24.get_df_all_events()['qualifiers'].tolist()
+df_all_events = opta_f24.get_df_all_events()
+df_all_events['qualifiers'].iloc[0].append('X')
+df_all_events['qualifiers'].iloc[1][0]['value'] = 'HACK'
+assert opta_f24.get_df_all_events()['qualifiers'].tolist() == qualifiers
+print("OK")
+print("------------------")
+
+print("CHECKING LIVE STATS AFTER UPDATES OF THE EVENTS...")
+print("------------------")
+tree = ET.parse(PATH_F24)
+game_tag = tree.getroot().find('Game')
+event_tags = list(game_tag.iter('Event'))
+# Insert-only update: copies of some events of both teams, with new ids
+for i, event_tag in enumerate(event_tags[100:400:10]):
+    new_event_tag = copy.deepcopy(event_tag)
+    new_event_tag.set('id', str(80000000 + i))
+    game_tag.append(new_event_tag)
+# A new player whose only event is of a type that is not loaded by the filtered events
+new_event_tag = copy.deepcopy(next(tag for tag in event_tags if tag.get('type_id') == '34'))
+new_event_tag.set('id', '70000000')
+new_event_tag.set('player_id', '7777')
+game_tag.append(new_event_tag)
+with tempfile.TemporaryDirectory() as tmp_dir:
+    path_updated_f24 = os.path.join(tmp_dir, 'f24-updated.xml')
+    tree.write(path_updated_f24)
+    for type_ids in (None, [1, 4, 7, 8, 12, 13, 14, 15, 16, 44, 49]):
+        updated_f24 = Events(PATH_F24, type_ids=type_ids)
+        live_stats = LiveStats(updated_f24)
+        updated_f24.update_from(path_updated_f24, fn_on_event=live_stats.update_event)
+        for team_id in (None, 175, 5683):
+            all_stats = updated_f24.get_all_stats(team_id=team_id)
+            for stat, df_live_stat in live_stats.get_all_stats(team_id=team_id).items():
+                pd.testing.assert_frame_equal(df_live_stat, all_stats[stat])
+print("OK")
+print("------------------")
+
 print("PRINTING SHOTS DATAFRAME FOR TEAM.ID=175...")
 print("------------------")
 print(opta_f24.get_df_shots(team_id=175))
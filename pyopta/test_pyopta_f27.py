@@ -21,6 +21,18 @@ print("------------------")
 print(opta_f27_2.get_df_pass_matrix())
 print("------------------")
 
+print("CHECKING THE TOP LINKS OF THE PASS NETWORK (1)")
+print("------------------")
+df_top_links = opta_f27.get_top_links(3)
+print(df_top_links)
+assert len(df_top_links) == 3
+for k in (0, -1):
+    df_no_links = opta_f27.get_top_links(k)
+    assert len(df_no_links) == 0
+    assert list(df_no_links.columns) == ['from_id', 'from_name', 'to_id', 'to_name', 'num_passes']
+print("OK")
+print("------------------")
+
 pm_pitch1 = opta_f27.get_pitch_pass_matrix(min_passes=3, team_color='#ff0000')
 pm_pitch2 = opta_f27_2.get_pitch_pass_matrix(min_passes=3, team_color='#0000ff', with_subs=True)
 pm_pitch1.show()
\ No newline at end of file
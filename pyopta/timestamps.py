@@ -0,0 +1,119 @@
+import re
+from datetime import datetime
+
+import numpy as np
+
+from constants import UNDEFINED_DATE
+
+
+class TimestampDecoder:
+    """
+    Decodes the date values of one Opta file with the same result as trying
+    datetime.strptime with each format in turn (UNDEFINED_DATE if none matches),
+    without paying for the exceptions of the failed attempts.
+
+    - The format that matched last is tried first, so the format of the file is
+      detected with the first value and reused for the rest.
+    - Values that can not match any format (e.g. timestamps with milliseconds) are
+      rejected with a regular expression before calling strptime.
+    - Decoded values are memoized, since values such as last_modified repeat a lot.
+    - Whole columns of 'YYYY-MM-DDTHH:MM:SS' values are decoded at once by numpy.
+    """
+
+    ISO_FORMAT = '%Y-%m-%dT%H:%M:%S'
+    # Lenient patterns of the strptime directives: they accept everything strptime
+    # accepts (and more), so they are only used to discard values
+    __LENIENT_DIRECTIVES = {'%Y': r'\d{4}', '%m': r'\s?\d{1,2}', '%d': r'\s?\d{1,2}',
+                            '%H': r'\s?\d{1,2}', '%M': r'\s?\d{1,2}', '%S': r'\s?\d{1,2}'}
+    __ISO_VALUE = re.compile(r'(?!0000)[0-9]{4}-[0-9]{2}-[0-9]{2}T[0-9]{2}:[0-9]{2}:[0-9]{2}')
+
+    def __init__(self, formats) -> None:
+        """
+        Constructor for the TimestampDecoder class.
+
+        :param formats: tuple, strptime formats to try, in order.
+        :return: None
+        """
+        self.__formats = list(formats)
+        self.__lenient_pattern = self.__build_lenient_pattern(formats)
+        self.__memo = {}
+
+
+    def decode(self, value):
+        """
+        Decodes a single value.
+
+        :param value: str, value of the XML attribute (None if it is missing).
+        :return: datetime, UNDEFINED_DATE if the value does not match any format.
+        """
+        if not isinstance(value, str):
+            return UNDEFINED_DATE
+        if self.__lenient_pattern is not None and self.__lenient_pattern.fullmatch(value) is None:
+            return UNDEFINED_DATE
+        decoded = self.__memo.get(value)
+        if decoded is None:
+            decoded = self.__parse(value)
+            self.__memo[value] = decoded
+        return decoded
+
+
+    def decode_column(self, values):
+        """
+        Decodes a list of values.
+
+        :param values: list, values of the XML attribute (None where it is missing).
+        :return: numpy datetime64[us] array with the decoded values.
+        """
+        decoded = np.empty(len(values), dtype='datetime64[us]')
+        pending = range(len(values))
+        if self.ISO_FORMAT in self.__formats and len(values) > 0:
+            iso = np.array([isinstance(value, str) and self.__ISO_VALUE.fullmatch(value) is not None
+                            for value in values], dtype=bool)
+            iso_positions = np.flatnonzero(iso)
+            iso_values = np.array([values[i] for i in iso_positions], dtype='U19')
+            try:
+                iso_decoded = iso_values.astype('datetime64[s]')
+                # numpy is more permissive than strptime (e.g. hour 24), so only values
+                # that are written back identically are taken
+                valid = np.datetime_as_string(iso_decoded, unit='s') == iso_values
+                decoded[iso_positions[valid]] = iso_decoded[valid]
+                iso[iso_positions[~valid]] = False
+            except ValueError:
+                # Some value is not a valid date, so all of them go through strptime
+                iso[:] = False
+            pending = np.flatnonzero(~iso).tolist()
+        for i in pending:
+            decoded[i] = self.decode(values[i])
+        return decoded
+
+
+    def __parse(self, value):
+        for fmt in self.__formats:
+            try:
+                decoded = datetime.strptime(value, fmt)
+            except ValueError:
+                continue
+            if fmt != self.__formats[0]:
+                self.__formats.remove(fmt)
+                self.__formats.insert(0, fmt)
+            return decoded
+        return UNDEFINED_DATE
+
+
+    @classmethod
+    def __build_lenient_pattern(cls, formats):
+        # None if a format uses a directive without lenient pattern (no value is discarded)
+        alternatives = []
+        for fmt in formats:
+            pattern = ''
+            for token in re.findall(r'%.|\s+|[^%\s]+', fmt):
+                if token.startswith('%'):
+                    if token not in cls.__LENIENT_DIRECTIVES:
+                        return None
+                    pattern += cls.__LENIENT_DIRECTIVES[token]
+                elif token.isspace():
+                    pattern += r'\s+'
+                else:
+                    pattern += re.escape(token)
+            alternatives.append(f'(?:{pattern})')
+        return re.compile('|'.join(alternatives), re.IGNORECASE)
@@ -1,5 +1,5 @@
 import os
-from pyopta.pass_matrix import PassMatrix
+from pyopta.batch import render_pass_matrices
 
 script_dir = os.path.dirname(__file__)
 
@@ -8,14 +8,13 @@ PATH_PASS_MATRIX_PNG = f"{script_dir}/f27_passmatrix_sfc_pngs/"
 
 def main():
     print("Creating pass matrices...")
-    for filename in os.listdir(PATH_PASS_MATRIX):
-        file_pm = os.path.join(PATH_PASS_MATRIX, filename)
-        opta_f27 = PassMatrix(file_pm)
-        pitch_pm = opta_f27.get_pitch_pass_matrix(team_color='#F43333')
-        output_name = os.path.splitext(f"{filename}")[0]+'.png'
-        output_path = f"{PATH_PASS_MATRIX_PNG}{output_name}"
-        print(f"Saving {output_path}...")
-        pitch_pm.savefig(output_path)
+    file_paths = [os.path.join(PATH_PASS_MATRIX, filename) for filename in sorted(os.listdir(PATH_PASS_MATRIX))]
+    rendered, errors = render_pass_matrices(file_paths, PATH_PASS_MATRIX_PNG, team_color='#F43333')
+    for file_pm, timing in rendered.items():
+        print(f"Saved {timing['output_path']} "
+              f"(parse {timing['parse_seconds']:.2f} s, render {timing['render_seconds']:.2f} s)")
+    for file_pm, error in errors.items():
+        print(f"Error rendering {file_pm}: {error}")
 
 if __name__ == "__main__":
     main()
@@ -1,4 +1,5 @@
 import os
+from pyopta.constants import EVENT_IDS
 from pyopta.events import Events
 
 script_dir = os.path.dirname(__file__)
@@ -10,7 +11,8 @@ def main():
     print("Creating pngs from corners events...")
     for filename in os.listdir(PATH_EVENTS_RSO_HOME):
         file_ev = os.path.join(PATH_EVENTS_RSO_HOME, filename)
-        opta_f24 = Events(file_ev)
+        # Corners are passes: the rest of event types are not parsed
+        opta_f24 = Events(file_ev, type_ids = [EVENT_IDS['Pass']])
         pitch_corner = opta_f24.get_pitch_corners(team_id = 188)
         output_name = os.path.splitext(f"{filename}")[0]+'.png'
         output_path = f"{PATH_EVENTS_RSO_HOME_PNG}{output_name}"